@@ -3,9 +3,8 @@ Modul AdSense Compliance Checker
 Analisis video apakah sudah memenuhi syarat monetisasi YouTube
 """
 import os
-import json
-import subprocess
 from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path
+from app.probe_cache import probe
 
 
 class AdSenseChecker:
@@ -37,61 +36,8 @@ class AdSenseChecker:
         self.ffprobe = get_ffprobe_path()
 
     def _get_video_info(self, video_path):
-        """Get detailed video info via ffprobe."""
-        if self.ffprobe:
-            cmd = [
-                self.ffprobe, '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format', '-show_streams',
-                video_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return json.loads(result.stdout)
-
-        # Fallback: parse ffmpeg -i output
-        cmd = [self.ffmpeg, '-i', video_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return self._parse_ffmpeg_output(result.stderr)
-
-    def _parse_ffmpeg_output(self, stderr):
-        """Parse ffmpeg -i output as fallback."""
-        import re
-        info = {'format': {}, 'streams': []}
-
-        # Duration
-        dur_match = re.search(r'Duration:\s*(\d+):(\d+):(\d+)\.(\d+)', stderr)
-        if dur_match:
-            h, m, s, cs = dur_match.groups()
-            info['format']['duration'] = str(int(h)*3600 + int(m)*60 + int(s) + int(cs)/100)
-
-        # Bitrate
-        br_match = re.search(r'bitrate:\s*(\d+)\s*kb/s', stderr)
-        if br_match:
-            info['format']['bit_rate'] = str(int(br_match.group(1)) * 1000)
-
-        # Video stream
-        vid_match = re.search(r'Video:\s*(\w+).*?,\s*(\d+)x(\d+).*?,\s*([\d.]+)\s*fps', stderr)
-        if vid_match:
-            info['streams'].append({
-                'codec_type': 'video',
-                'codec_name': vid_match.group(1),
-                'width': int(vid_match.group(2)),
-                'height': int(vid_match.group(3)),
-                'r_frame_rate': f"{vid_match.group(4)}/1",
-            })
-
-        # Audio stream
-        aud_match = re.search(r'Audio:\s*(\w+).*?,\s*(\d+)\s*Hz.*?,.*?,\s*(\d+)\s*kb/s', stderr)
-        if aud_match:
-            info['streams'].append({
-                'codec_type': 'audio',
-                'codec_name': aud_match.group(1),
-                'sample_rate': aud_match.group(2),
-                'bit_rate': str(int(aud_match.group(3)) * 1000),
-            })
-
-        return info
+        """Get detailed video info (JSON ffprobe) via probe cache."""
+        return probe(video_path).raw
 
     def check_video(self, video_path):
         """
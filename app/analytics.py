@@ -3,9 +3,8 @@ Video Analytics Dashboard — Analisis detail video (durasi, bitrate, resolution
 Menggunakan FFprobe untuk extract metadata
 """
 import os
-import json
-import subprocess
 from app.ffmpeg_util import get_ffprobe_path
+from app.probe_cache import probe
 
 
 class VideoAnalytics:
@@ -19,18 +18,7 @@ class VideoAnalytics:
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video not found: {video_path}")
 
-        cmd = [
-            self.ffprobe, '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_streams', '-show_format',
-            video_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode != 0:
-            raise RuntimeError(f"FFprobe error: {result.stderr[:300]}")
-
-        data = json.loads(result.stdout)
+        data = probe(video_path).raw
 
         stats = {
             'file': os.path.basename(video_path),
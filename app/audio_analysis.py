@@ -0,0 +1,229 @@
+"""
+Modul Audio Analysis - Analisa audio in-process dengan NumPy
+Audio di-decode SEKALI (PCM s16le lewat pipe) jadi envelope loudness per frame,
+lalu dipakai bersama untuk deteksi silence, VAD transcription, dan deteksi jeda
+untuk chapter — tanpa parsing teks stderr FFmpeg.
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+from app.ffmpeg_util import iter_audio_pcm, FFmpegCancelled
+from app.cache import get_cache_dir, file_key, file_key_hash
+
+
+# Level minimum (dBFS) untuk frame yang benar-benar digital silence
+FLOOR_DB = -120.0
+
+
+def parse_db(value):
+    """'-30dB' / '-30' / -30 → -30.0"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(str(value).strip().lower().replace('db', ''))
+
+
+@dataclass
+class AudioAnalysis:
+    """Envelope loudness (RMS dBFS per frame) dari satu file audio/video."""
+
+    envelope: np.ndarray       # float32, dBFS per frame
+    peak: np.ndarray           # float32, peak dBFS per frame
+    frame_duration: float      # detik per frame envelope
+    sample_rate: int
+
+    @property
+    def duration(self):
+        return len(self.envelope) * self.frame_duration
+
+    def times(self):
+        """Waktu mulai tiap frame envelope (detik)."""
+        return np.arange(len(self.envelope), dtype=np.float64) * self.frame_duration
+
+    def silence_intervals(self, threshold_db=-30.0, min_duration=2.0, hysteresis_db=3.0):
+        """
+        Interval silence sebagai array compact (N, 2) [start, end] detik.
+
+        Masuk silence kalau level < threshold, keluar kalau level > threshold +
+        hysteresis (supaya level yang naik-turun di sekitar threshold tidak
+        memecah satu jeda jadi banyak potongan).
+        """
+        env = self.envelope
+        if len(env) == 0:
+            return np.zeros((0, 2), dtype=np.float64)
+
+        # Hysteresis tanpa loop Python: frame "tegas" menentukan state,
+        # frame di antara dua batas mewarisi state tegas terakhir (forward fill)
+        below = env < threshold_db
+        above = env > threshold_db + hysteresis_db
+        decisive = below | above
+        idx = np.where(decisive, np.arange(len(env)), -1)
+        np.maximum.accumulate(idx, out=idx)
+        silent = np.where(idx >= 0, below[np.maximum(idx, 0)], False)
+
+        # Run-length: cari awal & akhir tiap blok silent
+        padded = np.concatenate(([False], silent, [False])).astype(np.int8)
+        edges = np.diff(padded)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        intervals = np.stack([starts, ends], axis=1).astype(np.float64) * self.frame_duration
+        keep = (intervals[:, 1] - intervals[:, 0]) >= min_duration
+        return intervals[keep]
+
+    def silences(self, threshold_db=-30.0, min_duration=2.0, hysteresis_db=3.0):
+        """Sama seperti silence_intervals tapi list of (start, end) (format detect_silence)."""
+        return [
+            (float(start), float(end))
+            for start, end in self.silence_intervals(threshold_db, min_duration, hysteresis_db)
+        ]
+
+    def loudness(self, start=None, end=None):
+        """
+        Statistik loudness untuk rentang waktu (default seluruh audio).
+
+        Returns:
+            dict {'rms_db', 'peak_db', 'active_db'} — active_db = rata-rata
+            frame yang tidak diam (perkiraan level bicara)
+        """
+        a = 0 if start is None else int(start / self.frame_duration)
+        b = len(self.envelope) if end is None else int(np.ceil(end / self.frame_duration))
+        env = self.envelope[a:b]
+        if len(env) == 0:
+            return {'rms_db': FLOOR_DB, 'peak_db': FLOOR_DB, 'active_db': FLOOR_DB}
+
+        power = np.power(10.0, env.astype(np.float64) / 10.0)
+        rms_db = 10 * np.log10(max(power.mean(), 1e-12))
+        active = power[env > -50.0]
+        active_db = 10 * np.log10(active.mean()) if len(active) else FLOOR_DB
+        return {
+            'rms_db': float(rms_db),
+            'peak_db': float(self.peak[a:b].max()),
+            'active_db': float(active_db),
+        }
+
+
+def analyze_audio(media_path, sample_rate=16000, frame_ms=20, tap_filter=None, tap_log=None,
+                  cancelled=None):
+    """
+    Decode audio sekali lalu hitung envelope RMS & peak per frame (vectorized).
+
+    Args:
+        media_path: File audio/video
+        sample_rate: Sample rate decode (16 kHz cukup untuk level & VAD)
+        frame_ms: Panjang frame envelope (milidetik)
+        tap_filter, tap_log: Filter analisa FFmpeg di decode yang sama
+                             (lihat iter_audio_pcm), misal loudnorm pass 1
+        cancelled: Callable → True untuk menghentikan decode (RuntimeError)
+
+    Returns:
+        AudioAnalysis
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    block_bytes = frame_len * 2 * 512      # ±10 detik per block di 16 kHz / 20 ms
+    rms_blocks, peak_blocks = [], []
+    leftover = np.zeros(0, dtype=np.int16)
+    pending = b''
+
+    def _process(samples):
+        frames = samples.reshape(-1, frame_len).astype(np.float32) / 32768.0
+        ms = np.mean(frames * frames, axis=1)
+        rms_blocks.append(10 * np.log10(np.maximum(ms, 1e-12)))
+        peak = np.max(np.abs(frames), axis=1)
+        peak_blocks.append(20 * np.log10(np.maximum(peak, 1e-6)))
+
+    pcm = iter_audio_pcm(media_path, sample_rate=sample_rate, chunk_bytes=block_bytes,
+                         tap_filter=tap_filter, tap_log=tap_log)
+    for chunk in pcm:
+        if cancelled and cancelled():
+            pcm.close()
+            raise FFmpegCancelled("FFmpeg dibatalkan")
+        chunk = pending + chunk
+        usable = len(chunk) - len(chunk) % 2
+        pending = chunk[usable:]
+        samples = np.concatenate([leftover, np.frombuffer(chunk[:usable], dtype=np.int16)])
+        whole = len(samples) - len(samples) % frame_len
+        if whole:
+            _process(samples[:whole])
+        leftover = samples[whole:]
+
+    if len(leftover):
+        _process(np.concatenate([leftover, np.zeros(frame_len - len(leftover), dtype=np.int16)]))
+
+    envelope = np.concatenate(rms_blocks).astype(np.float32) if rms_blocks else np.zeros(0, np.float32)
+    peak = np.concatenate(peak_blocks).astype(np.float32) if peak_blocks else np.zeros(0, np.float32)
+    return AudioAnalysis(
+        envelope=np.maximum(envelope, FLOOR_DB),
+        peak=np.maximum(peak, FLOOR_DB),
+        frame_duration=frame_len / sample_rate,
+        sample_rate=sample_rate,
+    )
+
+
+# ===== Cache bersama (memori + .npz di cache dir) =====
+
+_analysis_cache = OrderedDict()
+_analysis_lock = threading.Lock()
+_MAX_CACHED = 16
+
+
+def _npz_path(media_path):
+    return os.path.join(get_cache_dir("audio_analysis"), f"{file_key_hash(media_path)}.npz")
+
+
+def _remember(key, analysis):
+    with _analysis_lock:
+        _analysis_cache[key] = analysis
+        while len(_analysis_cache) > _MAX_CACHED:
+            _analysis_cache.popitem(last=False)
+
+
+def has_audio_analysis(media_path):
+    """True kalau AudioAnalysis file ini sudah ada di cache (tanpa decode)."""
+    with _analysis_lock:
+        if repr(file_key(media_path)) in _analysis_cache:
+            return True
+    return os.path.exists(_npz_path(media_path))
+
+
+def store_audio_analysis(media_path, analysis):
+    """Simpan AudioAnalysis yang dihitung di tempat lain (misal decode loudnorm)."""
+    try:
+        np.savez_compressed(
+            _npz_path(media_path), envelope=analysis.envelope, peak=analysis.peak,
+            frame_duration=analysis.frame_duration, sample_rate=analysis.sample_rate,
+        )
+    except OSError:
+        pass
+    _remember(repr(file_key(media_path)), analysis)
+
+
+def get_audio_analysis(media_path):
+    """
+    AudioAnalysis untuk file ini, di-cache per (path, size, mtime) —
+    silence removal, VAD transcription, dan chapter memakai decode yang sama.
+    """
+    key = repr(file_key(media_path))
+    with _analysis_lock:
+        if key in _analysis_cache:
+            _analysis_cache.move_to_end(key)
+            return _analysis_cache[key]
+
+    npz_path = _npz_path(media_path)
+    if os.path.exists(npz_path):
+        try:
+            with np.load(npz_path) as data:
+                analysis = AudioAnalysis(
+                    envelope=data['envelope'], peak=data['peak'],
+                    frame_duration=float(data['frame_duration']),
+                    sample_rate=int(data['sample_rate']),
+                )
+            _remember(key, analysis)
+            return analysis
+        except (OSError, KeyError, ValueError):
+            pass
+
+    analysis = analyze_audio(media_path)
+    store_audio_analysis(media_path, analysis)
+    return analysis
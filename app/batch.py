@@ -3,6 +3,7 @@ Modul Batch Processing - Proses banyak video sekaligus
 """
 import os
 import json
+import queue
 import threading
 from datetime import datetime
 
@@ -10,7 +11,20 @@ from datetime import datetime
 class BatchProcessor:
     """Proses banyak video YouTube sekaligus."""
 
-    def __init__(self, output_base_dir="output"):
+    def __init__(self, output_base_dir="output", download_workers=8,
+                 encode_workers=None, transcribe_workers=1, threads_per_encode=4,
+                 resume=True):
+        """
+        Args:
+            output_base_dir: Folder output batch
+            download_workers: Jumlah download paralel (network-bound)
+            encode_workers: Jumlah encode FFmpeg paralel (CPU-bound),
+                            None = jumlah core / threads_per_encode
+            transcribe_workers: Jumlah transcription Whisper paralel (memory-bound)
+            threads_per_encode: Thread encoder (-threads) per encode x264 di stage encode
+            resume: Pakai manifest (batch_manifest.sqlite) supaya step yang sudah
+                    selesai di run sebelumnya tidak diulang
+        """
         self.output_base_dir = output_base_dir
         os.makedirs(output_base_dir, exist_ok=True)
         self.progress_callback = None
@@ -18,6 +32,24 @@ class BatchProcessor:
         self.is_running = False
         self.should_stop = False
 
+        if encode_workers is None:
+            encode_workers = max(1, (os.cpu_count() or 2) // max(1, threads_per_encode))
+        self.threads_per_encode = max(1, threads_per_encode)
+        self.download_workers = max(1, download_workers)
+        self.encode_workers = max(1, encode_workers)
+        self.transcribe_workers = max(1, transcribe_workers)
+
+        self.manifest = None
+        if resume:
+            from app.manifest import BatchManifest
+            self.manifest = BatchManifest(
+                os.path.join(output_base_dir, "batch_manifest.sqlite")
+            )
+        self._report_lock = threading.Lock()
+        # Job FFmpeg batch ini saja yang dihentikan stop() (job GUI tidak)
+        from app.ffmpeg_util import CancelGroup
+        self.cancel_group = CancelGroup()
+
     def set_progress_callback(self, callback):
         """callback(video_index, total_videos, percent, status_text)"""
         self.progress_callback = callback
@@ -27,10 +59,11 @@ class BatchProcessor:
             self.progress_callback(idx, total, pct, text)
 
     def stop(self):
-        """Stop batch processing."""
+        """Stop batch processing (termasuk FFmpeg job batch ini yang sedang jalan)."""
         self.should_stop = True
+        self.cancel_group.cancel()
 
-    def process_url_list(self, urls, options):
+    def process_url_list(self, urls, options, parallel=False):
         """
         Proses list URL video.
 
@@ -45,172 +78,359 @@ class BatchProcessor:
                     'thumbnail': True/False,
                     'seo': True/False,
                     'shorts': False,
+                    'shorts_count': 3,  # jumlah highlight Shorts
                     'youtube_export': True/False,
                     'watermark_logo': None or path,
                     'color_grade': None or preset name,
                     'whisper_model': 'base',
                     'language': 'id',
                     'resolution': '1080p',
+                    'parallel': False,
                 }
+            parallel: Proses paralel dengan worker pool per resource
+                      (download / encode / transcription)
 
         Returns:
             List of result dicts
         """
         self.is_running = True
         self.should_stop = False
+        self.cancel_group.reset()
         self.results = []
-        total = len(urls)
 
+        jobs = []
         for i, url in enumerate(urls):
-            if self.should_stop:
-                self._update(i, total, 0, "Batch processing dihentikan!")
-                break
-
             url = url.strip()
             if not url:
                 continue
+            jobs.append(self._new_job(i, url, len(urls)))
 
-            self._update(i + 1, total, 0, f"Video {i+1}/{total}: Memulai...")
+        if parallel or options.get('parallel', False):
+            self._run_parallel(jobs, options)
+        else:
+            self._run_sequential(jobs, options)
 
-            # Buat output dir per video
-            video_dir = os.path.join(self.output_base_dir, f"video_{i+1:03d}")
-            os.makedirs(video_dir, exist_ok=True)
+        # Report akhir (juga sudah ditulis per video selesai)
+        with self._report_lock:
+            self._save_report()
+        self.is_running = False
+        return self.results
 
-            result = {
+    def _new_job(self, i, url, total):
+        """Buat state satu video (result + path video saat ini)."""
+        # Buat output dir per video
+        video_dir = os.path.join(self.output_base_dir, f"video_{i+1:03d}")
+        os.makedirs(video_dir, exist_ok=True)
+
+        return {
+            'index': i + 1,
+            'total': total,
+            'video_dir': video_dir,
+            'current_video': None,
+            'subtitle_path': None,
+            'result': {
                 'url': url,
                 'index': i + 1,
                 'status': 'processing',
                 'output_dir': video_dir,
                 'outputs': {},
+                'skipped_steps': [],
                 'error': None,
-            }
-
-            try:
-                # Step 1: Download
-                self._update(i + 1, total, 10, f"Video {i+1}/{total}: Downloading...")
-                from app.downloader import VideoDownloader
-                dl = VideoDownloader(output_dir=video_dir)
-                video_path = dl.download(url, quality=options.get('resolution', 'best'))
-                result['outputs']['original'] = video_path
-
-                current_video = video_path
-
-                # Step 2: Audio Enhance
-                if options.get('audio_enhance', False):
-                    self._update(i + 1, total, 25, f"Video {i+1}/{total}: Enhancing audio...")
-                    from app.editor import VideoEditor
-                    editor = VideoEditor(output_dir=video_dir)
-                    current_video = editor.enhance_audio(current_video)
-                    result['outputs']['audio_enhanced'] = current_video
-
-                # Step 3: Remove Silence
-                if options.get('silence', False):
-                    self._update(i + 1, total, 35, f"Video {i+1}/{total}: Removing silence...")
-                    from app.editor import VideoEditor
-                    editor = VideoEditor(output_dir=video_dir)
-                    current_video = editor.remove_silence(current_video)
-                    result['outputs']['no_silence'] = current_video
-
-                # Step 4: Speed
-                if options.get('speed', False):
-                    self._update(i + 1, total, 45, f"Video {i+1}/{total}: Adjusting speed...")
-                    from app.editor import VideoEditor
-                    editor = VideoEditor(output_dir=video_dir)
-                    current_video = editor.adjust_speed(current_video, speed=1.05)
-                    result['outputs']['speed_adjusted'] = current_video
-
-                # Step 5: Color Grading
-                if options.get('color_grade'):
-                    self._update(i + 1, total, 50, f"Video {i+1}/{total}: Color grading...")
-                    from app.color_grading import ColorGrading
-                    cg = ColorGrading(output_dir=video_dir)
-                    current_video = cg.apply_preset(current_video, options['color_grade'])
-                    result['outputs']['color_graded'] = current_video
-
-                # Step 6: Subtitle
-                if options.get('subtitle', False):
-                    self._update(i + 1, total, 55, f"Video {i+1}/{total}: Generating subtitles...")
-                    from app.subtitler import AutoSubtitler
-                    lang = options.get('language', 'id')
-                    if lang == 'auto':
-                        lang = None
-                    subtitler = AutoSubtitler(
-                        model_size=options.get('whisper_model', 'base'),
-                        output_dir=video_dir
-                    )
-                    sub_result = subtitler.full_pipeline(current_video, language=lang)
-                    if sub_result['video_output']:
-                        current_video = sub_result['video_output']
-                    result['outputs']['subtitled'] = current_video
-                    result['outputs']['subtitle_file'] = sub_result['subtitle_path']
-
-                # Step 7: Watermark
-                if options.get('watermark_logo'):
-                    self._update(i + 1, total, 70, f"Video {i+1}/{total}: Adding watermark...")
-                    from app.watermark import WatermarkOverlay
-                    wm = WatermarkOverlay(output_dir=video_dir)
-                    current_video = wm.add_image_watermark(
-                        current_video, options['watermark_logo']
-                    )
-                    result['outputs']['watermarked'] = current_video
-
-                # Step 8: YouTube Export
-                if options.get('youtube_export', False):
-                    self._update(i + 1, total, 80, f"Video {i+1}/{total}: Exporting...")
-                    from app.editor import VideoEditor
-                    editor = VideoEditor(output_dir=video_dir)
-                    current_video = editor.export_for_youtube(
-                        current_video, resolution=options.get('resolution', '1080p')
-                    )
-                    result['outputs']['final'] = current_video
-
-                # Step 9: Thumbnail
-                if options.get('thumbnail', False):
-                    self._update(i + 1, total, 85, f"Video {i+1}/{total}: Generating thumbnails...")
-                    from app.thumbnail import ThumbnailGenerator
-                    tg = ThumbnailGenerator(output_dir=video_dir)
-                    thumbs = tg.batch_generate(current_video, "DRAMA PENDEK", num_options=3)
-                    result['outputs']['thumbnails'] = thumbs
-
-                # Step 10: SEO
-                if options.get('seo', False):
-                    self._update(i + 1, total, 90, f"Video {i+1}/{total}: Generating SEO...")
-                    from app.title_generator import TitleGenerator
-                    tg = TitleGenerator()
-                    seo = tg.generate_seo_package()
-                    
-                    desc_path = os.path.join(video_dir, "description.txt")
-                    with open(desc_path, 'w', encoding='utf-8') as f:
-                        f.write(seo['description'])
-                    tags_path = os.path.join(video_dir, "tags.txt")
-                    with open(tags_path, 'w', encoding='utf-8') as f:
-                        f.write("\n".join(seo['tags']))
-                    
-                    result['outputs']['seo_description'] = desc_path
-                    result['outputs']['seo_tags'] = tags_path
-
-                # Step 11: Shorts
-                if options.get('shorts', False):
-                    self._update(i + 1, total, 95, f"Video {i+1}/{total}: Creating Shorts...")
-                    from app.editor import VideoEditor
-                    editor = VideoEditor(output_dir=video_dir)
-                    shorts = editor.create_shorts_clip(current_video, 0, 60)
-                    result['outputs']['shorts'] = shorts
-
-                result['status'] = 'success'
-                self._update(i + 1, total, 100, f"Video {i+1}/{total}: ✅ Selesai!")
-
-            except Exception as e:
-                result['status'] = 'error'
-                result['error'] = str(e)
-                self._update(i + 1, total, 100, f"Video {i+1}/{total}: ❌ Error: {e}")
+            },
+        }
+
+    # ===== STAGES =====
+    # Setiap video melewati 4 stage. Mode sequential memanggilnya berurutan,
+    # mode parallel menghubungkan stage-stage ini lewat queue.
 
+    def _job_update(self, job, pct, text):
+        self._update(job['index'], job['total'], pct,
+                     f"Video {job['index']}/{job['total']}: {text}")
+
+    def _checkpoint(self, job, step, input_value, step_options, func):
+        """
+        Jalankan satu step lewat manifest: kalau input & opsi sama dengan run
+        sebelumnya dan output-nya masih ada, step di-skip.
+        """
+        if self.manifest is None:
+            return func()
+        output, skipped = self.manifest.run_step(
+            job['result']['url'], step, input_value, step_options, func
+        )
+        if skipped:
+            job['result']['skipped_steps'].append(step)
+        return output
+
+    def _stage_download(self, job, options):
+        """Stage 1 (network): download video."""
+        self._job_update(job, 10, "Downloading...")
+        quality = options.get('resolution', 'best')
+
+        def _download():
+            from app.downloader import VideoDownloader
+            dl = VideoDownloader(output_dir=job['video_dir'])
+            return dl.download(job['result']['url'], quality=quality)
+
+        video_path = self._checkpoint(job, 'download', job['result']['url'],
+                                      {'quality': quality}, _download)
+        job['result']['outputs']['original'] = video_path
+        job['current_video'] = video_path
+
+    def _stage_encode_pre(self, job, options):
+        """Stage 2 (CPU): audio enhance, silence, speed, color grading."""
+        outputs = job['result']['outputs']
+        video_dir = job['video_dir']
+
+        if options.get('audio_enhance', False):
+            self._job_update(job, 25, "Enhancing audio...")
+            from app.editor import VideoEditor
+            editor = VideoEditor(output_dir=video_dir)
+            job['current_video'] = self._checkpoint(
+                job, 'audio_enhance', job['current_video'], {},
+                lambda: editor.enhance_audio(job['current_video'])
+            )
+            outputs['audio_enhanced'] = job['current_video']
+
+        if options.get('silence', False):
+            self._job_update(job, 35, "Removing silence...")
+            from app.editor import VideoEditor
+            editor = VideoEditor(output_dir=video_dir)
+            job['current_video'] = self._checkpoint(
+                job, 'silence', job['current_video'], {'smart_cut': True},
+                lambda: editor.remove_silence(job['current_video'], smart_cut=True)
+            )
+            outputs['no_silence'] = job['current_video']
+
+        if options.get('speed', False):
+            self._job_update(job, 45, "Adjusting speed...")
+            from app.editor import VideoEditor
+            editor = VideoEditor(output_dir=video_dir)
+            job['current_video'] = self._checkpoint(
+                job, 'speed', job['current_video'], {'speed': 1.05},
+                lambda: editor.adjust_speed(job['current_video'], speed=1.05)
+            )
+            outputs['speed_adjusted'] = job['current_video']
+
+        if options.get('color_grade'):
+            self._job_update(job, 50, "Color grading...")
+            from app.color_grading import ColorGrading
+            cg = ColorGrading(output_dir=video_dir)
+            job['current_video'] = self._checkpoint(
+                job, 'color_grade', job['current_video'], {'preset': options['color_grade']},
+                lambda: cg.apply_preset(job['current_video'], options['color_grade'])
+            )
+            outputs['color_graded'] = job['current_video']
+
+    def _stage_transcribe(self, job, options):
+        """Stage 3 (memory): transcription Whisper → file subtitle (belum di-burn)."""
+        if not options.get('subtitle', False):
+            return
+        self._job_update(job, 55, "Generating subtitles...")
+        lang = options.get('language', 'id')
+        if lang == 'auto':
+            lang = None
+        model_size = options.get('whisper_model', 'base')
+
+        def _transcribe():
+            from app.subtitler import AutoSubtitler
+            subtitler = AutoSubtitler(model_size=model_size, output_dir=job['video_dir'])
+            sub_result = subtitler.full_pipeline(job['current_video'], language=lang,
+                                                 burn_to_video=False, streaming=True)
+            return sub_result['subtitle_path']
+
+        job['subtitle_path'] = self._checkpoint(
+            job, 'subtitle', job['current_video'],
+            {'model': model_size, 'language': lang, 'streaming': True}, _transcribe
+        )
+        job['result']['outputs']['subtitle_file'] = job['subtitle_path']
+
+    def _stage_encode_post(self, job, options):
+        """Stage 4 (CPU): burn subtitle, watermark, export, thumbnail, SEO, Shorts."""
+        outputs = job['result']['outputs']
+        video_dir = job['video_dir']
+
+        if job['subtitle_path']:
+            self._job_update(job, 65, "Burning subtitles...")
+            from app.subtitler import AutoSubtitler
+            from app.manifest import input_fingerprint
+            subtitler = AutoSubtitler(output_dir=video_dir)
+            job['current_video'] = self._checkpoint(
+                job, 'subtitle_burn', job['current_video'],
+                {'subtitle': input_fingerprint(job['subtitle_path'])},
+                lambda: subtitler.burn_subtitle_to_video(job['current_video'], job['subtitle_path'])
+            )
+            outputs['subtitled'] = job['current_video']
+
+        if options.get('watermark_logo'):
+            self._job_update(job, 70, "Adding watermark...")
+            from app.watermark import WatermarkOverlay
+            from app.manifest import input_fingerprint
+            wm = WatermarkOverlay(output_dir=video_dir)
+            job['current_video'] = self._checkpoint(
+                job, 'watermark', job['current_video'],
+                {'logo': input_fingerprint(options['watermark_logo'])},
+                lambda: wm.add_image_watermark(job['current_video'], options['watermark_logo'])
+            )
+            outputs['watermarked'] = job['current_video']
+
+        if options.get('youtube_export', False):
+            self._job_update(job, 80, "Exporting...")
+            from app.editor import VideoEditor
+            editor = VideoEditor(output_dir=video_dir)
+            resolution = options.get('resolution', '1080p')
+            job['current_video'] = self._checkpoint(
+                job, 'youtube_export', job['current_video'], {'resolution': resolution},
+                lambda: editor.export_for_youtube(job['current_video'], resolution=resolution)
+            )
+            outputs['final'] = job['current_video']
+
+        if options.get('thumbnail', False):
+            self._job_update(job, 85, "Generating thumbnails...")
+            from app.thumbnail import ThumbnailGenerator
+            tg = ThumbnailGenerator(output_dir=video_dir)
+            outputs['thumbnails'] = self._checkpoint(
+                job, 'thumbnail', job['current_video'],
+                {'text': "DRAMA PENDEK", 'num_options': 3},
+                lambda: tg.batch_generate(job['current_video'], "DRAMA PENDEK", num_options=3)
+            )
+
+        if options.get('seo', False):
+            self._job_update(job, 90, "Generating SEO...")
+
+            def _seo():
+                from app.title_generator import TitleGenerator
+                tg = TitleGenerator()
+                seo = tg.generate_seo_package()
+
+                desc_path = os.path.join(video_dir, "description.txt")
+                with open(desc_path, 'w', encoding='utf-8') as f:
+                    f.write(seo['description'])
+                tags_path = os.path.join(video_dir, "tags.txt")
+                with open(tags_path, 'w', encoding='utf-8') as f:
+                    f.write("\n".join(seo['tags']))
+                return {'seo_description': desc_path, 'seo_tags': tags_path}
+
+            outputs.update(self._checkpoint(job, 'seo', job['result']['url'], {}, _seo))
+
+        if options.get('shorts', False):
+            self._job_update(job, 95, "Creating Shorts...")
+            num_shorts = options.get('shorts_count', 3)
+
+            def _shorts():
+                from app.editor import VideoEditor
+                from app.highlight_finder import HighlightFinder
+                lang = options.get('language', 'id')
+                finder = HighlightFinder(language='id' if lang == 'auto' else lang)
+                subtitle_path = job.get('subtitle_path')
+                segments = None
+                if subtitle_path and os.path.exists(subtitle_path):
+                    segments = finder.load_segments(subtitle_path)
+                highlights = finder.find(job['current_video'], k=num_shorts, segments=segments)
+                editor = VideoEditor(output_dir=video_dir)
+                return editor.create_shorts_clips(job['current_video'], highlights)
+
+            outputs['shorts'] = self._checkpoint(
+                job, 'shorts', job['current_video'],
+                {'highlights': num_shorts, 'duration': 60}, _shorts
+            )
+
+    def _stages(self):
+        """Urutan stage + limiter resource (berapa yang boleh jalan bersamaan)."""
+        encode_limiter = threading.BoundedSemaphore(self.encode_workers)
+        return [
+            (self._stage_download, self.download_workers,
+             threading.BoundedSemaphore(self.download_workers)),
+            (self._stage_encode_pre, self.encode_workers, encode_limiter),
+            (self._stage_transcribe, self.transcribe_workers,
+             threading.BoundedSemaphore(self.transcribe_workers)),
+            (self._stage_encode_post, self.encode_workers, encode_limiter),
+        ]
+
+    def _run_stage(self, stage, job, options):
+        """Jalankan satu stage untuk satu job; error menandai job gagal."""
+        if job['result']['status'] != 'processing':
+            return
+        from app.ffmpeg_util import FFmpegRunner
+        # Stage encode: tiap encode dibatasi threads_per_encode thread, jadi
+        # encode_workers encode paralel pas dengan jumlah core
+        threads = None
+        if stage in (self._stage_encode_pre, self._stage_encode_post):
+            threads = self.threads_per_encode
+        try:
+            with self.cancel_group.activate(), FFmpegRunner.limit_threads(threads):
+                stage(job, options)
+        except Exception as e:
+            job['result']['status'] = 'error'
+            job['result']['error'] = str(e)
+            self._job_update(job, 100, f"❌ Error: {e}")
+
+    def _finish_job(self, job):
+        """Tandai job selesai & update report (ditulis per video, bukan di akhir)."""
+        result = job['result']
+        if result['status'] == 'processing':
+            result['status'] = 'success'
+            self._job_update(job, 100, "✅ Selesai!")
+
+        with self._report_lock:
             self.results.append(result)
+            self.results.sort(key=lambda r: r['index'])
+            self._save_report()
 
-        # Save batch report
-        self._save_report()
-        self.is_running = False
-        return self.results
+    def _run_sequential(self, jobs, options):
+        """Satu video selesai semua step, baru video berikutnya."""
+        stages = self._stages()
+        for job in jobs:
+            if self.should_stop:
+                self._update(job['index'], job['total'], 0, "Batch processing dihentikan!")
+                break
+
+            self._job_update(job, 0, "Memulai...")
+            for stage, _, _ in stages:
+                self._run_stage(stage, job, options)
+            self._finish_job(job)
+
+    def _run_parallel(self, jobs, options):
+        """
+        Pipeline paralel: tiap stage punya worker pool sendiri, dihubungkan queue.
+        Video N+1 download sementara video N encode dan video N-1 transcribe.
+        """
+        stages = self._stages()
+        queues = [queue.Queue() for _ in range(len(stages) + 1)]
+
+        def _worker(stage, limiter, in_q, out_q):
+            while True:
+                job = in_q.get()
+                if job is None:
+                    break
+                if self.should_stop and job['result']['status'] == 'processing':
+                    job['result']['status'] = 'stopped'
+                    job['result']['error'] = "Batch processing dihentikan"
+                with limiter:
+                    self._run_stage(stage, job, options)
+                out_q.put(job)
+
+        workers = []
+        for n, (stage, num_workers, limiter) in enumerate(stages):
+            for _ in range(num_workers):
+                t = threading.Thread(
+                    target=_worker, args=(stage, limiter, queues[n], queues[n + 1]),
+                    daemon=True
+                )
+                t.start()
+                workers.append((t, queues[n]))
+
+        for job in jobs:
+            self._job_update(job, 0, "Antri...")
+            queues[0].put(job)
+
+        for _ in jobs:
+            self._finish_job(queues[-1].get())
+
+        # Semua job sudah lewat, matikan worker
+        for _, in_q in workers:
+            in_q.put(None)
+        for t, _ in workers:
+            t.join(timeout=5)
 
     def _save_report(self):
         """Save batch processing report."""
@@ -220,20 +440,25 @@ class BatchProcessor:
             'total_videos': len(self.results),
             'successful': sum(1 for r in self.results if r['status'] == 'success'),
             'failed': sum(1 for r in self.results if r['status'] == 'error'),
+            'skipped_steps': sum(len(r.get('skipped_steps', [])) for r in self.results),
             'results': self.results,
         }
-        with open(report_path, 'w', encoding='utf-8') as f:
+        # Tulis ke file sementara lalu rename, supaya report tidak korup kalau crash
+        tmp_path = report_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, report_path)
         return report_path
 
-    def process_from_file(self, file_path, options):
+    def process_from_file(self, file_path, options, parallel=False):
         """
         Proses URL dari text file (satu URL per baris).
 
         Args:
             file_path: Path ke file .txt berisi URL
             options: dict opsi optimasi
+            parallel: Proses paralel (lihat process_url_list)
         """
         with open(file_path, 'r', encoding='utf-8') as f:
             urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-        return self.process_url_list(urls, options)
+        return self.process_url_list(urls, options, parallel=parallel)
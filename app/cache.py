@@ -0,0 +1,37 @@
+"""
+Utility cache bersama — lokasi folder cache & fingerprint file.
+Dipakai oleh probe cache dan cache-cache lain di project.
+"""
+import os
+import hashlib
+
+
+def get_cache_dir(name=""):
+    """
+    Dapatkan folder cache (dibuat otomatis).
+
+    Default: <project>/temp/cache, bisa di-override dengan env YTVIDEO_CACHE_DIR.
+
+    Args:
+        name: Sub-folder di dalam cache dir (misal 'transcripts')
+    """
+    base = os.environ.get("YTVIDEO_CACHE_DIR") or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "temp", "cache"
+    )
+    path = os.path.join(base, name) if name else base
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_key(path):
+    """
+    Identitas file tanpa membaca isinya: (abs path, size, mtime_ns, inode).
+    Berubah otomatis kalau file di-overwrite / diedit.
+    """
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def file_key_hash(path):
+    """Versi string (sha1) dari file_key, cocok untuk nama file / key DB."""
+    return hashlib.sha1(repr(file_key(path)).encode('utf-8')).hexdigest()
@@ -64,7 +64,7 @@ class ChapterGenerator:
         self.labels = self.CHAPTER_LABELS.get(language, self.CHAPTER_LABELS['id'])
 
     def generate_from_transcription(self, transcription, min_chapter_duration=60,
-                                      max_chapters=8):
+                                      max_chapters=8, audio_analysis=None):
         """
         Generate chapters dari hasil transcription Whisper.
 
@@ -73,6 +73,8 @@ class ChapterGenerator:
                            {'segments': [{'start': float, 'end': float, 'text': str}]}
             min_chapter_duration: Minimum durasi per chapter (detik)
             max_chapters: Maximum jumlah chapters
+            audio_analysis: AudioAnalysis (app.audio_analysis) opsional — kalau ada,
+                            jeda dideteksi dari audio asli, bukan dari celah subtitle
 
         Returns:
             List of {'time': seconds, 'label': str}
@@ -91,7 +93,10 @@ class ChapterGenerator:
         structure_chapters = self._generate_drama_structure(total_duration)
 
         # Method 3: Silence/pause-based (long pauses = scene change)
-        pause_chapters = self._detect_by_pauses(segments, min_pause=2.0)
+        if audio_analysis is not None:
+            pause_chapters = self._detect_by_audio_pauses(audio_analysis, min_pause=2.0)
+        else:
+            pause_chapters = self._detect_by_pauses(segments, min_pause=2.0)
 
         # Merge & deduplicate
         all_chapters = keyword_chapters + structure_chapters + pause_chapters
@@ -186,6 +191,19 @@ class ChapterGenerator:
                 })
         return chapters
 
+    def _detect_by_audio_pauses(self, audio_analysis, min_pause=2.0):
+        """Detect scene changes dari silence di envelope audio (decode yang sama dengan silence removal)."""
+        chapters = []
+        for _, end in audio_analysis.silences(threshold_db=-35.0, min_duration=min_pause):
+            if end >= audio_analysis.duration - 0.5:
+                continue
+            chapters.append({
+                'time': end,
+                'label': f"Scene {len(chapters) + 2}",
+                'confidence': 0.6,
+            })
+        return chapters
+
     def _merge_chapters(self, chapters, min_duration, max_count):
         """Merge nearby chapters and limit total count."""
         if not chapters:
@@ -236,17 +254,19 @@ class ChapterGenerator:
                 lines.append(f"{mins:02d}:{secs:02d} - {ch['label']}")
         return "\n".join(lines)
 
-    def generate_from_srt(self, srt_path, min_chapter_duration=60, max_chapters=8):
+    def generate_from_srt(self, srt_path, min_chapter_duration=60, max_chapters=8,
+                          audio_analysis=None):
         """
         Generate chapters dari file SRT.
 
         Args:
             srt_path: Path ke file .srt
+            audio_analysis: AudioAnalysis opsional (lihat generate_from_transcription)
         """
         segments = self._parse_srt(srt_path)
         transcription = {'segments': segments}
         return self.generate_from_transcription(
-            transcription, min_chapter_duration, max_chapters
+            transcription, min_chapter_duration, max_chapters, audio_analysis
         )
 
     def _parse_srt(self, srt_path):
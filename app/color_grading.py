@@ -4,7 +4,7 @@ Bikin video terlihat lebih sinematik/profesional
 """
 import os
 import subprocess
-from app.ffmpeg_util import get_ffmpeg_path
+from app.ffmpeg_util import get_ffmpeg_path, FFmpegRunner
 
 
 class ColorGrading:
@@ -90,6 +90,7 @@ class ColorGrading:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         self.ffmpeg = get_ffmpeg_path()
+        self.runner = FFmpegRunner()
         self.progress_callback = None
 
     def set_progress_callback(self, callback):
@@ -99,6 +100,13 @@ class ColorGrading:
         if self.progress_callback:
             self.progress_callback(pct, text)
 
+    def _run_encode(self, cmd):
+        """Jalankan encode lewat FFmpegRunner, progress 20% → 99%."""
+        self.runner.run(
+            cmd,
+            progress_callback=lambda pct: self._update(20 + pct * 0.79, f"Color grading... {pct:.0f}%")
+        )
+
     def get_presets(self):
         """Return list of available presets."""
         return [
@@ -110,6 +118,14 @@ class ColorGrading:
             for preset_id, preset in self.PRESETS.items()
         ]
 
+    @classmethod
+    def preset_filter(cls, preset_id):
+        """Return filter string preset (validasi preset_id)."""
+        if preset_id not in cls.PRESETS:
+            available = ', '.join(cls.PRESETS.keys())
+            raise ValueError(f"Preset '{preset_id}' tidak ditemukan. Available: {available}")
+        return cls.PRESETS[preset_id]['filter']
+
     def apply_preset(self, video_path, preset_id, output_path=None):
         """
         Apply color grading preset ke video.
@@ -122,10 +138,7 @@ class ColorGrading:
         Returns:
             Path ke video output
         """
-        if preset_id not in self.PRESETS:
-            available = ', '.join(self.PRESETS.keys())
-            raise ValueError(f"Preset '{preset_id}' tidak ditemukan. Available: {available}")
-
+        vf = self.preset_filter(preset_id)
         preset = self.PRESETS[preset_id]
 
         if output_path is None:
@@ -137,15 +150,13 @@ class ColorGrading:
         cmd = [
             self.ffmpeg, '-y',
             '-i', video_path,
-            '-vf', preset['filter'],
+            '-vf', vf,
             '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
             '-c:a', 'copy',
             output_path
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"FFmpeg error: {result.stderr}")
+        self._run_encode(cmd)
 
         self._update(100, f"Color grading '{preset['name']}' berhasil!")
         return output_path
@@ -180,9 +191,7 @@ class ColorGrading:
             output_path
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"FFmpeg error: {result.stderr}")
+        self._run_encode(cmd)
 
         self._update(100, "Custom color grading berhasil!")
         return output_path
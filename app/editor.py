@@ -4,19 +4,25 @@ Menggunakan FFmpeg untuk processing video
 """
 import os
 import subprocess
-import json
-from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path
+from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path, get_media_duration, FFmpegRunner, FFmpegCancelled
+from app.probe_cache import probe
+from app.loudness import get_loudness_normalizer
 
 
 class VideoEditor:
     """Auto-edit video untuk optimasi AdSense / monetisasi YouTube."""
 
+    # Di atas jumlah segment ini, trim/concat per segment diganti satu
+    # select/aselect (graph tetap 2 filter, memori tidak naik per segment)
+    SELECT_SEGMENT_THRESHOLD = 40
+
     def __init__(self, output_dir="output"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         self.progress_callback = None
         self.ffmpeg = get_ffmpeg_path()
         self.ffprobe = get_ffprobe_path()
+        self.runner = FFmpegRunner()
 
     def set_progress_callback(self, callback):
         self.progress_callback = callback
@@ -25,49 +31,32 @@ class VideoEditor:
         if self.progress_callback:
             self.progress_callback(percent, text)
 
-    def _run_ffmpeg(self, cmd, description="Processing..."):
-        """Run FFmpeg command dengan error handling."""
+    def _run_ffmpeg(self, cmd, description="Processing...", duration=None):
+        """
+        Run FFmpeg command dengan error handling & progress real-time.
+
+        Args:
+            cmd: List command FFmpeg
+            description: Teks status
+            duration: Durasi output (detik) untuk hitung persen, None = auto
+        """
         # Replace 'ffmpeg' with actual path
         if cmd[0] == 'ffmpeg':
             cmd[0] = self.ffmpeg
         elif cmd[0] == 'ffprobe':
             cmd[0] = self.ffprobe or self.ffmpeg
         self._update_progress(50, description)
-        process = subprocess.run(cmd, capture_output=True, text=True)
-        if process.returncode != 0:
-            raise RuntimeError(f"FFmpeg error: {process.stderr}")
+        self.runner.run(
+            cmd, duration=duration,
+            progress_callback=lambda pct: self._update_progress(
+                50 + pct * 0.49, f"{description} {pct:.0f}%"
+            )
+        )
         return True
 
     def get_video_info(self, video_path):
-        """Ambil informasi detail video menggunakan ffprobe."""
-        probe_exe = self.ffprobe or self.ffmpeg
-        if self.ffprobe:
-            cmd = [
-                probe_exe, '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format', '-show_streams',
-                video_path
-            ]
-        else:
-            # Fallback: use ffmpeg -i
-            cmd = [
-                self.ffmpeg, '-i', video_path,
-                '-f', 'null', '-'
-            ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if self.ffprobe and result.returncode != 0:
-            raise RuntimeError(f"ffprobe error: {result.stderr}")
-        return json.loads(result.stdout) if self.ffprobe else self._parse_ffmpeg_info(result.stderr)
-
-    def _parse_ffmpeg_info(self, stderr_output):
-        """Parse FFmpeg -i output when ffprobe is not available."""
-        import re
-        duration = 0.0
-        duration_match = re.search(r'Duration:\s*(\d+):(\d+):(\d+)\.(\d+)', stderr_output)
-        if duration_match:
-            h, m, s, cs = duration_match.groups()
-            duration = int(h) * 3600 + int(m) * 60 + int(s) + int(cs) / 100.0
-        return {'format': {'duration': str(duration)}}
+        """Ambil informasi detail video (JSON ffprobe) lewat probe cache."""
+        return probe(video_path).raw
 
     def detect_silence(self, video_path, noise_threshold="-30dB", min_duration=2.0):
         """
@@ -84,36 +73,17 @@ class VideoEditor:
         """
         self._update_progress(20, "Mendeteksi bagian diam...")
 
-        cmd = [
-            self.ffmpeg, '-i', video_path,
-            '-af', f'silencedetect=noise={noise_threshold}:d={min_duration}',
-            '-f', 'null', '-'
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        silences = []
-        lines = result.stderr.split('\n')
-        current_start = None
-        
-        for line in lines:
-            if 'silence_start:' in line:
-                try:
-                    current_start = float(line.split('silence_start:')[1].strip().split()[0])
-                except (ValueError, IndexError):
-                    pass
-            elif 'silence_end:' in line and current_start is not None:
-                try:
-                    end = float(line.split('silence_end:')[1].strip().split()[0])
-                    silences.append((current_start, end))
-                    current_start = None
-                except (ValueError, IndexError):
-                    pass
+        # Envelope audio di-cache per file → dipakai bersama VAD & chapter
+        from app.audio_analysis import get_audio_analysis, parse_db
+        analysis = get_audio_analysis(video_path)
+        silences = analysis.silences(parse_db(noise_threshold), min_duration)
 
         self._update_progress(40, f"Ditemukan {len(silences)} bagian diam")
         return silences
 
     def remove_silence(self, video_path, output_path=None, 
-                       noise_threshold="-30dB", min_duration=2.0, padding=0.3):
+                       noise_threshold="-30dB", min_duration=2.0, padding=0.3,
+                       smart_cut=False):
         """
         Hapus bagian diam dari video secara otomatis.
         
@@ -123,6 +93,7 @@ class VideoEditor:
             noise_threshold: Threshold noise
             min_duration: Durasi minimum silence yang dihapus
             padding: Padding sebelum/sesudah cut (detik)
+            smart_cut: Stream-copy GOP utuh, re-encode hanya di batas cut
         
         Returns:
             Path ke video output
@@ -142,10 +113,54 @@ class VideoEditor:
             return output_path
 
         # Dapatkan durasi video
-        info = self.get_video_info(video_path)
-        duration = float(info['format']['duration'])
+        media = probe(video_path)
+        duration = media.duration
+
+        keep_segments = self.compute_keep_segments(silences, duration, padding, fps=media.fps)
+
+        if not keep_segments:
+            self._update_progress(100, "Tidak ada segment yang perlu dikeep")
+            return video_path
+
+        if smart_cut and self._smart_cut(video_path, keep_segments, output_path):
+            self._update_progress(100, f"Silence dihapus! Output: {output_path}")
+            return output_path
+
+        # Buat filter complex untuk concat segments
+        self._update_progress(60, f"Menggabungkan {len(keep_segments)} segment...")
+
+        filter_complex = self.segment_filter(keep_segments, '0:v', '0:a', 'outv', 'outa',
+                                             fps=media.fps)
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', video_path,
+            '-filter_complex', filter_complex,
+            '-map', '[outv]', '-map', '[outa]',
+            '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
+            '-c:a', 'aac', '-b:a', '192k',
+            output_path
+        ]
+
+        kept_duration = sum(end - start for start, end in keep_segments)
+        self._run_ffmpeg(cmd, "Menghapus silence...", duration=kept_duration)
+        self._update_progress(100, f"Silence dihapus! Output: {output_path}")
+        return output_path
+
+    def compute_keep_segments(self, silences, duration, padding=0.3, fps=None):
+        """
+        Ubah list silence jadi list segment yang DIKEEP (bukan yang dihapus).
+
+        Args:
+            silences: List of (start, end) dari detect_silence()
+            duration: Durasi total video (detik)
+            padding: Padding sebelum/sesudah cut (detik)
+            fps: Kalau diisi, batas segment dibulatkan ke grid frame supaya
+                 durasi audio & video tiap segment sama persis
 
-        # Buat segment list (bagian yang DEKEEP, bukan yang dihapus)
+        Returns:
+            List of (start, end) segment yang dipertahankan
+        """
         keep_segments = []
         current_pos = 0.0
 
@@ -160,36 +175,101 @@ class VideoEditor:
         if current_pos < duration:
             keep_segments.append((current_pos, duration))
 
-        if not keep_segments:
-            self._update_progress(100, "Tidak ada segment yang perlu dikeep")
-            return video_path
+        if fps:
+            snapped = []
+            for start, end in keep_segments:
+                start, end = round(start * fps) / fps, round(end * fps) / fps
+                if end > start:
+                    snapped.append((start, end))
+            keep_segments = snapped
 
-        # Buat filter complex untuk concat segments
-        self._update_progress(60, f"Menggabungkan {len(keep_segments)} segment...")
+        return keep_segments
+
+    def _smart_cut(self, video_path, segments, output_path):
+        """
+        Coba smart cut (stream copy per GOP). Return False kalau codec tidak
+        didukung, supaya caller fallback ke re-encode penuh.
+        """
+        from app.smart_cut import SmartCutter
+        cutter = SmartCutter(output_dir=self.output_dir)
+        if not cutter.supports(video_path) or not cutter.worthwhile(video_path, segments):
+            return False
+        cutter.set_progress_callback(self._update_progress)
+        stats = cutter.cut(video_path, segments, output_path, self.segment_filter)
+        self._update_progress(
+            99, f"Smart cut: {stats['copied']:.0f}s copy, {stats['encoded']:.0f}s encode"
+        )
+        return True
+
+    def segment_filter(self, keep_segments, video_in, audio_in, video_out, audio_out,
+                       fps=None):
+        """
+        Bangun fragment filter graph trim/concat untuk segment yang dikeep.
+        Kalau segment sangat banyak, otomatis pakai select_segment_filter.
+
+        Args:
+            keep_segments: List of (start, end)
+            video_in: Label stream video input (misal '0:v'), None = audio saja
+            audio_in: Label stream audio input (misal '0:a')
+            video_out: Label output video
+            audio_out: Label output audio
+            fps: Frame rate video (dipakai select untuk memilih frame per grid)
+
+        Returns:
+            String fragment filter_complex
+        """
+        if len(keep_segments) > self.SELECT_SEGMENT_THRESHOLD and self._is_ordered(keep_segments):
+            return self.select_segment_filter(keep_segments, video_in, audio_in,
+                                              video_out, audio_out, fps)
 
         filter_parts = []
         for i, (start, end) in enumerate(keep_segments):
+            if video_in:
+                filter_parts.append(
+                    f"[{video_in}]trim=start={start:.3f}:end={end:.3f},setpts=PTS-STARTPTS[v{i}];"
+                )
             filter_parts.append(
-                f"[0:v]trim=start={start:.3f}:end={end:.3f},setpts=PTS-STARTPTS[v{i}];"
-                f"[0:a]atrim=start={start:.3f}:end={end:.3f},asetpts=PTS-STARTPTS[a{i}];"
+                f"[{audio_in}]atrim=start={start:.3f}:end={end:.3f},asetpts=PTS-STARTPTS[a{i}];"
             )
 
-        concat_inputs = ''.join(f'[v{i}][a{i}]' for i in range(len(keep_segments)))
-        filter_complex = ''.join(filter_parts) + f"{concat_inputs}concat=n={len(keep_segments)}:v=1:a=1[outv][outa]"
+        n = len(keep_segments)
+        if video_in:
+            concat_inputs = ''.join(f'[v{i}][a{i}]' for i in range(n))
+            return ''.join(filter_parts) + f"{concat_inputs}concat=n={n}:v=1:a=1[{video_out}][{audio_out}]"
 
-        cmd = [
-            'ffmpeg', '-y',
-            '-i', video_path,
-            '-filter_complex', filter_complex,
-            '-map', '[outv]', '-map', '[outa]',
-            '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
-            '-c:a', 'aac', '-b:a', '192k',
-            output_path
-        ]
+        concat_inputs = ''.join(f'[a{i}]' for i in range(n))
+        return ''.join(filter_parts) + f"{concat_inputs}concat=n={n}:v=0:a=1[{audio_out}]"
 
-        self._run_ffmpeg(cmd, "Menghapus silence...")
-        self._update_progress(100, f"Silence dihapus! Output: {output_path}")
-        return output_path
+    @staticmethod
+    def _is_ordered(segments):
+        """select hanya bisa membuang bagian, tidak bisa menyusun ulang urutan."""
+        return all(prev[1] <= cur[0] for prev, cur in zip(segments, segments[1:]))
+
+    def select_segment_filter(self, keep_segments, video_in, audio_in, video_out, audio_out,
+                              fps=None):
+        """
+        Versi scalable dari segment_filter untuk ratusan/ribuan segment:
+        satu select/aselect dengan ekspresi between() + setpts/asetpts.
+        Graph-nya panjang → FFmpegRunner otomatis memakai -filter_complex_script.
+        """
+        def between_expr(shift=0.0):
+            # Interval setengah terbuka [start, end) supaya frame di batas tidak dobel
+            return '+'.join(
+                f"gte(t,{start - shift:.4f})*lt(t,{end - shift:.4f})"
+                for start, end in keep_segments
+            )
+
+        expr = between_expr()
+        parts = []
+        if video_in:
+            # Geser setengah frame: timestamp frame tidak persis di grid (time base)
+            video_expr = between_expr(0.5 / fps) if fps else expr
+            parts.append(f"[{video_in}]select='{video_expr}',setpts=N/FRAME_RATE/TB[{video_out}]")
+        # aselect memilih per audio frame → pecah jadi frame kecil (~4 ms di 48 kHz)
+        parts.append(
+            f"[{audio_in}]asetnsamples=n=192:p=0,aselect='{expr}',asetpts=N/SR/TB[{audio_out}]"
+        )
+        return ';'.join(parts)
 
     def add_intro(self, video_path, intro_path, output_path=None):
         """
@@ -247,7 +327,8 @@ class VideoEditor:
         self._update_progress(100, "Outro berhasil ditambahkan!")
         return output_path
 
-    def add_background_music(self, video_path, music_path, volume=0.15, output_path=None):
+    def add_background_music(self, video_path, music_path, volume=0.15, output_path=None,
+                             normalize_music=True):
         """
         Tambah background music ke video.
         
@@ -256,17 +337,25 @@ class VideoEditor:
             music_path: Path ke file musik
             volume: Volume musik (0.0 - 1.0, default 0.15 = 15%)
             output_path: Path video output
+            normalize_music: Samakan loudness musik dulu (loudnorm linear, cache)
+                             supaya `volume` konsisten untuk file musik apa pun
         """
         if output_path is None:
             base = os.path.splitext(os.path.basename(video_path))[0]
             output_path = os.path.join(self.output_dir, f"{base}_with_music.mp4")
 
+        music_chain = f'volume={volume}'
+        if normalize_music:
+            music_chain = get_loudness_normalizer().linear_filter(
+                music_path, runner=self.runner
+            ) + ',' + music_chain
+
         cmd = [
             'ffmpeg', '-y',
             '-i', video_path,
             '-i', music_path,
             '-filter_complex',
-            f'[1:a]volume={volume},aloop=loop=-1:size=2e+09[music];'
+            f'[1:a]{music_chain},aloop=loop=-1:size=2e+09[music];'
             f'[0:a][music]amix=inputs=2:duration=first:dropout_transition=3[aout]',
             '-map', '0:v', '-map', '[aout]',
             '-c:v', 'copy',
@@ -279,6 +368,20 @@ class VideoEditor:
         self._update_progress(100, "Background music berhasil ditambahkan!")
         return output_path
 
+    def enhance_audio_filter(self, video_path=None):
+        """
+        Filter chain audio enhance (loudnorm + highpass/lowpass).
+
+        Args:
+            video_path: Kalau diisi, loudness file ini diukur dulu (cache) lalu
+                        loudnorm dipakai dalam mode linear; None = mode dinamis
+        """
+        if video_path:
+            loudnorm = get_loudness_normalizer().linear_filter(video_path, runner=self.runner)
+        else:
+            loudnorm = 'loudnorm=I=-16:TP=-1.5:LRA=11'
+        return f'{loudnorm},highpass=f=80,lowpass=f=12000'
+
     def enhance_audio(self, video_path, output_path=None):
         """
         Enhance audio: normalize volume, reduce noise ringan.
@@ -288,10 +391,15 @@ class VideoEditor:
             base = os.path.splitext(os.path.basename(video_path))[0]
             output_path = os.path.join(self.output_dir, f"{base}_enhanced_audio.mp4")
 
+        # Pass 1: ukur loudness (audio only, hasil di-cache per file: path, size, mtime)
+        self._update_progress(20, "Mengukur loudness audio...")
+        audio_filter = self.enhance_audio_filter(video_path)
+
+        # Pass 2: loudnorm linear (gain tetap, tanpa pumping)
         cmd = [
             'ffmpeg', '-y',
             '-i', video_path,
-            '-af', 'loudnorm=I=-16:TP=-1.5:LRA=11,highpass=f=80,lowpass=f=12000',
+            '-af', audio_filter,
             '-c:v', 'copy',
             '-c:a', 'aac', '-b:a', '192k',
             output_path
@@ -301,6 +409,23 @@ class VideoEditor:
         self._update_progress(100, "Audio berhasil di-enhance!")
         return output_path
 
+    def speed_filters(self, speed=1.05):
+        """
+        Filter setpts/atempo untuk perubahan kecepatan.
+
+        Returns:
+            Tuple (video_filter, audio_filter)
+        """
+        audio_tempo = speed
+        # FFmpeg atempo hanya support 0.5-2.0
+        if audio_tempo < 0.5:
+            audio_tempo = 0.5
+        elif audio_tempo > 2.0:
+            audio_tempo = 2.0
+
+        video_pts = 1.0 / speed
+        return f'setpts={video_pts:.4f}*PTS', f'atempo={audio_tempo:.4f}'
+
     def adjust_speed(self, video_path, speed=1.05, output_path=None):
         """
         Adjust kecepatan video sedikit (misal 1.05x).
@@ -313,31 +438,26 @@ class VideoEditor:
             base = os.path.splitext(os.path.basename(video_path))[0]
             output_path = os.path.join(self.output_dir, f"{base}_speed{speed}x.mp4")
 
-        audio_tempo = speed
-        # FFmpeg atempo hanya support 0.5-2.0
-        if audio_tempo < 0.5:
-            audio_tempo = 0.5
-        elif audio_tempo > 2.0:
-            audio_tempo = 2.0
-
-        video_pts = 1.0 / speed
+        video_filter, audio_filter = self.speed_filters(speed)
 
         cmd = [
             'ffmpeg', '-y',
             '-i', video_path,
             '-filter_complex',
-            f'[0:v]setpts={video_pts:.4f}*PTS[v];[0:a]atempo={audio_tempo:.4f}[a]',
+            f'[0:v]{video_filter}[v];[0:a]{audio_filter}[a]',
             '-map', '[v]', '-map', '[a]',
             '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
             '-c:a', 'aac', '-b:a', '192k',
             output_path
         ]
 
-        self._run_ffmpeg(cmd, f"Adjusting speed ke {speed}x...")
+        out_duration = get_media_duration(video_path) / speed
+        self._run_ffmpeg(cmd, f"Adjusting speed ke {speed}x...", duration=out_duration or None)
         self._update_progress(100, f"Speed berhasil diubah ke {speed}x!")
         return output_path
 
-    def create_hook_cut(self, video_path, hook_start, hook_end, output_path=None):
+    def create_hook_cut(self, video_path, hook_start, hook_end, output_path=None,
+                        smart_cut=False):
         """
         Pindahkan scene paling menarik ke awal video (hook).
         Penting untuk retention rate dan AdSense!
@@ -346,6 +466,7 @@ class VideoEditor:
             video_path: Path ke video
             hook_start: Waktu mulai scene hook (detik)
             hook_end: Waktu akhir scene hook (detik)
+            smart_cut: Stream-copy GOP utuh, re-encode hanya di batas cut
         """
         if output_path is None:
             base = os.path.splitext(os.path.basename(video_path))[0]
@@ -354,6 +475,13 @@ class VideoEditor:
         info = self.get_video_info(video_path)
         duration = float(info['format']['duration'])
 
+        if smart_cut:
+            segments = [(hook_start, hook_end), (0.0, hook_start), (hook_end, duration)]
+            segments = [(start, end) for start, end in segments if end - start > 0.01]
+            if self._smart_cut(video_path, segments, output_path):
+                self._update_progress(100, "Hook cut berhasil dibuat!")
+                return output_path
+
         # Segment: hook + before_hook + after_hook
         filter_complex = (
             f"[0:v]trim=start={hook_start}:end={hook_end},setpts=PTS-STARTPTS[hookv];"
@@ -379,15 +507,13 @@ class VideoEditor:
         self._update_progress(100, "Hook cut berhasil dibuat!")
         return output_path
 
-    def export_for_youtube(self, video_path, output_path=None, resolution="1080p"):
-        """
-        Export video dengan settings optimal untuk YouTube.
-        Bitrate, codec, dan format yang direkomendasikan YouTube.
+    def youtube_export_settings(self, resolution="1080p"):
         """
-        if output_path is None:
-            base = os.path.splitext(os.path.basename(video_path))[0]
-            output_path = os.path.join(self.output_dir, f"{base}_youtube_ready.mp4")
+        Filter scale/pad dan encoder args yang direkomendasikan YouTube.
 
+        Returns:
+            Tuple (video_filter, encode_args)
+        """
         res_map = {
             '2160p': ('3840', '2160', '40M'),
             '1440p': ('2560', '1440', '24M'),
@@ -397,22 +523,51 @@ class VideoEditor:
 
         width, height, bitrate = res_map.get(resolution, res_map['1080p'])
 
-        cmd = [
-            'ffmpeg', '-y',
-            '-i', video_path,
-            '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
-                   f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2',
+        vf = (
+            f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
+            f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2'
+        )
+        encode_args = [
             '-c:v', 'libx264', '-preset', 'slow', '-b:v', bitrate,
             '-c:a', 'aac', '-b:a', '320k', '-ar', '48000',
             '-movflags', '+faststart',
             '-pix_fmt', 'yuv420p',
-            output_path
         ]
+        return vf, encode_args
+
+    def export_for_youtube(self, video_path, output_path=None, resolution="1080p"):
+        """
+        Export video dengan settings optimal untuk YouTube.
+        Bitrate, codec, dan format yang direkomendasikan YouTube.
+        """
+        if output_path is None:
+            base = os.path.splitext(os.path.basename(video_path))[0]
+            output_path = os.path.join(self.output_dir, f"{base}_youtube_ready.mp4")
+
+        vf, encode_args = self.youtube_export_settings(resolution)
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', video_path,
+            '-vf', vf,
+        ] + encode_args + [output_path]
 
         self._run_ffmpeg(cmd, f"Exporting untuk YouTube ({resolution})...")
         self._update_progress(100, f"Video YouTube-ready berhasil di-export!")
         return output_path
 
+    def _shorts_filter(self, video_path, start_time, duration):
+        """Crop 9:16 mengikuti subjek (analisa di-cache per video), fallback center crop."""
+        try:
+            from app.smart_crop import get_crop_analysis
+            self._update_progress(5, "Analisa posisi subjek...")
+            vf = get_crop_analysis(video_path).crop_filter(1080, 1920, start_time, duration)
+        except FFmpegCancelled:
+            raise
+        except (RuntimeError, ValueError, OSError):
+            vf = None
+        return vf or 'crop=ih*(9/16):ih,scale=1080:1920'
+
     def create_shorts_clip(self, video_path, start_time, end_time, output_path=None):
         """
         Buat YouTube Shorts clip dari video (vertikal 9:16, max 60 detik).
@@ -431,10 +586,10 @@ class VideoEditor:
 
         cmd = [
             'ffmpeg', '-y',
-            '-i', video_path,
             '-ss', str(start_time),
+            '-i', video_path,
             '-t', str(duration),
-            '-vf', 'crop=ih*(9/16):ih,scale=1080:1920',
+            '-vf', self._shorts_filter(video_path, start_time, duration),
             '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
             '-c:a', 'aac', '-b:a', '192k',
             output_path
@@ -443,3 +598,49 @@ class VideoEditor:
         self._run_ffmpeg(cmd, "Membuat Shorts clip...")
         self._update_progress(100, "Shorts clip berhasil dibuat!")
         return output_path
+
+    def create_shorts_clips(self, video_path, highlights, output_prefix=None):
+        """
+        Buat beberapa Shorts sekaligus dalam SATU job FFmpeg: tiap highlight
+        jadi input sendiri (-ss/-t), jadi hanya rentang yang dipakai yang
+        di-decode, masing-masing sekali.
+
+        Args:
+            video_path: Path ke video
+            highlights: List of {'start', 'end'} (misal dari HighlightFinder.find)
+            output_prefix: Prefix nama file (default <nama video>_shorts)
+
+        Returns:
+            List path Shorts, urut sesuai highlights
+        """
+        if not highlights:
+            return []
+        if output_prefix is None:
+            output_prefix = f"{os.path.splitext(os.path.basename(video_path))[0]}_shorts"
+        has_audio = probe(video_path).has_audio
+
+        cmd = ['ffmpeg', '-y']
+        filters, outputs, durations = [], [], []
+        for i, item in enumerate(highlights):
+            duration = min(item['end'] - item['start'], 60)
+            durations.append(duration)
+            cmd += ['-ss', str(item['start']), '-t', str(duration), '-i', video_path]
+            vf = self._shorts_filter(video_path, item['start'], duration)
+            filters.append(f"[{i}:v:0]{vf}[v{i}]")
+
+        cmd += ['-filter_complex', ';'.join(filters)]
+        for i in range(len(highlights)):
+            output_path = os.path.join(self.output_dir, f"{output_prefix}_{i + 1}.mp4")
+            outputs.append(output_path)
+            cmd += ['-map', f"[v{i}]"]
+            if has_audio:
+                cmd += ['-map', f"{i}:a:0"]
+            cmd += [
+                '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
+                '-c:a', 'aac', '-b:a', '192k',
+                output_path
+            ]
+
+        self._run_ffmpeg(cmd, f"Membuat {len(outputs)} Shorts clip...", duration=max(durations))
+        self._update_progress(100, f"{len(outputs)} Shorts clip berhasil dibuat!")
+        return outputs
@@ -1,9 +1,20 @@
 """
 Utility untuk mendapatkan path FFmpeg.
 Menggunakan imageio_ffmpeg yang sudah include FFmpeg binary.
+
+Juga berisi FFmpegRunner — runner bersama untuk semua modul dengan
+progress real-time (-progress pipe:1), timeout, dan cancel.
 """
+import re
+import math
 import shutil
 import os
+import time
+import tempfile
+import threading
+import subprocess
+from collections import deque
+from contextlib import contextmanager
 
 
 def get_ffmpeg_path():
@@ -57,6 +68,555 @@ def get_ffprobe_path():
     return None
 
 
+def get_media_duration(media_path):
+    """Durasi media (detik) lewat probe cache bersama, 0.0 kalau gagal."""
+    from app.probe_cache import probe
+    try:
+        return probe(media_path).duration
+    except Exception:
+        return 0.0
+
+
+def iter_audio_pcm(media_path, sample_rate=16000, channels=1, chunk_bytes=1 << 16,
+                   start=None, duration=None, tap_filter=None, tap_log=None):
+    """
+    Decode audio stream pertama jadi PCM s16le lewat pipe, per chunk.
+    Tidak pernah menampung seluruh audio di memori.
+
+    Args:
+        start: Mulai dari detik ke- (None = dari awal)
+        duration: Durasi yang di-decode (None = sampai habis)
+        tap_filter: Filter analisa (misal loudnorm print_format=json) yang
+                    dijalankan di decode yang sama, pada audio asli (sebelum resample)
+        tap_log: List yang diisi baris log terakhir FFmpeg setelah selesai
+                 (untuk membaca hasil tap_filter)
+
+    Yields:
+        bytes (panjang kelipatan 2*channels, kecuali mungkin chunk terakhir)
+    """
+    cmd = [get_ffmpeg_path(), '-v', 'info' if tap_filter else 'error', '-nostdin', '-nostats']
+    if start:
+        cmd += ['-ss', f"{start:.3f}"]
+    cmd += ['-i', media_path]
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+    if tap_filter:
+        cmd += [
+            '-filter_complex', f"[0:a:0]asplit=2[pcm][tap];[tap]{tap_filter}[tapout]",
+            '-map', '[pcm]', '-ac', str(channels), '-ar', str(sample_rate),
+            '-f', 's16le', 'pipe:1',
+            '-map', '[tapout]', '-f', 'null', '-'
+        ]
+    else:
+        cmd += [
+            '-map', '0:a:0', '-vn', '-ac', str(channels), '-ar', str(sample_rate),
+            '-f', 's16le', 'pipe:1'
+        ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stderr_buf = deque(maxlen=50)
+
+    def _read_stderr():
+        for line in process.stderr:
+            stderr_buf.append(line.decode('utf-8', errors='replace').rstrip('\n'))
+
+    reader = threading.Thread(target=_read_stderr, daemon=True)
+    reader.start()
+    try:
+        while True:
+            chunk = process.stdout.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        # Consumer berhenti lebih awal (generator di-close) → matikan FFmpeg
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+        reader.join(timeout=5)
+
+    if process.returncode != 0:
+        raise RuntimeError("FFmpeg error: " + '\n'.join(stderr_buf))
+    if tap_log is not None:
+        tap_log.extend(stderr_buf)
+
+
+def video_frame_size(media_path, width=None):
+    """
+    Ukuran frame (w, h) yang dihasilkan iter_video_frames.
+
+    Args:
+        width: Lebar target (None / lebih besar dari sumber = ukuran asli),
+               tinggi mengikuti aspect ratio, keduanya dibulatkan genap
+    """
+    from app.probe_cache import probe
+    info = probe(media_path)
+    src_w, src_h = info.width, info.height
+    if not src_w or not src_h:
+        raise RuntimeError(f"Tidak ada video stream: {media_path}")
+
+    # FFmpeg auto-rotate: video portrait dari HP disimpan landscape + rotation
+    stream = info.video_stream or {}
+    rotation = stream.get('tags', {}).get('rotate')
+    for side_data in stream.get('side_data_list', []):
+        rotation = side_data.get('rotation', rotation)
+    try:
+        if abs(int(float(rotation or 0))) % 180 == 90:
+            src_w, src_h = src_h, src_w
+    except ValueError:
+        pass
+
+    if not width or width >= src_w:
+        width = src_w
+    width = max(2, width - width % 2)
+    height = max(2, int(round(src_h * width / src_w / 2)) * 2)
+    return width, height
+
+
+def _distinct_frame_times(media_path, wanted, keyframes_only=False):
+    """
+    Buang timestamp (urut) yang frame pertamanya pada/setelahnya sama dengan
+    timestamp sebelumnya: grid 1/fps, atau daftar keyframe kalau keyframes_only.
+    """
+    from app.probe_cache import probe
+    frame_index = None
+    if keyframes_only:
+        try:
+            import bisect
+            from app.smart_cut import SmartCutter
+            keyframes = SmartCutter().get_keyframes(media_path) if get_ffprobe_path() else []
+            if keyframes:
+                frame_index = lambda t: bisect.bisect_left(keyframes, t - 1e-6)
+        except (RuntimeError, OSError, ValueError):
+            frame_index = None
+    if frame_index is None:
+        try:
+            fps = probe(media_path).fps
+        except Exception:
+            fps = 0.0
+        if fps <= 0:
+            return wanted
+        frame_index = lambda t: math.ceil(t * fps - 1e-3)
+
+    distinct, seen = [], set()
+    for t in wanted:
+        index = frame_index(t)
+        if index not in seen:
+            seen.add(index)
+            distinct.append(t)
+    return distinct
+
+
+def iter_video_frames(media_path, width=None, fps=None, timestamps=None,
+                      keyframes_only=False, seek=False):
+    """
+    Decode video jadi frame RGB24 mentah lewat pipe — satu proses FFmpeg,
+    tanpa round trip JPEG.
+
+    Args:
+        width: Lebar output (scale saat decode, lihat video_frame_size)
+        fps: Ambil frame dengan rate ini (misal 2 untuk scoring)
+        timestamps: List detik; untuk tiap timestamp diambil frame pertama
+                    pada/ setelahnya (filter select). Mengabaikan fps.
+        keyframes_only: Decoder hanya decode keyframe (-skip_frame nokey),
+                        jauh lebih murah untuk kandidat thumbnail / scoring
+        seek: Untuk sedikit timestamp di video panjang — tiap timestamp jadi
+              input sendiri dengan -ss (seek akurat), tanpa decode seluruh video
+
+    Yields:
+        (pts_time, bytes) — bytes panjang w*h*3, w/h dari video_frame_size
+    """
+    w, h = video_frame_size(media_path, width)
+    frame_bytes = w * h * 3
+    scale = f"scale={w}:{h}:flags=area"
+
+    wanted = None
+    if timestamps:
+        wanted = sorted({round(float(t), 3) for t in timestamps})
+
+    cmd = [get_ffmpeg_path(), '-hide_banner', '-nostdin', '-loglevel', 'info']
+    if wanted and seek:
+        # Satu frame per input, disambung jadi satu stream rawvideo
+        parts = []
+        for i, t in enumerate(wanted):
+            cmd += ['-ss', f"{t:.3f}", '-i', media_path]
+            parts.append(f"[{i}:v:0]trim=end_frame=1,setpts=PTS-STARTPTS,{scale}[f{i}]")
+        labels = ''.join(f"[f{i}]" for i in range(len(wanted)))
+        graph = ';'.join(parts) + f";{labels}concat=n={len(wanted)}:v=1:a=0,showinfo[out]"
+        cmd += [
+            '-filter_complex', graph, '-map', '[out]', '-vsync', '0',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1'
+        ]
+    else:
+        filters = []
+        if wanted:
+            # Timestamp yang jatuh ke frame yang sama cukup satu, supaya
+            # jumlah frame untuk berhenti lebih awal benar-benar tercapai
+            wanted = _distinct_frame_times(media_path, wanted, keyframes_only)
+            # Frame pertama dengan t >= Ti yang belum terwakili frame sebelumnya
+            terms = '+'.join(
+                f"gte(t,{t})*(isnan(prev_selected_t)+lt(prev_selected_t,{t}))"
+                for t in wanted
+            )
+            filters.append(f"select='{terms}'")
+        elif fps:
+            filters.append(f"fps={fps}")
+        filters += [scale, "showinfo"]
+
+        if keyframes_only:
+            cmd += ['-skip_frame', 'nokey']
+        cmd += [
+            '-i', media_path, '-map', '0:v:0', '-an', '-sn', '-dn',
+            '-vf', ','.join(filters), '-vsync', '0',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1'
+        ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    pts_pattern = re.compile(r'Parsed_showinfo.*\bn:\s*(\d+)\s+pts:\s*\S+\s+pts_time:\s*([-\d.eE+]+)')
+    pts_times = []
+    stderr_buf = deque(maxlen=50)
+    cond = threading.Condition()
+
+    def _read_stderr():
+        for raw in process.stderr:
+            line = raw.decode('utf-8', errors='replace').rstrip('\n')
+            match = pts_pattern.search(line)
+            if match:
+                with cond:
+                    pts_times.append(float(match.group(2)))
+                    cond.notify_all()
+            else:
+                stderr_buf.append(line)
+        with cond:
+            pts_times.append(None)      # penanda EOF stderr
+            cond.notify_all()
+
+    reader = threading.Thread(target=_read_stderr, daemon=True)
+    reader.start()
+    count = 0
+    killed = False
+    try:
+        while True:
+            data = process.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                break
+            with cond:
+                cond.wait_for(lambda: len(pts_times) > count, timeout=10)
+                pts = pts_times[count] if len(pts_times) > count else None
+            if wanted and seek:
+                # Setelah concat pts mulai dari 0 — pakai timestamp seek-nya
+                pts = wanted[count] if count < len(wanted) else pts
+            yield pts, data
+            count += 1
+            # Semua timestamp sudah dapat → tidak perlu decode sisa video
+            if wanted and count >= len(wanted):
+                break
+    finally:
+        # Consumer berhenti lebih awal / semua frame sudah dapat → matikan FFmpeg
+        if process.poll() is None:
+            killed = True
+            process.kill()
+        process.stdout.close()
+        process.wait()
+        reader.join(timeout=5)
+
+    if process.returncode != 0 and not killed:
+        raise RuntimeError("FFmpeg error: " + '\n'.join(stderr_buf))
+
+
+class FFmpegCancelled(RuntimeError):
+    """FFmpeg job dihentikan lewat cancel()."""
+
+
+class FFmpegTimeout(RuntimeError):
+    """FFmpeg job melewati batas waktu (wall-clock)."""
+
+
+class CancelGroup:
+    """
+    Grup cancel untuk satu operasi (misal satu batch run).
+
+    Job FFmpegRunner yang jalan di dalam `with group.activate():` (di thread
+    yang sama) ikut grup ini: cancel() menghentikan job yang sedang jalan DAN
+    job berikutnya sampai reset(), jadi cancel di antara dua step tidak hilang.
+    Job di luar grup (misal GUI) tidak terpengaruh.
+    """
+
+    _current = threading.local()
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Hentikan job grup ini yang sedang jalan dan yang berikutnya."""
+        self._event.set()
+
+    def reset(self):
+        """Mulai operasi baru (cancel sebelumnya dilupakan)."""
+        self._event.clear()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    @classmethod
+    def current(cls):
+        """Grup aktif di thread ini (None kalau tidak ada)."""
+        return getattr(cls._current, 'group', None)
+
+    @contextmanager
+    def activate(self):
+        """Job FFmpeg di thread ini (selama blok with) masuk grup ini."""
+        previous = CancelGroup.current()
+        CancelGroup._current.group = self
+        try:
+            yield self
+        finally:
+            CancelGroup._current.group = previous
+
+
+class FFmpegRunner:
+    """
+    Jalankan FFmpeg dengan progress real-time, timeout, dan cancel.
+
+    - Progress dibaca dari `-progress pipe:1` (out_time_ms) lalu di-map ke
+      persen terhadap durasi input yang di-probe.
+    - Stderr disimpan di ring buffer (hanya N baris terakhir), jadi log
+      filter yang verbose tidak menumpuk di RAM.
+    - cancel() bisa dipanggil dari thread lain dan berlaku sampai reset():
+      job yang sedang jalan dihentikan, job berikutnya langsung batal.
+    - Job juga ikut CancelGroup yang aktif di thread pemanggil (lihat
+      CancelGroup.activate); cancel_all() menghentikan semua job di proses ini.
+    """
+
+    _active = set()
+    _active_lock = threading.Lock()
+    _thread_limit = threading.local()
+
+    # Filter graph lebih panjang dari ini ditulis ke file (-filter_complex_script)
+    # supaya tidak melewati batas panjang command line OS
+    MAX_INLINE_FILTER = 8000
+
+    def __init__(self, stderr_lines=200, timeout=None):
+        """
+        Args:
+            stderr_lines: Jumlah baris stderr terakhir yang disimpan
+            timeout: Default batas waktu per job (detik), None = tanpa batas
+        """
+        self.stderr_lines = stderr_lines
+        self.timeout = timeout
+        self.ffmpeg = get_ffmpeg_path()
+        self._cancel_event = threading.Event()
+        self._group = None
+        self._process = None
+        self.stderr_tail = ""
+
+    def cancel(self):
+        """Hentikan job yang sedang berjalan dan job berikutnya (sampai reset())."""
+        self._cancel_event.set()
+
+    def reset(self):
+        """Hapus status cancel (dipanggil owner saat memulai operasi baru)."""
+        self._cancel_event.clear()
+
+    @property
+    def cancelled(self):
+        group = self._group or CancelGroup.current()
+        return self._cancel_event.is_set() or (group is not None and group.cancelled)
+
+    @classmethod
+    def cancel_all(cls):
+        """Cancel semua FFmpegRunner yang sedang aktif (berlaku sampai reset() masing-masing)."""
+        with cls._active_lock:
+            runners = list(cls._active)
+        for runner in runners:
+            runner.cancel()
+
+    @classmethod
+    @contextmanager
+    def limit_threads(cls, threads):
+        """
+        Batasi thread encoder video (-threads) untuk semua job di thread ini
+        selama blok with — supaya N encode paralel tidak masing-masing
+        memakai semua core. None = tanpa batas.
+        """
+        previous = getattr(cls._thread_limit, 'threads', None)
+        cls._thread_limit.threads = threads
+        try:
+            yield
+        finally:
+            cls._thread_limit.threads = previous
+
+    @classmethod
+    def _apply_thread_limit(cls, cmd):
+        """Sisipkan -threads N setelah tiap -c:v <encoder> (bukan copy)."""
+        threads = getattr(cls._thread_limit, 'threads', None)
+        if not threads:
+            return cmd
+        limited = []
+        i = 0
+        while i < len(cmd):
+            limited.append(cmd[i])
+            if cmd[i] in ('-c:v', '-vcodec') and i + 1 < len(cmd):
+                limited.append(cmd[i + 1])
+                if cmd[i + 1] != 'copy':
+                    limited += ['-threads', str(threads)]
+                i += 1
+            i += 1
+        return limited
+
+    def _guess_duration(self, cmd):
+        """Tebak durasi output dari command: -t, atau durasi input pertama."""
+        duration = None
+        for i, arg in enumerate(cmd[:-1]):
+            if arg == '-t':
+                try:
+                    duration = float(cmd[i + 1])
+                except ValueError:
+                    pass
+        if duration:
+            return duration
+
+        for i, arg in enumerate(cmd[:-1]):
+            if arg == '-i':
+                if i >= 2 and cmd[i - 2] == '-f' and cmd[i - 1] == 'lavfi':
+                    return None
+                input_path = cmd[i + 1]
+                if not os.path.exists(input_path):
+                    return None
+                total = get_media_duration(input_path)
+                # -ss sebelum -i memotong awal input
+                if i >= 2 and cmd[i - 2] == '-ss':
+                    try:
+                        total -= float(cmd[i - 1])
+                    except ValueError:
+                        pass
+                return total if total > 0 else None
+        return None
+
+    def run(self, cmd, duration=None, progress_callback=None, timeout=None):
+        """
+        Jalankan command FFmpeg.
+
+        Args:
+            cmd: List command ('ffmpeg' di cmd[0] otomatis diganti path asli)
+            duration: Durasi output (detik) untuk hitung persen, None = auto-probe
+            progress_callback: callback(percent) dengan percent 0-100
+            timeout: Batas waktu job ini (detik), None = pakai default runner
+
+        Returns:
+            String stderr (N baris terakhir)
+        """
+        cmd = list(cmd)
+        if cmd[0] == 'ffmpeg':
+            cmd[0] = self.ffmpeg
+        cmd = [cmd[0], '-hide_banner', '-nostats', '-progress', 'pipe:1'] + cmd[1:]
+        cmd = self._apply_thread_limit(cmd)
+
+        if timeout is None:
+            timeout = self.timeout
+        if progress_callback and duration is None:
+            duration = self._guess_duration(cmd)
+
+        cmd, script_path = self._externalize_filter(cmd)
+        try:
+            return self._run(cmd, duration, progress_callback, timeout)
+        finally:
+            if script_path:
+                os.remove(script_path)
+
+    def _externalize_filter(self, cmd):
+        """-filter_complex yang terlalu panjang → file script sementara."""
+        for i, arg in enumerate(cmd[:-1]):
+            if arg == '-filter_complex' and len(cmd[i + 1]) > self.MAX_INLINE_FILTER:
+                fd, script_path = tempfile.mkstemp(prefix="ffgraph_", suffix=".txt")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(cmd[i + 1])
+                return cmd[:i] + ['-filter_complex_script', script_path] + cmd[i + 2:], script_path
+        return cmd, None
+
+    def _run(self, cmd, duration, progress_callback, timeout):
+        stderr_buf = deque(maxlen=self.stderr_lines)
+        group = CancelGroup.current()
+        # Cancel yang datang di antara dua job tetap berlaku
+        if self._cancel_event.is_set() or (group is not None and group.cancelled):
+            raise FFmpegCancelled("FFmpeg dibatalkan")
+
+        process = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace'
+        )
+        self._process = process
+        self._group = group
+        with self._active_lock:
+            self._active.add(self)
+
+        def _read_stderr():
+            for line in process.stderr:
+                stderr_buf.append(line.rstrip('\n'))
+
+        def _read_progress():
+            last_pct = -1
+            for line in process.stdout:
+                key, _, value = line.strip().partition('=')
+                if not progress_callback:
+                    continue
+                if key in ('out_time_ms', 'out_time_us') and duration:
+                    try:
+                        # out_time_ms sebenarnya dalam mikrodetik
+                        seconds = int(value) / 1_000_000
+                    except ValueError:
+                        continue
+                    pct = max(0.0, min(99.0, seconds / duration * 100))
+                    if int(pct) != last_pct:
+                        last_pct = int(pct)
+                        progress_callback(pct)
+                elif key == 'progress' and value == 'end':
+                    progress_callback(100.0)
+
+        readers = [
+            threading.Thread(target=_read_stderr, daemon=True),
+            threading.Thread(target=_read_progress, daemon=True),
+        ]
+        for t in readers:
+            t.start()
+
+        start = time.monotonic()
+        reason = None
+        try:
+            while process.poll() is None:
+                if self.cancelled:
+                    reason = 'cancel'
+                elif timeout and time.monotonic() - start > timeout:
+                    reason = 'timeout'
+                if reason:
+                    process.terminate()
+                    try:
+                        process.wait(timeout=5)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+                        process.wait()
+                    break
+                time.sleep(0.1)
+        finally:
+            for t in readers:
+                t.join(timeout=5)
+            with self._active_lock:
+                self._active.discard(self)
+            self._process = None
+            self._group = None
+
+        self.stderr_tail = '\n'.join(stderr_buf)
+
+        if reason == 'cancel':
+            raise FFmpegCancelled("FFmpeg dibatalkan")
+        if reason == 'timeout':
+            raise FFmpegTimeout(f"FFmpeg timeout setelah {timeout} detik\n{self.stderr_tail}")
+        if process.returncode != 0:
+            raise RuntimeError(f"FFmpeg error: {self.stderr_tail}")
+        return self.stderr_tail
+
+
 # Test saat import
 if __name__ == "__main__":
     try:
@@ -0,0 +1,216 @@
+"""
+Modul Frame Scorer - Nilai kualitas frame untuk thumbnail (NumPy, vectorized)
+Video di-decode sekali dalam resolusi kecil (misal 2 fps @ 320 px), tiap frame
+dinilai: ketajaman (variance Laplacian), exposure, colorfulness, skin tone
+(indikasi wajah), dan jarak dari pergantian scene. Hanya pemenang yang
+kemudian diambil dalam resolusi penuh.
+"""
+import heapq
+import numpy as np
+from app.ffmpeg_util import iter_video_frames, video_frame_size
+
+
+# Bobot skor akhir
+DEFAULT_WEIGHTS = {
+    'sharpness': 0.35,
+    'exposure': 0.20,
+    'colorfulness': 0.15,
+    'skin': 0.15,
+    'scene': 0.15,
+}
+
+
+class FrameScorer:
+    """Scoring frame video untuk memilih kandidat thumbnail terbaik."""
+
+    def __init__(self, fps=2.0, width=320, batch_size=64, weights=None):
+        """
+        Args:
+            fps: Rate sampling frame untuk scoring
+            width: Lebar frame saat scoring (decode di-scale)
+            batch_size: Jumlah frame yang dinilai sekaligus (batas memori)
+            weights: dict bobot (default DEFAULT_WEIGHTS)
+        """
+        self.fps = fps
+        self.width = width
+        self.batch_size = batch_size
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+
+    # ===== FITUR PER BATCH (B, H, W, 3) =====
+
+    @staticmethod
+    def _luma(frames):
+        return frames[..., 0] * 0.299 + frames[..., 1] * 0.587 + frames[..., 2] * 0.114
+
+    @staticmethod
+    def sharpness(gray):
+        """Variance Laplacian (4-neighbour) per frame, di-map ke 0-1."""
+        lap = (
+            gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] + gray[:, 1:-1, :-2] + gray[:, 1:-1, 2:]
+            - 4.0 * gray[:, 1:-1, 1:-1]
+        )
+        var = lap.reshape(len(gray), -1).var(axis=1)
+        return np.clip(np.log1p(var) / np.log1p(2000.0), 0.0, 1.0)
+
+    @staticmethod
+    def exposure(gray):
+        """Rata-rata luma dekat tengah & sedikit piksel clipping hitam/putih."""
+        flat = gray.reshape(len(gray), -1)
+        mean = flat.mean(axis=1) / 255.0
+        clipped = ((flat < 16) | (flat > 240)).mean(axis=1)
+        return np.clip(1.0 - np.abs(mean - 0.5) * 2.0, 0.0, 1.0) * (1.0 - clipped)
+
+    @staticmethod
+    def colorfulness(frames):
+        """Metrik colorfulness Hasler & Süsstrunk, di-map ke 0-1."""
+        r, g, b = frames[..., 0], frames[..., 1], frames[..., 2]
+        rg = (r - g).reshape(len(frames), -1)
+        yb = (0.5 * (r + g) - b).reshape(len(frames), -1)
+        std = np.sqrt(rg.var(axis=1) + yb.var(axis=1))
+        mean = np.sqrt(rg.mean(axis=1) ** 2 + yb.mean(axis=1) ** 2)
+        return np.clip((std + 0.3 * mean) / 100.0, 0.0, 1.0)
+
+    @staticmethod
+    def skin_mask(frames):
+        """Mask piksel skin tone (aturan YCbCr), shape (..., H, W)."""
+        r, g, b = frames[..., 0], frames[..., 1], frames[..., 2]
+        cb = 128.0 - 0.168736 * r - 0.331264 * g + 0.5 * b
+        cr = 128.0 + 0.5 * r - 0.418688 * g - 0.081312 * b
+        return (cb >= 77) & (cb <= 127) & (cr >= 133) & (cr <= 173)
+
+    @staticmethod
+    def skin(frames):
+        """
+        Heuristik wajah: porsi piksel skin tone.
+        Ideal ±5-35% frame; terlalu banyak biasanya close-up kulit / dinding.
+        """
+        mask = FrameScorer.skin_mask(frames)
+        frac = mask.reshape(len(frames), -1).mean(axis=1)
+        return np.clip(np.minimum(frac / 0.05, (0.8 - frac) / 0.45), 0.0, 1.0)
+
+    @staticmethod
+    def _thumb_gray(gray, factor=4):
+        """Luma diperkecil (block mean) untuk perbandingan antar frame."""
+        b, h, w = gray.shape
+        h, w = h - h % factor, w - w % factor
+        return gray[:, :h, :w].reshape(b, h // factor, factor, w // factor, factor).mean(axis=(2, 4))
+
+    def scene_scores(self, diffs, times, cut_threshold=30.0, min_distance=1.0):
+        """
+        Skor jarak dari pergantian scene / transisi.
+
+        Args:
+            diffs: Beda rata-rata absolut luma tiap frame vs frame sebelumnya
+            times: Waktu tiap frame
+            cut_threshold: Beda di atas ini dianggap cut / transisi
+            min_distance: Jarak (detik) dari cut untuk skor penuh
+        """
+        if len(times) == 0:
+            return np.zeros(0)
+        cuts = times[diffs > cut_threshold]
+        if len(cuts) == 0:
+            dist = np.full(len(times), min_distance)
+        else:
+            idx = np.searchsorted(cuts, times)
+            before = np.abs(times - cuts[np.clip(idx - 1, 0, len(cuts) - 1)])
+            after = np.abs(cuts[np.clip(idx, 0, len(cuts) - 1)] - times)
+            dist = np.minimum(before, after)
+        # Frame di tengah transisi (beda besar dengan frame sebelumnya) → 0
+        motion = np.clip(1.0 - diffs / cut_threshold, 0.0, 1.0)
+        return np.clip(dist / min_distance, 0.0, 1.0) * motion
+
+    # ===== SCORING =====
+
+    def score_video(self, video_path, progress_callback=None):
+        """
+        Decode video sekali (low-res) dan nilai semua frame.
+
+        Returns:
+            dict of np.ndarray: 'time', 'score', dan tiap fitur
+        """
+        w, h = video_frame_size(video_path, self.width)
+        times, features = [], {key: [] for key in ('sharpness', 'exposure', 'colorfulness', 'skin')}
+        diffs = []
+        prev_small = None
+        batch, batch_times = [], []
+
+        def _flush():
+            nonlocal prev_small
+            frames = np.stack(batch).astype(np.float32)
+            gray = self._luma(frames)
+            features['sharpness'].append(self.sharpness(gray))
+            features['exposure'].append(self.exposure(gray))
+            features['colorfulness'].append(self.colorfulness(frames))
+            features['skin'].append(self.skin(frames))
+
+            small = self._thumb_gray(gray)
+            previous = np.concatenate([small[:1] if prev_small is None else prev_small, small[:-1]])
+            diffs.append(np.abs(small - previous).reshape(len(small), -1).mean(axis=1))
+            prev_small = small[-1:]
+            times.extend(batch_times)
+            batch.clear()
+            batch_times.clear()
+            if progress_callback:
+                progress_callback(len(times))
+
+        for n, (pts, data) in enumerate(
+            iter_video_frames(video_path, width=self.width, fps=self.fps)
+        ):
+            batch.append(np.frombuffer(data, dtype=np.uint8).reshape(h, w, 3))
+            batch_times.append(pts if pts is not None else n / self.fps)
+            if len(batch) >= self.batch_size:
+                _flush()
+        if batch:
+            _flush()
+
+        result = {'time': np.asarray(times, dtype=np.float64)}
+        for key, parts in features.items():
+            result[key] = np.concatenate(parts) if parts else np.zeros(0)
+        diffs = np.concatenate(diffs) if diffs else np.zeros(0)
+        result['scene'] = self.scene_scores(diffs, result['time'])
+        result['score'] = sum(self.weights[key] * result[key] for key in self.weights)
+        return result
+
+    @staticmethod
+    def select_top(times, scores, k=5, min_gap=None, margin=0.02):
+        """
+        Pilih top-K frame dengan keragaman waktu.
+
+        Args:
+            times, scores: Array hasil score_video
+            k: Jumlah frame
+            min_gap: Jarak minimal antar frame terpilih (detik),
+                     default = durasi / (2k)
+            margin: Abaikan awal & akhir video (porsi durasi) — intro/credit
+
+        Returns:
+            List of (time, score) urut waktu
+        """
+        if len(times) == 0:
+            return []
+        duration = float(times[-1]) if len(times) else 0.0
+        if min_gap is None:
+            min_gap = duration / (2 * k) if k else 0.0
+        lo, hi = duration * margin, duration * (1 - margin)
+        eligible = [i for i in range(len(times)) if lo <= times[i] <= hi] or list(range(len(times)))
+
+        # Heap kandidat teratas, lalu greedy dengan jarak minimal
+        pool = heapq.nlargest(max(k * 20, 50), eligible, key=lambda i: scores[i])
+        picked = []
+        for i in pool:
+            if all(abs(times[i] - times[j]) >= min_gap for j in picked):
+                picked.append(i)
+                if len(picked) >= k:
+                    break
+        # Video pendek / gap terlalu besar → isi sisa dengan skor tertinggi
+        for i in pool:
+            if len(picked) >= k:
+                break
+            if i not in picked:
+                picked.append(i)
+        return sorted((float(times[i]), float(scores[i])) for i in picked)
+
+    def best_timestamps(self, video_path, k=5, min_gap=None, progress_callback=None):
+        """score_video + select_top → list of (time, score)."""
+        result = self.score_video(video_path, progress_callback)
+        return self.select_top(result['time'], result['score'], k, min_gap)
@@ -135,6 +135,7 @@ class YouTubeOptimizerApp:
         self.opt_intro_outro = tk.BooleanVar(value=False)
         self.opt_analytics = tk.BooleanVar(value=True)
         self.opt_multi_export = tk.BooleanVar(value=False)
+        self.opt_single_pass = tk.BooleanVar(value=True)
 
         options = [
             (self.opt_subtitle, "🔤 Auto Subtitle (Whisper AI)", 
@@ -169,6 +170,8 @@ class YouTubeOptimizerApp:
              "Analisis detail video (bitrate, fps, codec)"),
             (self.opt_adsense_check, "✅ AdSense Readiness Check",
              "Cek apakah video siap untuk monetisasi"),
+            (self.opt_single_pass, "⚡ Single-Pass Render",
+             "Gabungkan semua step edit jadi 1x encode (lebih cepat)"),
         ]
 
         for var, text, tooltip in options:
@@ -480,12 +483,12 @@ class YouTubeOptimizerApp:
                 self._update_status(5, "Starting batch...")
 
                 from app.batch import BatchProcessor
-                processor = BatchProcessor(output_dir=self.output_dir)
+                processor = BatchProcessor(output_base_dir=self.output_dir)
 
                 # Build options dict from current GUI settings
                 options = {
                     'subtitle': self.opt_subtitle.get(),
-                    'silence_removal': self.opt_silence.get(),
+                    'silence': self.opt_silence.get(),
                     'audio_enhance': self.opt_audio_enhance.get(),
                     'speed': self.opt_speed.get(),
                     'thumbnail': self.opt_thumbnail.get(),
@@ -497,7 +500,10 @@ class YouTubeOptimizerApp:
                     'resolution': self.resolution.get(),
                 }
 
-                results = processor.process_from_file(batch_path, options)
+                processor.set_progress_callback(
+                    lambda idx, total, pct, text: self._update_status(pct, text)
+                )
+                results = processor.process_from_file(batch_path, options, parallel=True)
                 
                 success = sum(1 for r in results if r.get('status') == 'success')
                 total = len(results)
@@ -552,6 +558,62 @@ class YouTubeOptimizerApp:
 
         threading.Thread(target=_download, daemon=True).start()
 
+    def _run_single_pass(self, video_path, step_progress):
+        """Render semua step edit yang aktif dalam satu encode FFmpeg."""
+        from app.pipeline import RenderPipeline
+        pipeline = RenderPipeline(output_dir=self.output_dir)
+        pipeline.set_progress_callback(step_progress)
+
+        if self.opt_audio_enhance.get():
+            pipeline.add_audio_enhance()
+            self._log("   + 🔊 Enhance audio")
+        if self.opt_silence.get():
+            pipeline.add_silence_removal()
+            self._log("   + ✂️ Hapus dead air")
+        if self.opt_speed.get():
+            pipeline.add_speed(1.05)
+            self._log("   + ⏩ Speed 1.05x")
+        if self.opt_watermark.get():
+            wm_text = self.watermark_text.get().strip()
+            wm_logo = self.watermark_logo.get().strip()
+            if wm_logo and os.path.exists(wm_logo):
+                pipeline.add_image_watermark(wm_logo, position="top-right",
+                                             opacity=0.7, scale_percent=12)
+                self._log("   + 💧 Logo watermark")
+            elif wm_text:
+                pipeline.add_text_watermark(wm_text, position="top-right",
+                                            font_size=28, opacity=0.6)
+                self._log("   + 💧 Text watermark")
+            else:
+                self._log("⚠️ Watermark diaktifkan tapi tidak ada teks/logo. Dilewati.")
+        if self.opt_color_grade.get():
+            pipeline.add_color_grade(self.color_preset.get())
+            self._log(f"   + 🎨 Color grading: {self.color_preset.get()}")
+
+        if self.opt_subtitle.get():
+            self._log(f"   + 🔤 Subtitle (Whisper {self.whisper_model.get()}, {self.language.get()})")
+            self._log("   ⏳ Transcription bisa memakan waktu beberapa menit...")
+            from app.subtitler import AutoSubtitler
+            lang = self.language.get() if self.language.get() != "auto" else None
+            subtitler = AutoSubtitler(
+                model_size=self.whisper_model.get(),
+                output_dir=self.output_dir
+            )
+            subtitler.set_progress_callback(step_progress)
+
+            # Transcribe audio yang sudah di-cut/speed supaya timing cocok
+            audio_path = pipeline.render_audio(video_path)
+            transcription = subtitler.transcribe(audio_path, language=lang)
+            sub_path = subtitler.generate_ass(transcription, font_size=22, bold=True)
+            pipeline.add_subtitle(sub_path)
+            self._log(f"   Subtitle file: {sub_path}")
+
+        if self.opt_youtube_export.get():
+            pipeline.add_youtube_export(self.resolution.get())
+            self._log(f"   + 📤 Export YouTube ({self.resolution.get()})")
+
+        return pipeline.run(video_path)
+
     def _start_optimization(self):
         """Start the full optimization pipeline."""
         video_path = self.video_path_var.get().strip()
@@ -590,6 +652,23 @@ class YouTubeOptimizerApp:
                     messagebox.showinfo("Info", "Pilih minimal satu opsi optimasi!")
                     return
 
+                # Single-pass: step encode digabung jadi satu render.
+                # Intro/outro butuh concat file terpisah, jadi pakai mode per-step.
+                single_pass = self.opt_single_pass.get() and not self.opt_intro_outro.get()
+                fused_steps = sum([
+                    self.opt_audio_enhance.get(),
+                    self.opt_silence.get(),
+                    self.opt_speed.get(),
+                    self.opt_watermark.get(),
+                    self.opt_color_grade.get(),
+                    self.opt_subtitle.get(),
+                    self.opt_youtube_export.get(),
+                ])
+                if single_pass and fused_steps:
+                    total_steps = total_steps - fused_steps + 1
+                else:
+                    single_pass = False
+
                 self._log("=" * 50)
                 self._log("🚀 MEMULAI OPTIMASI VIDEO...")
                 self._log("=" * 50)
@@ -598,8 +677,15 @@ class YouTubeOptimizerApp:
                     overall = ((step / total_steps) + (pct / 100 / total_steps)) * 100
                     self._update_status(overall, text)
 
+                # Single-pass render (menggantikan step 1-4 & export)
+                if single_pass:
+                    step += 1
+                    self._log(f"\n[{step}/{total_steps}] ⚡ Single-pass render ({fused_steps} step, 1x encode)...")
+                    current_video = self._run_single_pass(current_video, step_progress)
+                    self._log(f"✅ Render selesai: {current_video}")
+
                 # Step 1: Audio Enhancement
-                if self.opt_audio_enhance.get():
+                if self.opt_audio_enhance.get() and not single_pass:
                     step += 1
                     self._log(f"\n[{step}/{total_steps}] 🔊 Enhancing audio...")
                     from app.editor import VideoEditor
@@ -609,7 +695,7 @@ class YouTubeOptimizerApp:
                     self._log(f"✅ Audio enhanced: {current_video}")
 
                 # Step 2: Remove Silence
-                if self.opt_silence.get():
+                if self.opt_silence.get() and not single_pass:
                     step += 1
                     self._log(f"\n[{step}/{total_steps}] ✂️ Menghapus dead air...")
                     from app.editor import VideoEditor
@@ -619,7 +705,7 @@ class YouTubeOptimizerApp:
                     self._log(f"✅ Silence dihapus: {current_video}")
 
                 # Step 3: Speed adjustment
-                if self.opt_speed.get():
+                if self.opt_speed.get() and not single_pass:
                     step += 1
                     self._log(f"\n[{step}/{total_steps}] ⏩ Adjusting speed 1.05x...")
                     from app.editor import VideoEditor
@@ -629,7 +715,7 @@ class YouTubeOptimizerApp:
                     self._log(f"✅ Speed adjusted: {current_video}")
 
                 # Step 3b: Watermark
-                if self.opt_watermark.get():
+                if self.opt_watermark.get() and not single_pass:
                     step += 1
                     self._log(f"\n[{step}/{total_steps}] 💧 Adding watermark...")
                     from app.watermark import WatermarkOverlay
@@ -639,7 +725,7 @@ class YouTubeOptimizerApp:
                     
                     if wm_logo and os.path.exists(wm_logo):
                         current_video = wm.add_image_watermark(
-                            current_video, wm_logo, position="top-right", opacity=0.7, scale=0.12
+                            current_video, wm_logo, position="top-right", opacity=0.7, scale_percent=12
                         )
                         self._log(f"✅ Logo watermark added: {current_video}")
                     elif wm_text:
@@ -651,7 +737,7 @@ class YouTubeOptimizerApp:
                         self._log("⚠️ Watermark diaktifkan tapi tidak ada teks/logo. Dilewati.")
 
                 # Step 3c: Color Grading
-                if self.opt_color_grade.get():
+                if self.opt_color_grade.get() and not single_pass:
                     step += 1
                     preset_name = self.color_preset.get()
                     self._log(f"\n[{step}/{total_steps}] 🎨 Applying color grading: {preset_name}...")
@@ -684,7 +770,7 @@ class YouTubeOptimizerApp:
                     self._log(f"✅ Intro/outro added: {current_video}")
 
                 # Step 4: Auto Subtitle
-                if self.opt_subtitle.get():
+                if self.opt_subtitle.get() and not single_pass:
                     step += 1
                     self._log(f"\n[{step}/{total_steps}] 🔤 Generating subtitle dengan Whisper...")
                     self._log(f"   Model: {self.whisper_model.get()}")
@@ -788,32 +874,53 @@ class YouTubeOptimizerApp:
                 # Step 7: YouTube Shorts
                 if self.opt_shorts.get():
                     step += 1
-                    self._log(f"\n[{step}/{total_steps}] 📱 Creating YouTube Shorts clip...")
+                    self._log(f"\n[{step}/{total_steps}] 📱 Creating YouTube Shorts clips...")
                     from app.editor import VideoEditor
+                    from app.highlight_finder import HighlightFinder
                     editor = VideoEditor(output_dir=self.output_dir)
                     editor.set_progress_callback(step_progress)
-                    # Ambil 60 detik pertama sebagai shorts (hook)
-                    shorts_path = editor.create_shorts_clip(current_video, 0, 60)
-                    self._log(f"✅ Shorts clip: {shorts_path}")
+                    lang = self.language.get() if self.language.get() != "auto" else 'id'
+                    finder = HighlightFinder(language=lang)
+                    # Segmen subtitle (kalau ada) → kepadatan bicara & keyword
+                    segments = None
+                    for name in ("subtitle.srt", "subtitle.ass"):
+                        sub_file = os.path.join(self.output_dir, name)
+                        if os.path.exists(sub_file):
+                            segments = finder.load_segments(sub_file)
+                            break
+                    highlights = finder.find(current_video, k=3, segments=segments)
+                    shorts_paths = editor.create_shorts_clips(current_video, highlights)
+                    for item, shorts_path in zip(highlights, shorts_paths):
+                        self._log(f"✅ Shorts clip ({item['start']:.0f}s-{item['end']:.0f}s): {shorts_path}")
 
                 # Step 7b: Auto Chapters
                 if self.opt_chapters.get():
                     step += 1
                     self._log(f"\n[{step}/{total_steps}] 📑 Generating chapter timestamps...")
                     from app.chapter_generator import ChapterGenerator
-                    ch_gen = ChapterGenerator(output_dir=self.output_dir)
+                    from app.audio_analysis import get_audio_analysis
+                    lang = self.language.get() if self.language.get() != "auto" else 'id'
+                    ch_gen = ChapterGenerator(language=lang)
+                    # Envelope audio (cache yang sama dengan silence removal)
+                    analysis = get_audio_analysis(current_video)
                     
                     # Try to use SRT from subtitle step
                     srt_path = os.path.join(self.output_dir, "subtitle.srt")
                     if os.path.exists(srt_path):
-                        chapters = ch_gen.generate_from_srt(srt_path)
+                        chapters = ch_gen.generate_from_srt(srt_path, audio_analysis=analysis)
                         self._log(f"✅ {len(chapters)} chapters generated from SRT")
                     else:
-                        chapters = ch_gen.generate_from_transcription(current_video,
-                            language=self.language.get() if self.language.get() != "auto" else None)
+                        transcription = {'segments': [
+                            {'start': 0.0, 'end': analysis.duration, 'text': ''}
+                        ]}
+                        chapters = ch_gen.generate_from_transcription(
+                            transcription, audio_analysis=analysis
+                        )
                         self._log(f"✅ {len(chapters)} chapters generated from audio analysis")
                     
-                    ch_path = ch_gen.save_chapters(chapters)
+                    ch_path = ch_gen.save_chapters(
+                        chapters, os.path.join(self.output_dir, "chapters.txt")
+                    )
                     formatted = ch_gen.format_timestamps(chapters)
                     self._log(f"📑 Chapters saved: {ch_path}")
                     self._log(f"   Preview:\n{formatted[:500]}")
@@ -822,7 +929,7 @@ class YouTubeOptimizerApp:
                     self.seo_text.insert(tk.END, f"\n\n📑 CHAPTERS:\n{formatted}")
 
                 # Step 8: YouTube Export
-                if self.opt_youtube_export.get():
+                if self.opt_youtube_export.get() and not single_pass:
                     step += 1
                     self._log(f"\n[{step}/{total_steps}] 📤 Exporting YouTube-ready video...")
                     from app.editor import VideoEditor
@@ -0,0 +1,221 @@
+"""
+Modul Highlight Finder - Cari bagian terbaik video untuk YouTube Shorts
+Timeline per detik dinilai dari data analisa yang sudah di-cache: envelope
+loudness (audio_analysis), kepadatan bicara & keyword dari segmen transcription,
+dan laju pergantian scene (profil smart_crop). Top-K window yang tidak saling
+tumpang tindih dipilih lewat sliding sum — tanpa scan video ulang per Shorts.
+"""
+import re
+import numpy as np
+from app.audio_analysis import get_audio_analysis
+from app.smart_crop import get_crop_analysis, CUT_THRESHOLD
+from app.chapter_generator import ChapterGenerator
+
+
+# Bobot skor highlight
+DEFAULT_WEIGHTS = {
+    'loudness': 0.30,
+    'speech': 0.30,
+    'scene': 0.20,
+    'keyword': 0.20,
+}
+
+
+class HighlightFinder:
+    """Scoring highlight untuk memilih window Shorts."""
+
+    def __init__(self, language='id', window=60.0, step=1.0, weights=None):
+        """
+        Args:
+            language: Bahasa keyword (lihat ChapterGenerator.SCENE_KEYWORDS)
+            window: Panjang tiap highlight (detik)
+            step: Resolusi timeline skor (detik)
+            weights: dict bobot (default DEFAULT_WEIGHTS)
+        """
+        self.window = window
+        self.step = step
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.keywords = ChapterGenerator.SCENE_KEYWORDS.get(
+            language, ChapterGenerator.SCENE_KEYWORDS['id']
+        )
+        self._keyword_re = re.compile(
+            r'\b(' + '|'.join(re.escape(k) for k in self.keywords) + r')\b', re.IGNORECASE
+        )
+
+    # ===== SEGMEN TRANSCRIPTION =====
+
+    @staticmethod
+    def load_segments(subtitle_path):
+        """
+        Baca segmen dari file subtitle (.srt atau .ass).
+
+        Returns:
+            List of {'start', 'end', 'text'}
+        """
+        if subtitle_path.lower().endswith('.srt'):
+            return ChapterGenerator()._parse_srt(subtitle_path)
+
+        segments = []
+        pattern = re.compile(r'^Dialogue:\s*[^,]*,(\d+):(\d+):(\d+\.\d+),(\d+):(\d+):(\d+\.\d+),(.*)$')
+        with open(subtitle_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                match = pattern.match(line.strip())
+                if not match:
+                    continue
+                g = match.groups()
+                # Sisa field: Style,Name,MarginL,MarginR,MarginV,Effect,Text
+                text = g[6].split(',', 6)[-1]
+                segments.append({
+                    'start': int(g[0]) * 3600 + int(g[1]) * 60 + float(g[2]),
+                    'end': int(g[3]) * 3600 + int(g[4]) * 60 + float(g[5]),
+                    'text': re.sub(r'\{[^}]*\}', '', text).replace('\\N', ' '),
+                })
+        return segments
+
+    # ===== FITUR PER BIN =====
+
+    @staticmethod
+    def _normalize(values):
+        """Map ke 0-1 berdasarkan persentil (tahan outlier)."""
+        if len(values) == 0:
+            return values
+        lo, hi = np.percentile(values, 10), np.percentile(values, 95)
+        if hi - lo < 1e-9:
+            return np.zeros(len(values))
+        return np.clip((values - lo) / (hi - lo), 0.0, 1.0)
+
+    def _bin_mean(self, times, values, n_bins):
+        """Rata-rata nilai per bin timeline."""
+        idx = np.clip((times / self.step).astype(int), 0, n_bins - 1)
+        sums = np.bincount(idx, weights=values, minlength=n_bins)
+        counts = np.bincount(idx, minlength=n_bins)
+        return sums / np.maximum(counts, 1)
+
+    def _audio_features(self, analysis, n_bins):
+        """Loudness aktif per bin + porsi frame bersuara (fallback kepadatan bicara)."""
+        times = analysis.times()
+        power = np.power(10.0, analysis.envelope.astype(np.float64) / 10.0)
+        loud_db = 10 * np.log10(np.maximum(self._bin_mean(times, power, n_bins), 1e-12))
+        voiced = self._bin_mean(times, (analysis.envelope > -40.0).astype(np.float64), n_bins)
+        return self._normalize(loud_db), voiced
+
+    def _segment_features(self, segments, n_bins):
+        """Kata per detik & jumlah keyword per bin dari segmen transcription."""
+        words = np.zeros(n_bins)
+        hits = np.zeros(n_bins)
+        for seg in segments:
+            start, end = float(seg['start']), float(seg['end'])
+            a = min(int(start / self.step), n_bins - 1)
+            b = min(max(int(np.ceil(end / self.step)), a + 1), n_bins)
+            text = seg.get('text', '')
+            # Kata dibagi rata sepanjang segmen
+            words[a:b] += len(text.split()) / (b - a)
+            hits[a] += len(self._keyword_re.findall(text))
+        return self._normalize(words / self.step), np.clip(hits, 0.0, 1.0)
+
+    def _scene_features(self, crop, n_bins):
+        """Laju pergantian scene + intensitas gerak per bin."""
+        if len(crop.times) == 0:
+            return np.zeros(n_bins)
+        cuts = np.bincount(
+            np.clip((crop.times[crop.diffs > CUT_THRESHOLD] / self.step).astype(int), 0, n_bins - 1),
+            minlength=n_bins
+        )
+        motion = self._normalize(self._bin_mean(crop.times, crop.diffs.astype(np.float64), n_bins))
+        return 0.5 * np.clip(cuts, 0, 1) + 0.5 * motion
+
+    def score_timeline(self, video_path, segments=None):
+        """
+        Skor highlight per bin (default per detik) dari analisa yang di-cache.
+
+        Args:
+            video_path: Path video
+            segments: Segmen transcription (opsional) — tanpa ini kepadatan
+                      bicara diperkirakan dari audio, keyword tidak dipakai
+
+        Returns:
+            dict of np.ndarray: 'time', 'score', dan tiap fitur
+        """
+        analysis = get_audio_analysis(video_path)
+        crop = get_crop_analysis(video_path)
+        duration = max(analysis.duration, float(crop.times[-1]) if len(crop.times) else 0.0)
+        n_bins = max(int(np.ceil(duration / self.step)), 1)
+
+        loudness, voiced = self._audio_features(analysis, n_bins)
+        if segments:
+            speech, keyword = self._segment_features(segments, n_bins)
+        else:
+            speech, keyword = voiced, np.zeros(n_bins)
+
+        result = {
+            'time': np.arange(n_bins) * self.step,
+            'loudness': loudness,
+            'speech': speech,
+            'scene': self._scene_features(crop, n_bins),
+            'keyword': keyword,
+        }
+        result['score'] = sum(self.weights[key] * result[key] for key in self.weights)
+        return result
+
+    # ===== PEMILIHAN WINDOW =====
+
+    def select_windows(self, scores, k=5, window=None):
+        """
+        Top-K window tanpa tumpang tindih (greedy di atas sliding sum).
+
+        Returns:
+            List of (start_bin, n_bins, mean_score) urut skor tertinggi
+        """
+        n = len(scores)
+        size = min(max(int(round((window or self.window) / self.step)), 1), n)
+        cs = np.concatenate([[0.0], np.cumsum(scores)])
+        sums = cs[size:] - cs[:-size]
+        available = np.ones(len(sums), dtype=bool)
+        picked = []
+        for _ in range(k):
+            if not available.any():
+                break
+            i = int(np.argmax(np.where(available, sums, -np.inf)))
+            picked.append((i, size, float(sums[i] / size)))
+            # Start yang membuat window overlap dengan pilihan ini dicoret
+            available[max(0, i - size + 1):i + size] = False
+        return picked
+
+    @staticmethod
+    def _snap(start, end, segments, max_shift=3.0):
+        """Geser batas window ke awal/akhir kalimat terdekat (tidak potong kata)."""
+        if not segments:
+            return start, end
+        starts = [s['start'] for s in segments if start - max_shift <= s['start'] <= start + max_shift]
+        if starts:
+            shift = min(starts, key=lambda s: abs(s - start)) - start
+            start, end = start + shift, end + shift
+        ends = [s['end'] for s in segments if end - max_shift <= s['end'] <= end]
+        if ends:
+            end = max(ends)
+        return max(start, 0.0), end
+
+    def find(self, video_path, k=5, window=None, segments=None):
+        """
+        Cari K highlight terbaik.
+
+        Args:
+            video_path: Path video
+            k: Jumlah highlight
+            window: Panjang highlight (detik), default self.window
+            segments: Segmen transcription (opsional)
+
+        Returns:
+            List of {'start', 'end', 'score'} urut skor tertinggi
+        """
+        timeline = self.score_timeline(video_path, segments)
+        duration = len(timeline['score']) * self.step
+        highlights = []
+        for i, size, score in self.select_windows(timeline['score'], k, window):
+            start, end = self._snap(i * self.step, (i + size) * self.step, segments)
+            highlights.append({
+                'start': round(start, 3),
+                'end': round(min(end, duration), 3),
+                'score': round(score, 4),
+            })
+        return highlights
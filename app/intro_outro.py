@@ -1,10 +1,77 @@
 """
 Intro/Outro Template — Auto-sisipkan intro & outro branded ke video
 Menggunakan FFmpeg untuk concat video segments
+Clip intro/outro (hasil render & hasil normalisasi) di-cache berdasarkan isi
+parameternya, jadi satu branding channel hanya di-render sekali.
 """
 import os
+import json
+import hashlib
+import tempfile
 import subprocess
-from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path
+import threading
+from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path, FFmpegRunner, FFmpegCancelled
+from app.probe_cache import probe
+from app.loudness import get_loudness_normalizer, DEFAULT_TARGET
+from app.cache import get_cache_dir, file_key_hash
+
+
+# Encoder settings for rendered/normalized clips (part of the cache key)
+CLIP_ENCODE_ARGS = (
+    '-c:v', 'libx264', '-preset', 'fast', '-crf', '20',
+    '-c:a', 'aac', '-ar', '44100', '-ac', '2', '-b:a', '192k',
+    '-pix_fmt', 'yuv420p',
+)
+
+# Stream parameters that must match for a `-c copy` concat
+CONFORMANCE_FIELDS = (
+    'video_codec', 'video_profile', 'video_level', 'width', 'height', 'r_frame_rate',
+    'video_time_base', 'pix_fmt', 'audio_codec', 'sample_rate', 'channels', 'channel_layout',
+)
+
+# Codecs whose parameters can be reproduced for intro/outro clips
+VIDEO_ENCODERS = {'h264': 'libx264', 'hevc': 'libx265'}
+AUDIO_ENCODERS = {'aac': 'aac', 'mp3': 'libmp3lame', 'opus': 'libopus', 'ac3': 'ac3'}
+
+# Bitstream filters that put parameter sets in-band (concat via MPEG-TS)
+ANNEXB_FILTERS = {'h264': 'h264_mp4toannexb', 'hevc': 'hevc_mp4toannexb'}
+
+_clip_locks = {}
+_clip_locks_guard = threading.Lock()
+
+
+def clip_cache_path(kind, params):
+    """Content-addressed path for a cached clip: <cache>/intro_outro/<kind>_<sha1>.mp4"""
+    data = json.dumps([kind, params], sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha1(data.encode('utf-8')).hexdigest()
+    return os.path.join(get_cache_dir("intro_outro"), f"{kind}_{digest}.mp4")
+
+
+def conformance_params(info):
+    """Concat-relevant stream parameters of a MediaInfo (see CONFORMANCE_FIELDS)."""
+    params = {name: getattr(info, name) for name in CONFORMANCE_FIELDS}
+    # Concat demuxer matches streams by index, so the order matters too
+    params['streams'] = [
+        s.get('codec_type') for s in info.raw.get('streams', [])
+        if s.get('codec_type') in ('video', 'audio')
+    ]
+    return params
+
+
+def _encoder_profile(codec, profile):
+    """ffprobe profile name → encoder -profile:v value ('High 10' → 'high10')."""
+    name = profile.lower().replace(' ', '').replace(':', '')
+    if codec == 'h264':
+        return {
+            'constrainedbaseline': 'baseline', 'high422': 'high422',
+            'high444predictive': 'high444',
+        }.get(name, name)
+    return name
+
+
+def _clip_lock(path):
+    with _clip_locks_guard:
+        return _clip_locks.setdefault(path, threading.Lock())
 
 
 class IntroOutroManager:
@@ -14,54 +81,207 @@ class IntroOutroManager:
         self.output_dir = output_dir
         self.ffmpeg = get_ffmpeg_path()
         self.ffprobe = get_ffprobe_path()
+        self.runner = FFmpegRunner()
         os.makedirs(output_dir, exist_ok=True)
 
     def get_video_info(self, video_path):
         """Get video resolution, fps, codec info."""
-        cmd = [
-            self.ffprobe, '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_streams', '-show_format',
-            video_path
-        ]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            import json
-            data = json.loads(result.stdout)
-            for stream in data.get('streams', []):
-                if stream.get('codec_type') == 'video':
-                    return {
-                        'width': int(stream.get('width', 1920)),
-                        'height': int(stream.get('height', 1080)),
-                        'fps': eval(stream.get('r_frame_rate', '30/1')),
-                        'codec': stream.get('codec_name', 'h264'),
-                    }
+            info = probe(video_path)
+            if info.has_video:
+                return {
+                    'width': info.width or 1920,
+                    'height': info.height or 1080,
+                    'fps': info.fps or 30,
+                    'codec': info.video_codec or 'h264',
+                }
         except Exception:
             pass
         return {'width': 1920, 'height': 1080, 'fps': 30, 'codec': 'h264'}
 
-    def _normalize_video(self, input_path, output_path, width=1920, height=1080, fps=30):
-        """Normalize a video to consistent resolution/fps/codec for safe concatenation."""
+    def _cached_clip(self, kind, params, render):
+        """
+        Return the cached clip for (kind, params), rendering it on a miss.
+
+        Args:
+            kind: Clip type ('intro', 'outro', 'normalized', ...)
+            params: JSON-serializable dict — everything that affects the output
+            render: Callable(output_path) that writes the clip
+        """
+        path = clip_cache_path(kind, params)
+        with _clip_lock(path):
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                return path
+            # Render to a temp name, then rename: a crashed render never
+            # leaves a half-written clip in the cache
+            temp_path = f"{path[:-4]}.{os.getpid()}.{threading.get_ident()}.tmp.mp4"
+            try:
+                render(temp_path)
+                if not (os.path.exists(temp_path) and os.path.getsize(temp_path) > 0):
+                    raise RuntimeError(f"Failed to render {kind} clip")
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return path
+
+    def _normalized_clip(self, input_path, width, height, fps, normalize_loudness=True):
+        """Cached _normalize_video() result for a short clip (intro/outro)."""
+        params = {
+            'source': file_key_hash(input_path),
+            'width': width, 'height': height, 'fps': fps,
+            'encode': CLIP_ENCODE_ARGS,
+            'loudness': normalize_loudness,
+        }
+        return self._cached_clip('normalized', params, lambda out: self._normalize_video(
+            input_path, out, width, height, fps, normalize_loudness
+        ))
+
+    def _conform_args(self, main):
+        """
+        Encoder args that reproduce the main video's stream parameters.
+        Raises ValueError when the codec cannot be reproduced.
+        """
+        encoder = VIDEO_ENCODERS.get(main.video_codec)
+        if not encoder or (main.has_audio and main.audio_codec not in AUDIO_ENCODERS):
+            raise ValueError(f"Cannot conform to {main.video_codec}/{main.audio_codec}")
+
+        args = ['-c:v', encoder, '-preset', 'fast', '-crf', '20']
+        if main.video_profile:
+            args += ['-profile:v', _encoder_profile(main.video_codec, main.video_profile)]
+        if main.video_level > 0:
+            if encoder == 'libx264':
+                args += ['-level:v', f"{main.video_level / 10:.1f}"]
+            else:
+                args += ['-x265-params', f"level-idc={main.video_level / 30:g}"]
+        args += ['-pix_fmt', main.pix_fmt or 'yuv420p']
+        if '/' in main.video_time_base:
+            args += ['-video_track_timescale', main.video_time_base.split('/')[1]]
+
+        if main.has_audio:
+            args += [
+                '-c:a', AUDIO_ENCODERS[main.audio_codec],
+                '-ar', str(main.sample_rate), '-ac', str(main.channels),
+                '-b:a', str(main.audio_bit_rate or 192000),
+            ]
+        else:
+            args += ['-an']
+        return args
+
+    def _loudness_target(self, main_path):
+        """Loudness target for clips = the main video's own (measured, cached) loudness."""
+        try:
+            measured = get_loudness_normalizer().measure(main_path, runner=self.runner)
+        except FFmpegCancelled:
+            raise
+        except (RuntimeError, ValueError, KeyError):
+            return dict(DEFAULT_TARGET)
+        if measured.get('silent'):
+            return dict(DEFAULT_TARGET)
+        return dict(DEFAULT_TARGET, I=round(min(max(measured['input_i'], -70.0), -5.0), 1))
+
+    def _conformed_clip(self, input_path, main_path, normalize_loudness=True):
+        """
+        Intro/outro re-encoded to the main video's exact stream parameters
+        (codec, profile, level, size, fps, timebase, pix_fmt, audio layout),
+        so it can be concatenated with the main video stream-copied. Cached.
+        """
+        main = probe(main_path)
+        target = conformance_params(main)
+        video = main.video_stream or {}
+        sar = video.get('sample_aspect_ratio', '1:1')
+        sar = sar.replace(':', '/') if sar and not sar.startswith('0') else '1'
+        encode_args = self._conform_args(main)
+        loudness = self._loudness_target(main_path) if normalize_loudness else None
+        params = {
+            'source': file_key_hash(input_path),
+            'target': target, 'sar': sar,
+            'encode': encode_args, 'loudness': loudness,
+        }
+
+        def _render(output_path):
+            w, h = main.width, main.height
+            clip_has_audio = probe(input_path).has_audio
+            cmd = [self.ffmpeg, '-y', '-i', input_path]
+            if main.has_audio and not clip_has_audio:
+                cmd += ['-f', 'lavfi', '-i',
+                        f"anullsrc=channel_layout={main.channel_layout or 'stereo'}"
+                        f":sample_rate={main.sample_rate}"]
+            cmd += [
+                '-map', '0:v:0',
+                '-vf', f'scale={w}:{h}:force_original_aspect_ratio=decrease,'
+                       f'pad={w}:{h}:(ow-iw)/2:(oh-ih)/2:black,'
+                       f'setsar={sar},fps={main.r_frame_rate or 30}',
+            ]
+            if main.has_audio:
+                filters = []
+                if clip_has_audio:
+                    cmd += ['-map', '0:a:0']
+                    if loudness:
+                        filters.append(get_loudness_normalizer().linear_filter(
+                            input_path, target=loudness, sample_rate=main.sample_rate,
+                            runner=self.runner
+                        ))
+                else:
+                    cmd += ['-map', '1:a:0', '-shortest']
+                if main.channel_layout:
+                    filters.append(f"aformat=channel_layouts={main.channel_layout}")
+                if filters:
+                    cmd += ['-af', ','.join(filters)]
+            cmd += [*encode_args, output_path]
+            self.runner.run(cmd, timeout=300)
+
+        path = self._cached_clip('conformed', params, _render)
+        if conformance_params(probe(path)) != target:
+            os.remove(path)
+            raise RuntimeError(f"Clip does not conform to main video: {input_path}")
+        return path
+
+    def _normalize_video(self, input_path, output_path, width=1920, height=1080, fps=30,
+                         normalize_loudness=True):
+        """
+        Normalize a video to consistent resolution/fps/codec for safe concatenation.
+        Audio is also brought to the same loudness target (two-pass linear loudnorm,
+        measurement cached) so intro, main video and outro play at the same level.
+        """
         cmd = [
             self.ffmpeg, '-y', '-i', input_path,
             '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
                    f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black',
             '-r', str(fps),
-            '-c:v', 'libx264', '-preset', 'fast', '-crf', '20',
-            '-c:a', 'aac', '-ar', '44100', '-ac', '2', '-b:a', '192k',
-            '-pix_fmt', 'yuv420p',
-            output_path
         ]
-        subprocess.run(cmd, capture_output=True, timeout=300)
+        if normalize_loudness and probe(input_path).has_audio:
+            cmd += ['-af', get_loudness_normalizer().linear_filter(
+                input_path, sample_rate=44100, runner=self.runner
+            )]
+        cmd += [*CLIP_ENCODE_ARGS, output_path]
+        # A failed/timed-out encode raises: its truncated output must never
+        # be concatenated or moved into the clip cache
+        self.runner.run(cmd, timeout=300)
         return output_path
 
     def create_text_intro(self, text="Film Pendek Pahm", subtitle="",
                           duration=4, width=1920, height=1080,
                           bg_color="black", text_color="white",
-                          font_size=72, subtitle_size=36):
-        """Create a simple branded text intro using FFmpeg."""
-        output_path = os.path.join(self.output_dir, "intro_generated.mp4")
-
+                          font_size=72, subtitle_size=36, fps=30):
+        """
+        Create a simple branded text intro using FFmpeg.
+        Cached by its parameters: the same branding is rendered only once.
+        """
+        params = {
+            'text': text, 'subtitle': subtitle, 'duration': duration,
+            'width': width, 'height': height, 'fps': fps,
+            'bg_color': bg_color, 'text_color': text_color,
+            'font_size': font_size, 'subtitle_size': subtitle_size,
+            'encode': CLIP_ENCODE_ARGS,
+        }
+        return self._cached_clip('intro', params, lambda out: self._render_text_intro(
+            out, text, subtitle, duration, width, height, bg_color, text_color,
+            font_size, subtitle_size, fps
+        ))
+
+    def _render_text_intro(self, output_path, text, subtitle, duration, width, height,
+                           bg_color, text_color, font_size, subtitle_size, fps):
         # Build drawtext filter
         drawtext = (
             f"drawtext=text='{text}':fontsize={font_size}:fontcolor={text_color}:"
@@ -82,31 +302,42 @@ class IntroOutroManager:
         cmd = [
             self.ffmpeg, '-y',
             '-f', 'lavfi', '-i',
-            f'color=c={bg_color}:s={width}x{height}:d={duration}:r=30',
+            f'color=c={bg_color}:s={width}x{height}:d={duration}:r={fps}',
             '-f', 'lavfi', '-i',
             f'anullsrc=channel_layout=stereo:sample_rate=44100',
             '-vf', f'{drawtext},{fade}',
             '-t', str(duration),
-            '-c:v', 'libx264', '-preset', 'fast', '-crf', '18',
-            '-c:a', 'aac', '-b:a', '192k',
-            '-pix_fmt', 'yuv420p',
+            *CLIP_ENCODE_ARGS,
             '-shortest',
             output_path
         ]
 
-        subprocess.run(cmd, capture_output=True, timeout=120)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
 
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if result.returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             return output_path
-        raise RuntimeError("Failed to create text intro")
+        raise RuntimeError(f"Failed to create text intro: {result.stderr[-500:]}")
 
     def create_text_outro(self, text="Terima Kasih Sudah Menonton!",
                           subscribe_text="SUBSCRIBE & LIKE 👍",
                           duration=5, width=1920, height=1080,
-                          bg_color="black", text_color="white"):
-        """Create a branded text outro."""
-        output_path = os.path.join(self.output_dir, "outro_generated.mp4")
-
+                          bg_color="black", text_color="white", fps=30):
+        """
+        Create a branded text outro.
+        Cached by its parameters: the same branding is rendered only once.
+        """
+        params = {
+            'text': text, 'subscribe_text': subscribe_text, 'duration': duration,
+            'width': width, 'height': height, 'fps': fps,
+            'bg_color': bg_color, 'text_color': text_color,
+            'encode': CLIP_ENCODE_ARGS,
+        }
+        return self._cached_clip('outro', params, lambda out: self._render_text_outro(
+            out, text, subscribe_text, duration, width, height, bg_color, text_color, fps
+        ))
+
+    def _render_text_outro(self, output_path, text, subscribe_text, duration, width, height,
+                           bg_color, text_color, fps):
         drawtext = (
             f"drawtext=text='{text}':fontsize=64:fontcolor={text_color}:"
             f"x=(w-text_w)/2:y=(h/2)-60:"
@@ -120,31 +351,29 @@ class IntroOutroManager:
         cmd = [
             self.ffmpeg, '-y',
             '-f', 'lavfi', '-i',
-            f'color=c={bg_color}:s={width}x{height}:d={duration}:r=30',
+            f'color=c={bg_color}:s={width}x{height}:d={duration}:r={fps}',
             '-f', 'lavfi', '-i',
             f'anullsrc=channel_layout=stereo:sample_rate=44100',
             '-vf', drawtext,
             '-t', str(duration),
-            '-c:v', 'libx264', '-preset', 'fast', '-crf', '18',
-            '-c:a', 'aac', '-b:a', '192k',
-            '-pix_fmt', 'yuv420p',
+            *CLIP_ENCODE_ARGS,
             '-shortest',
             output_path
         ]
 
-        subprocess.run(cmd, capture_output=True, timeout=120)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
 
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if result.returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             return output_path
-        raise RuntimeError("Failed to create text outro")
+        raise RuntimeError(f"Failed to create text outro: {result.stderr[-500:]}")
 
     def add_intro(self, video_path, intro_path):
         """Prepend intro video to main video."""
-        return self._concat_videos([intro_path, video_path], "with_intro.mp4")
+        return self._concat_videos([intro_path, video_path], "with_intro.mp4", {intro_path})
 
     def add_outro(self, video_path, outro_path):
         """Append outro video to main video."""
-        return self._concat_videos([video_path, outro_path], "with_outro.mp4")
+        return self._concat_videos([video_path, outro_path], "with_outro.mp4", {outro_path})
 
     def add_intro_outro(self, video_path, intro_path=None, outro_path=None):
         """Add both intro and outro to video."""
@@ -158,55 +387,118 @@ class IntroOutroManager:
         if len(segments) == 1:
             return video_path  # Nothing to concat
 
-        return self._concat_videos(segments, "with_intro_outro.mp4")
+        return self._concat_videos(segments, "with_intro_outro.mp4", set(segments) - {video_path})
+
+    def _concat_videos(self, video_paths, output_name, clips=()):
+        """
+        Concatenate multiple videos using FFmpeg concat demuxer.
+
+        Intro/outro clips are encoded to the main video's exact stream
+        parameters and the main video is stream-copied. If the main video
+        cannot be matched (codec, stream layout, ...), every segment is
+        normalized to a common format instead.
+
+        Args:
+            clips: Paths in video_paths that are intro/outro clips
+        """
+        # Main video = the segment that is not an intro/outro clip
+        main_path = next((p for p in video_paths if p not in clips), video_paths[0])
+
+        if clips:
+            try:
+                segment_files = [
+                    self._conformed_clip(p, main_path) if p in clips else p
+                    for p in video_paths
+                ]
+                return self._concat_files(segment_files, output_name)
+            except FFmpegCancelled:
+                raise
+            except (RuntimeError, ValueError, KeyError, OSError):
+                pass
 
-    def _concat_videos(self, video_paths, output_name):
-        """Concatenate multiple videos using FFmpeg concat demuxer."""
-        # Get target specs from main video (longest one)
-        main_info = self.get_video_info(video_paths[-1] if len(video_paths) > 1 else video_paths[0])
+        main_info = self.get_video_info(main_path)
         w, h, fps = main_info['width'], main_info['height'], int(main_info['fps'])
 
-        # Normalize all segments
+        # Normalize all segments (short intro/outro clips come from the cache)
         temp_files = []
-        for i, vpath in enumerate(video_paths):
-            temp_path = os.path.join(self.output_dir, f"_concat_temp_{i}.mp4")
-            self._normalize_video(vpath, temp_path, w, h, fps)
-            temp_files.append(temp_path)
-
-        # Create concat list file
-        list_path = os.path.join(self.output_dir, "_concat_list.txt")
-        with open(list_path, 'w', encoding='utf-8') as f:
+        segment_files = []
+        try:
+            for i, vpath in enumerate(video_paths):
+                if vpath in clips:
+                    segment_files.append(self._normalized_clip(vpath, w, h, fps))
+                    continue
+                temp_path = os.path.join(self.output_dir, f"_concat_temp_{i}.mp4")
+                temp_files.append(temp_path)
+                self._normalize_video(vpath, temp_path, w, h, fps)
+                segment_files.append(temp_path)
+
+            return self._concat_files(segment_files, output_name)
+        finally:
+            # Cleanup temp files
             for tf in temp_files:
-                # FFmpeg concat needs forward slashes or escaped backslashes
-                safe_path = tf.replace('\\', '/')
-                f.write(f"file '{safe_path}'\n")
+                try:
+                    os.remove(tf)
+                except OSError:
+                    pass
 
-        output_path = os.path.join(self.output_dir, output_name)
-        cmd = [
-            self.ffmpeg, '-y',
-            '-f', 'concat', '-safe', '0',
-            '-i', list_path,
-            '-c', 'copy',
-            output_path
-        ]
+    def _concat_files(self, segment_files, output_name):
+        """
+        Stream-copy concat of already-conformant files → output path.
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+        An MP4 keeps only the first file's avcC/hvcC, so segments whose
+        H.264/HEVC parameter sets (SPS/PPS) differ — e.g. a camera video after
+        an x264 intro — are remuxed to MPEG-TS with Annex B first: the
+        parameter sets then travel in-band with each segment.
+        """
+        infos = [probe(path) for path in segment_files]
+        first = infos[0]
+        same_headers = bool(first.video_extradata_hash) and all(
+            info.video_extradata_hash == first.video_extradata_hash for info in infos
+        )
+        bsf = None if same_headers else ANNEXB_FILTERS.get(first.video_codec)
+
+        with tempfile.TemporaryDirectory(prefix="_concat_", dir=self.output_dir) as work_dir:
+            parts = segment_files
+            if bsf:
+                parts = []
+                for i, path in enumerate(segment_files):
+                    part_path = os.path.join(work_dir, f"part_{i}.ts")
+                    self.runner.run([
+                        self.ffmpeg, '-y', '-i', path,
+                        '-map', '0:v:0', '-map', '0:a:0?',
+                        '-c', 'copy', '-bsf:v', bsf, '-f', 'mpegts', part_path
+                    ], timeout=600)
+                    parts.append(part_path)
+
+            # Create concat list file
+            list_path = os.path.join(work_dir, "concat_list.txt")
+            with open(list_path, 'w', encoding='utf-8') as f:
+                for tf in parts:
+                    # FFmpeg concat needs forward slashes or escaped backslashes
+                    safe_path = os.path.abspath(tf).replace('\\', '/')
+                    f.write(f"file '{safe_path}'\n")
+
+            output_path = os.path.join(self.output_dir, output_name)
+            cmd = [
+                self.ffmpeg, '-y',
+                '-f', 'concat', '-safe', '0',
+                '-i', list_path,
+                '-c', 'copy',
+            ]
+            if '/' in first.video_time_base:
+                cmd += ['-video_track_timescale', first.video_time_base.split('/')[1]]
+            cmd += [output_path]
 
-        # Cleanup temp files
-        for tf in temp_files:
             try:
-                os.remove(tf)
-            except OSError:
-                pass
-        try:
-            os.remove(list_path)
-        except OSError:
-            pass
+                self.runner.run(cmd, timeout=600)
+            except FFmpegCancelled:
+                raise
+            except RuntimeError as e:
+                raise RuntimeError(f"Failed to concatenate videos: {str(e)[-500:]}")
 
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             return output_path
-
-        raise RuntimeError(f"Failed to concatenate videos: {result.stderr[:500]}")
+        raise RuntimeError("Failed to concatenate videos: empty output")
 
     def full_pipeline(self, video_path, channel_name="Film Pendek Pahm",
                       tagline="", intro_path=None, outro_path=None,
@@ -217,21 +509,21 @@ class IntroOutroManager:
         If auto_generate=True and no files: generate text-based intro/outro.
         """
         info = self.get_video_info(video_path)
-        w, h = info['width'], info['height']
+        w, h, fps = info['width'], info['height'], int(info['fps'])
 
         # Generate if needed
         if auto_generate and not intro_path:
             intro_path = self.create_text_intro(
                 text=channel_name,
                 subtitle=tagline or "Presents",
-                duration=4, width=w, height=h
+                duration=4, width=w, height=h, fps=fps
             )
 
         if auto_generate and not outro_path:
             outro_path = self.create_text_outro(
                 text="Terima Kasih Sudah Menonton!",
                 subscribe_text="SUBSCRIBE & LIKE 👍",
-                duration=5, width=w, height=h
+                duration=5, width=w, height=h, fps=fps
             )
 
         return self.add_intro_outro(video_path, intro_path, outro_path)
@@ -0,0 +1,218 @@
+"""
+Modul Loudness - Loudnorm dua pass dengan hasil pengukuran di-cache
+Pass 1: analisa saja (audio only, -vn → tanpa decode video), statistik JSON
+loudnorm disimpan di SQLite per file (path, size, mtime). Kalau envelope
+audio_analysis belum ada, keduanya dihitung dari decode yang sama. Pass 2:
+loudnorm linear (gain tetap) dengan nilai terukur — tidak ada efek "pumping"
+seperti mode dinamis.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from app.ffmpeg_util import get_ffmpeg_path, FFmpegRunner, FFmpegCancelled
+from app.probe_cache import probe
+from app.audio_analysis import analyze_audio, has_audio_analysis, store_audio_analysis
+from app.cache import get_cache_dir, file_key_hash
+
+
+# Target default (sama dengan enhance_audio sebelumnya)
+DEFAULT_TARGET = {'I': -16.0, 'TP': -1.5, 'LRA': 11.0}
+
+# Field JSON loudnorm yang dipakai di pass kedua
+MEASURED_FIELDS = ('input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset')
+
+
+def loudnorm_filter(measured=None, target=None, sample_rate=48000):
+    """
+    String filter loudnorm.
+
+    Args:
+        measured: Hasil LoudnessNormalizer.measure() → mode linear,
+                  None → mode dinamis satu pass (fallback)
+        target: dict {'I', 'TP', 'LRA'} (default DEFAULT_TARGET)
+        sample_rate: loudnorm selalu output 192 kHz, di-resample balik ke sini
+    """
+    target = target or DEFAULT_TARGET
+    base = f"loudnorm=I={target['I']}:TP={target['TP']}:LRA={target['LRA']}"
+    if not measured:
+        return base
+    if measured.get('silent'):
+        # Audio diam total: tidak ada gain yang bisa dihitung (loudnorm
+        # justru menghasilkan NaN), cukup samakan sample rate
+        return f"anull,aformat=sample_rates={sample_rate}"
+    return (
+        f"{base}:measured_I={measured['input_i']}:measured_TP={measured['input_tp']}"
+        f":measured_LRA={measured['input_lra']}:measured_thresh={measured['input_thresh']}"
+        f":offset={measured['target_offset']}:linear=true,aformat=sample_rates={sample_rate}"
+    )
+
+
+def _parse_loudnorm_json(stderr):
+    """Ambil blok JSON terakhir yang dicetak loudnorm (print_format=json)."""
+    end = stderr.rfind('}')
+    start = stderr.rfind('{', 0, end)
+    if start < 0 or end < 0:
+        raise RuntimeError(f"Output loudnorm tidak ditemukan:\n{stderr[-500:]}")
+    data = json.loads(stderr[start:end + 1])
+    measured = {}
+    for field in MEASURED_FIELDS:
+        value = float(data[field])
+        if value != value or value in (float('inf'), float('-inf')):
+            # Audio yang benar-benar diam → -inf, tidak bisa dipakai mode linear
+            if field == 'input_i':
+                return {'silent': True}
+            raise RuntimeError(f"loudnorm: nilai {field} tidak valid ({data[field]})")
+        measured[field] = value
+    return measured
+
+
+class LoudnessNormalizer:
+    """
+    Pengukuran loudness (loudnorm pass 1) dengan cache persistent.
+
+    Key cache: file_key (path, size, mtime — tanpa decode, sama seperti cache
+    lain) + target + rentang waktu.
+    """
+
+    def __init__(self, db_path=None):
+        """
+        Args:
+            db_path: Path SQLite (default: <cache dir>/loudness.sqlite)
+        """
+        self.db_path = db_path or os.path.join(get_cache_dir(), "loudness.sqlite")
+        self.ffmpeg = get_ffmpeg_path()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS loudness ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def make_key(source_key, target, start=None, duration=None):
+        data = json.dumps([source_key, target, start, duration], sort_keys=True)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def _get(self, key):
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT data FROM loudness WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            row = None
+        return json.loads(row[0]) if row else None
+
+    def _put(self, key, measured):
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO loudness (key, data) VALUES (?, ?)",
+                    (key, json.dumps(measured))
+                )
+        except sqlite3.Error:
+            pass
+
+    def measure(self, media_path, target=None, start=None, duration=None, runner=None):
+        """
+        Loudnorm pass 1 (analisa saja, audio only).
+
+        Args:
+            media_path: File audio/video
+            target: dict {'I', 'TP', 'LRA'} (default DEFAULT_TARGET)
+            start: Mulai dari detik ke- (None = dari awal)
+            duration: Durasi yang diukur (None = sampai habis)
+            runner: FFmpegRunner pemanggil (supaya bisa di-cancel), opsional
+
+        Returns:
+            dict {'input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset'},
+            atau {'silent': True} kalau audio diam total
+        """
+        target = target or DEFAULT_TARGET
+        key = self.make_key(file_key_hash(media_path), target, start or None, duration or None)
+        measured = self._get(key)
+        if measured:
+            self.hits += 1
+            return measured
+        self.misses += 1
+
+        analysis_filter = loudnorm_filter(target=target) + ':print_format=json'
+        if not start and not duration and not has_audio_analysis(media_path):
+            # Envelope belum ada → hitung bersama loudnorm dalam satu decode
+            log = []
+            runner = runner or FFmpegRunner()
+            try:
+                analysis = analyze_audio(
+                    media_path, tap_filter=analysis_filter, tap_log=log,
+                    cancelled=lambda: runner.cancelled
+                )
+            except FFmpegCancelled:
+                raise
+            except RuntimeError as e:
+                raise RuntimeError(f"Analisa loudness gagal: {e}")
+            store_audio_analysis(media_path, analysis)
+            measured = _parse_loudnorm_json('\n'.join(log))
+            self._put(key, measured)
+            return measured
+
+        cmd = [self.ffmpeg, '-y', '-nostdin', '-vn', '-sn', '-dn']
+        if start:
+            cmd += ['-ss', f"{start:.3f}"]
+        cmd += ['-i', media_path]
+        if duration:
+            cmd += ['-t', f"{duration:.3f}"]
+        cmd += [
+            '-map', '0:a:0',
+            '-af', analysis_filter,
+            '-f', 'null', '-'
+        ]
+        stderr = (runner or FFmpegRunner()).run(cmd)
+        measured = _parse_loudnorm_json(stderr)
+        self._put(key, measured)
+        return measured
+
+    def linear_filter(self, media_path, target=None, start=None, duration=None,
+                      sample_rate=None, runner=None):
+        """
+        Filter loudnorm pass 2 (linear) untuk file ini. Kalau pengukuran gagal
+        (misal audio diam total) → fallback ke loudnorm dinamis.
+
+        Args:
+            sample_rate: Sample rate output (None = sama dengan sumber, fallback 48 kHz)
+        """
+        try:
+            measured = self.measure(media_path, target, start, duration, runner)
+        except FFmpegCancelled:
+            raise
+        except (RuntimeError, ValueError, KeyError):
+            measured = None
+        if not sample_rate:
+            try:
+                sample_rate = probe(media_path).sample_rate or 48000
+            except Exception:
+                sample_rate = 48000
+        return loudnorm_filter(measured, target, sample_rate)
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM loudness")
+
+
+_default_normalizer = None
+_default_lock = threading.Lock()
+
+
+def get_loudness_normalizer():
+    """LoudnessNormalizer bersama untuk seluruh proses."""
+    global _default_normalizer
+    with _default_lock:
+        if _default_normalizer is None:
+            _default_normalizer = LoudnessNormalizer()
+        return _default_normalizer
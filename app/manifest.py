@@ -0,0 +1,144 @@
+"""
+Batch Manifest — checkpoint per step untuk batch processing yang bisa di-resume
+Setiap step yang selesai dicatat (output, fingerprint input, hash opsi) di SQLite,
+jadi run berikutnya bisa skip step yang input & opsinya tidak berubah.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from app.cache import file_key_hash
+
+
+def options_hash(options):
+    """Hash stabil dari dict/list opsi (urutan key tidak berpengaruh)."""
+    data = json.dumps(options, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def input_fingerprint(value):
+    """
+    Fingerprint input step: file → file_key_hash, selain itu hash dari nilainya
+    (misal URL untuk step download).
+    """
+    if isinstance(value, str) and os.path.isfile(value):
+        return file_key_hash(value)
+    return options_hash(value)
+
+
+def _output_paths(output):
+    """Kumpulkan semua path file di output step (str / list / dict)."""
+    if isinstance(output, str):
+        return [output]
+    if isinstance(output, (list, tuple)):
+        return [p for item in output for p in _output_paths(item)]
+    if isinstance(output, dict):
+        return [p for item in output.values() for p in _output_paths(item)]
+    return []
+
+
+class BatchManifest:
+    """
+    Manifest durable untuk satu folder batch.
+
+    Tabel `steps`: (video, step) → input fingerprint, hash opsi, output (JSON).
+    Ditulis segera setelah step selesai, jadi crash / stop() di tengah jalan
+    tidak menghilangkan encode yang sudah jadi.
+    """
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: Path file SQLite manifest
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS steps ("
+                "video TEXT NOT NULL, step TEXT NOT NULL, "
+                "input_key TEXT NOT NULL, options_hash TEXT NOT NULL, "
+                "output TEXT, completed_at TEXT NOT NULL, "
+                "PRIMARY KEY (video, step))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def lookup(self, video, step, input_value, options):
+        """
+        Cari hasil step yang masih valid.
+
+        Returns:
+            (True, output) kalau input, opsi sama dan semua file output masih ada,
+            selain itu (False, None)
+        """
+        try:
+            input_key = input_fingerprint(input_value)
+        except OSError:
+            return False, None
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT input_key, options_hash, output FROM steps "
+                "WHERE video = ? AND step = ?", (video, step)
+            ).fetchone()
+
+        if not row or row[0] != input_key or row[1] != options_hash(options):
+            return False, None
+
+        output = json.loads(row[2]) if row[2] else None
+        if not all(os.path.exists(p) for p in _output_paths(output)):
+            return False, None
+        return True, output
+
+    def record(self, video, step, input_value, options, output):
+        """Catat step yang baru selesai (overwrite catatan lama)."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO steps "
+                "(video, step, input_key, options_hash, output, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (video, step, input_fingerprint(input_value), options_hash(options),
+                 json.dumps(output, ensure_ascii=False), datetime.now().isoformat())
+            )
+
+    def run_step(self, video, step, input_value, options, func):
+        """
+        Jalankan step dengan checkpoint: skip kalau sudah ada hasil valid.
+
+        Args:
+            video: ID video (URL)
+            step: Nama step
+            input_value: Path input (atau nilai lain, misal URL)
+            options: Opsi yang mempengaruhi hasil step
+            func: Callable tanpa argumen yang menjalankan step
+
+        Returns:
+            (output, skipped)
+        """
+        found, output = self.lookup(video, step, input_value, options)
+        if found:
+            return output, True
+        output = func()
+        self.record(video, step, input_value, options, output)
+        return output, False
+
+    def completed_steps(self, video):
+        """List nama step yang sudah tercatat untuk satu video."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT step FROM steps WHERE video = ? ORDER BY completed_at", (video,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def clear(self, video=None):
+        """Hapus catatan (satu video atau semuanya)."""
+        with self._lock, self._connect() as conn:
+            if video is None:
+                conn.execute("DELETE FROM steps")
+            else:
+                conn.execute("DELETE FROM steps WHERE video = ?", (video,))
@@ -0,0 +1,183 @@
+"""
+Whisper Model Registry - model Whisper di-load sekali per proses & dipakai bersama
+Key: (model_size, device, dtype); tiap key punya pool instance yang dipinjam
+eksklusif, dengan LRU eviction berdasarkan budget memori.
+"""
+import threading
+from collections import OrderedDict
+
+
+# Perkiraan memori model (MB, fp32) untuk eviction
+MODEL_MEMORY_MB = {
+    'tiny': 150,
+    'base': 290,
+    'small': 970,
+    'medium': 3000,
+    'large': 6000,
+    'large-v1': 6000,
+    'large-v2': 6000,
+    'large-v3': 6000,
+    'turbo': 3200,
+}
+
+
+def default_device():
+    """'cuda' kalau tersedia, selain itu 'cpu'."""
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def default_dtype(device):
+    """fp16 hanya di GPU (Whisper di CPU selalu fp32)."""
+    return "float16" if device == "cuda" else "float32"
+
+
+def estimate_model_mb(model_size, dtype="float32"):
+    base_name = model_size.split('.')[0]
+    mb = MODEL_MEMORY_MB.get(base_name, MODEL_MEMORY_MB['large'])
+    return mb // 2 if dtype == "float16" else mb
+
+
+class WhisperModelRegistry:
+    """
+    Registry model Whisper untuk seluruh proses.
+
+    - acquire() meminjamkan satu instance yang sedang idle (instance dipakai
+      eksklusif: decode Whisper memasang kv-cache hook di modul decoder, jadi
+      satu instance tidak boleh transcribe dari dua thread bersamaan)
+    - Kalau semua instance untuk key itu sedang dipakai, instance baru di-load
+      (maks max_instances per key); lewat dari itu acquire() menunggu
+    - release() mengembalikan instance; tetap di memori sampai di-evict
+    - Kalau total memori melebihi budget, instance idle yang paling lama tidak
+      dipakai di-evict duluan (instance yang sedang dipakai tidak pernah)
+    """
+
+    def __init__(self, memory_budget_mb=8000, max_instances=4):
+        """
+        Args:
+            memory_budget_mb: Budget memori total untuk model (None = tanpa batas)
+            max_instances: Maksimal instance per key (= transcription paralel
+                           dengan model yang sama)
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self.max_instances = max(1, max_instances)
+        self._models = OrderedDict()   # id(model) → {'key', 'model', 'busy', 'mb'}
+        self._loading = {}             # key → jumlah instance yang sedang di-load
+        self._cond = threading.Condition()
+        self.loads = 0
+        self.hits = 0
+
+    @staticmethod
+    def make_key(model_size, device=None, dtype=None):
+        device = device or default_device()
+        dtype = dtype or default_dtype(device)
+        return (model_size, device, dtype)
+
+    def _used_mb(self):
+        """Memori instance yang ada + yang sedang di-load. Dipanggil dengan lock."""
+        loading = sum(estimate_model_mb(key[0], key[2]) * n for key, n in self._loading.items())
+        return sum(entry['mb'] for entry in self._models.values()) + loading
+
+    def _evict(self, needed_mb=0):
+        """Evict instance idle (LRU) sampai muat di budget. Dipanggil dengan lock."""
+        if self.memory_budget_mb is None:
+            return
+        used = self._used_mb()
+        for instance_id in list(self._models.keys()):
+            if used + needed_mb <= self.memory_budget_mb:
+                break
+            entry = self._models[instance_id]
+            if entry['busy']:
+                continue
+            used -= entry['mb']
+            del self._models[instance_id]
+
+    def _count(self, key):
+        """Jumlah instance key ini (termasuk yang sedang di-load). Dipanggil dengan lock."""
+        loaded = sum(1 for entry in self._models.values() if entry['key'] == key)
+        return loaded + self._loading.get(key, 0)
+
+    def acquire(self, model_size, device=None, dtype=None):
+        """
+        Pinjam instance model (load kalau semua instance sedang dipakai).
+        Wajib dipasangkan dengan release(key, model).
+
+        Returns:
+            (key, model)
+        """
+        key = self.make_key(model_size, device, dtype)
+        mb = estimate_model_mb(model_size, key[2])
+
+        with self._cond:
+            while True:
+                for instance_id, entry in self._models.items():
+                    if entry['key'] == key and not entry['busy']:
+                        entry['busy'] = True
+                        self._models.move_to_end(instance_id)
+                        self.hits += 1
+                        return key, entry['model']
+
+                count = self._count(key)
+                # Instance idle key lain boleh di-evict; instance pertama selalu
+                # boleh di-load (budget hanya membatasi instance tambahan)
+                idle_mb = sum(e['mb'] for e in self._models.values() if not e['busy'])
+                fits = (self.memory_budget_mb is None or count == 0
+                        or self._used_mb() - idle_mb + mb <= self.memory_budget_mb)
+                if count < self.max_instances and fits:
+                    self._evict(mb)
+                    self._loading[key] = self._loading.get(key, 0) + 1
+                    break
+                # Semua instance sedang dipakai → tunggu ada yang dikembalikan
+                self._cond.wait()
+
+        model = None
+        try:
+            import whisper
+            model = whisper.load_model(model_size, device=key[1])
+            return key, model
+        finally:
+            with self._cond:
+                self._loading[key] -= 1
+                if not self._loading[key]:
+                    del self._loading[key]
+                if model is not None:
+                    self._models[id(model)] = {'key': key, 'model': model, 'busy': True, 'mb': mb}
+                    self.loads += 1
+                self._cond.notify_all()
+
+    def release(self, key, model):
+        """Kembalikan instance model; evict kalau budget terlewati."""
+        with self._cond:
+            entry = self._models.get(id(model))
+            if entry is None or entry['key'] != key:
+                return
+            entry['busy'] = False
+            self._evict()
+            self._cond.notify_all()
+
+    def clear(self):
+        """Buang semua instance yang sedang tidak dipakai."""
+        with self._cond:
+            for instance_id in [i for i, e in self._models.items() if not e['busy']]:
+                del self._models[instance_id]
+
+    def loaded(self):
+        """List key model yang sedang ada di memori (satu item per instance)."""
+        with self._cond:
+            return [entry['key'] for entry in self._models.values()]
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Registry model bersama untuk seluruh proses."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = WhisperModelRegistry()
+        return _default_registry
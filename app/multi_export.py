@@ -3,8 +3,10 @@ Multi-Platform Export — Export video untuk TikTok, Instagram Reels, Facebook,
 Menggunakan FFmpeg untuk resize, crop, dan re-encode sesuai platform specs
 """
 import os
-import subprocess
-from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path
+from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path, FFmpegRunner, FFmpegCancelled
+from app.probe_cache import probe
+from app.loudness import get_loudness_normalizer
+from app.smart_crop import get_crop_analysis
 
 
 class MultiPlatformExporter:
@@ -110,28 +112,25 @@ class MultiPlatformExporter:
         },
     }
 
+    # Di bawah ini video tidak layak ditonton → export ditolak, bukan diperbesar
+    MIN_VIDEO_KBPS = 64
+
     def __init__(self, output_dir="output"):
         self.output_dir = output_dir
         self.ffmpeg = get_ffmpeg_path()
         self.ffprobe = get_ffprobe_path()
+        self.runner = FFmpegRunner()
         os.makedirs(output_dir, exist_ok=True)
 
     def get_video_duration(self, video_path):
         """Get video duration in seconds."""
-        cmd = [
-            self.ffprobe, '-v', 'quiet',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-            return float(result.stdout.strip())
+            return probe(video_path).duration
         except Exception:
             return 0
 
     def export(self, video_path, platform, start_time=0, duration=None,
-               crop_mode='smart'):
+               crop_mode='smart', normalize_audio=False):
         """
         Export video for a specific platform.
         
@@ -140,59 +139,171 @@ class MultiPlatformExporter:
             platform: Platform key (e.g., 'tiktok', 'instagram_reels')
             start_time: Start time in seconds (for trimming)
             duration: Duration in seconds (None = use max or full)
-            crop_mode: 'smart' (center crop), 'pad' (add black bars), 'stretch'
+            crop_mode: 'smart' (crop follows the subject), 'center',
+                       'pad' (add black bars), 'stretch'
+            normalize_audio: Two-pass linear loudnorm on the exported range
+                             (measurement is cached, shared across platforms)
         """
         if platform not in self.PLATFORMS:
             raise ValueError(f"Unknown platform: {platform}. Available: {list(self.PLATFORMS.keys())}")
 
         spec = self.PLATFORMS[platform]
         vid_duration = self.get_video_duration(video_path)
+        out_duration = self._output_duration(spec, vid_duration, duration)
+        vf = self._video_filter(
+            spec, crop_mode, self._crop_analysis(video_path, crop_mode), start_time, out_duration
+        )
+
+        # Build FFmpeg command
+        output_path = self._output_path(video_path, platform)
+
+        cmd = [
+            self.ffmpeg, '-y',
+            '-ss', str(start_time),
+            '-i', video_path,
+        ]
+
+        if out_duration:
+            cmd.extend(['-t', str(out_duration)])
+
+        if normalize_audio and probe(video_path).has_audio:
+            cmd.extend(['-af', get_loudness_normalizer().linear_filter(
+                video_path, start=start_time, duration=out_duration,
+                sample_rate=44100, runner=self.runner
+            )])
 
-        # Determine output duration
+        cmd.extend(['-vf', vf, '-r', str(spec['fps'])])
+        cmd.extend(self._encode_args(
+            spec, self._encoded_duration(vid_duration, start_time, out_duration)
+        ))
+        cmd.append(output_path)
+
+        error = ""
+        try:
+            self.runner.run(cmd, timeout=600)
+        except FFmpegCancelled:
+            raise
+        except RuntimeError as e:
+            error = str(e)
+
+        return self._check_output(output_path, spec, error)
+
+    @staticmethod
+    def _output_duration(spec, vid_duration, duration=None):
+        """Durasi output sesuai batas platform (None = durasi penuh)."""
         if duration:
-            out_duration = min(duration, spec['max_duration'])
-        elif vid_duration > spec['max_duration']:
-            out_duration = spec['max_duration']
-        else:
-            out_duration = None  # Use full duration
+            return min(duration, spec['max_duration'])
+        if vid_duration > spec['max_duration']:
+            return spec['max_duration']
+        return None
 
-        # Build video filter
+    @staticmethod
+    def _crop_analysis(video_path, crop_mode):
+        """Analisa smart crop (cache per file), None kalau tidak dipakai / gagal."""
+        if crop_mode != 'smart':
+            return None
+        try:
+            return get_crop_analysis(video_path)
+        except FFmpegCancelled:
+            raise
+        except (RuntimeError, ValueError, OSError):
+            return None
+
+    @staticmethod
+    def _video_filter(spec, crop_mode='smart', crop=None, start_time=0, duration=None):
+        """
+        Filter geometry (scale/crop/pad) untuk ukuran platform.
+
+        Args:
+            crop: CropAnalysis untuk crop_mode 'smart' (None = center crop)
+            start_time, duration: Rentang sumber yang di-render (jalur crop)
+        """
         tw, th = spec['width'], spec['height']
-        if crop_mode == 'smart':
+        if crop_mode == 'smart' and crop is not None:
+            vf = crop.crop_filter(tw, th, start_time, duration)
+            if vf:
+                return vf
+        if crop_mode in ('smart', 'center'):
             # Center crop to target aspect ratio
-            vf = (
+            return (
                 f"scale=max({tw}\\,iw*{th}/ih):max({th}\\,ih*{tw}/iw),"
                 f"crop={tw}:{th}:(iw-{tw})/2:(ih-{th})/2,"
                 f"setsar=1"
             )
-        elif crop_mode == 'pad':
+        if crop_mode == 'pad':
             # Scale + pad (letterbox/pillarbox)
-            vf = (
+            return (
                 f"scale={tw}:{th}:force_original_aspect_ratio=decrease,"
                 f"pad={tw}:{th}:(ow-iw)/2:(oh-ih)/2:black,"
                 f"setsar=1"
             )
-        else:  # stretch
-            vf = f"scale={tw}:{th},setsar=1"
+        # stretch
+        return f"scale={tw}:{th},setsar=1"
 
-        # Build FFmpeg command
-        output_name = f"{os.path.splitext(os.path.basename(video_path))[0]}_{platform}.mp4"
-        output_path = os.path.join(self.output_dir, output_name)
+    @staticmethod
+    def _encoded_duration(vid_duration, start_time=0, out_duration=None):
+        """Durasi yang benar-benar di-encode (untuk budget ukuran file)."""
+        if out_duration:
+            return out_duration
+        return max((vid_duration or 0) - (start_time or 0), 0)
 
-        cmd = [
-            self.ffmpeg, '-y',
-            '-ss', str(start_time),
-            '-i', video_path,
-        ]
+    @staticmethod
+    def _kbps(rate):
+        """Bitrate FFmpeg ('8M', '128k', '800000') → kbps."""
+        rate = str(rate).strip().lower()
+        if rate.endswith('m'):
+            return int(float(rate[:-1]) * 1000)
+        if rate.endswith('k'):
+            return int(float(rate[:-1]))
+        return int(float(rate) / 1000)
 
-        if out_duration:
-            cmd.extend(['-t', str(out_duration)])
+    @classmethod
+    def _video_budget_kbps(cls, spec, duration):
+        """
+        Bitrate video maksimal supaya output <= max_size_mb.
+
+        Dengan -maxrate R dan -bufsize 2R, VBV menjamin total bit video
+        <= R * durasi + bufsize, jadi bufsize ikut dikurangkan dari budget.
+        Sisa 3% untuk overhead container. Budget tidak pernah dinaikkan ke
+        batas bawah tertentu (itu melanggar max_size_mb); kalau terlalu kecil
+        (< MIN_VIDEO_KBPS) → ValueError.
+        """
+        if not duration or duration <= 0:
+            return None
+        total_kbit = spec['max_size_mb'] * 8 * 1024 * 0.97
+        audio_kbit = cls._kbps(spec['audio_bitrate']) * duration
+        budget = int((total_kbit - audio_kbit) / (duration + 2))
+        if budget < cls.MIN_VIDEO_KBPS:
+            raise ValueError(
+                f"{spec['name']}: {duration:.0f}s does not fit in {spec['max_size_mb']} MB "
+                f"(video budget {budget} kbps < {cls.MIN_VIDEO_KBPS} kbps)"
+            )
+        return budget
+
+    @classmethod
+    def _video_rate_args(cls, spec, duration=None):
+        """
+        Rate control video. Bitrate nominal platform masih muat dalam batas
+        ukuran → dipakai apa adanya. Kalau tidak, bitrate target dihitung di
+        depan dan dikunci dengan -maxrate/-bufsize, jadi batas ukuran
+        terpenuhi dalam satu encode (tanpa re-encode _reduce_size).
+        """
+        budget = cls._video_budget_kbps(spec, duration)
+        if budget is None or cls._kbps(spec['video_bitrate']) <= budget:
+            return ['-b:v', spec['video_bitrate']]
+        return ['-b:v', f'{budget}k', '-maxrate', f'{budget}k', '-bufsize', f'{budget * 2}k']
 
-        cmd.extend([
-            '-vf', vf,
-            '-r', str(spec['fps']),
+    @classmethod
+    def _encode_args(cls, spec, duration=None):
+        """
+        Argumen encoder video + audio untuk satu platform.
+
+        Args:
+            duration: Durasi output (detik) untuk budget ukuran, None = tanpa batas
+        """
+        return [
             '-c:v', spec['codec'],
-            '-b:v', spec['video_bitrate'],
+            *cls._video_rate_args(spec, duration),
             '-preset', 'medium',
             '-c:a', 'aac',
             '-b:a', spec['audio_bitrate'],
@@ -200,11 +311,14 @@ class MultiPlatformExporter:
             '-ac', '2',
             '-pix_fmt', 'yuv420p',
             '-movflags', '+faststart',
-            output_path
-        ])
+        ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+    def _output_path(self, video_path, platform):
+        output_name = f"{os.path.splitext(os.path.basename(video_path))[0]}_{platform}.mp4"
+        return os.path.join(self.output_dir, output_name)
 
+    def _check_output(self, output_path, spec, error=""):
+        """Output valid → path (diperkecil kalau melewati batas ukuran)."""
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             # Check file size limit
             size_mb = os.path.getsize(output_path) / (1024 * 1024)
@@ -213,10 +327,109 @@ class MultiPlatformExporter:
                 return self._reduce_size(output_path, spec)
             return output_path
 
-        raise RuntimeError(f"Export failed for {spec['name']}: {result.stderr[:500]}")
+        raise RuntimeError(f"Export failed for {spec['name']}: {error[:500]}")
+
+    def build_fan_out_command(self, video_path, platforms, start_time=0, duration=None,
+                              crop_mode='smart', normalize_audio=False):
+        """
+        Satu command FFmpeg untuk banyak platform: source di-decode sekali,
+        `split` ke tiap geometry unik (platform dengan scale/crop/fps sama
+        berbagi satu cabang), lalu tiap cabang ke encoder masing-masing.
+
+        Returns:
+            (cmd, {platform: output_path})
+        """
+        vid_duration = self.get_video_duration(video_path)
+        info = probe(video_path)
+        crop = self._crop_analysis(video_path, crop_mode)
+        # Jalur crop dibuat untuk output terpanjang, jadi platform dengan
+        # aspect sama tetap berbagi satu cabang
+        durations = [self._output_duration(self.PLATFORMS[p], vid_duration, duration)
+                     for p in platforms]
+        crop_duration = None if None in durations else max(durations)
+
+        # Kelompokkan platform per geometry (filter + fps)
+        geometries = {}
+        for platform in platforms:
+            spec = self.PLATFORMS[platform]
+            vf = self._video_filter(spec, crop_mode, crop, start_time, crop_duration)
+            key = (vf, spec['fps'])
+            geometries.setdefault(key, []).append(platform)
+
+        parts = []
+        branch_labels = [f"g{i}" for i in range(len(geometries))]
+        if len(geometries) > 1:
+            parts.append(f"[0:v]split={len(geometries)}" + ''.join(f"[{l}]" for l in branch_labels))
+        else:
+            branch_labels = ['0:v']
+
+        video_out = {}
+        for i, ((vf, fps), group) in enumerate(geometries.items()):
+            chain = f"[{branch_labels[i]}]{vf},fps={fps},format=yuv420p"
+            if len(group) == 1:
+                parts.append(f"{chain}[v_{group[0]}]")
+            else:
+                # Satu stream hasil scale → beberapa encoder
+                parts.append(f"{chain},split={len(group)}" + ''.join(f"[v_{p}]" for p in group))
+            for platform in group:
+                video_out[platform] = f"[v_{platform}]"
+
+        # Audio: loudnorm per rentang output (sama → dipakai bersama lewat asplit)
+        audio_out = {}
+        if normalize_audio and info.has_audio:
+            audio_groups = {}
+            for platform in platforms:
+                out_duration = self._output_duration(self.PLATFORMS[platform], vid_duration, duration)
+                af = get_loudness_normalizer().linear_filter(
+                    video_path, start=start_time, duration=out_duration,
+                    sample_rate=44100, runner=self.runner
+                )
+                audio_groups.setdefault(af, []).append(platform)
+            for af, group in audio_groups.items():
+                if len(group) == 1:
+                    parts.append(f"[0:a]{af}[a_{group[0]}]")
+                else:
+                    parts.append(f"[0:a]{af},asplit={len(group)}" + ''.join(f"[a_{p}]" for p in group))
+                for platform in group:
+                    audio_out[platform] = f"[a_{platform}]"
+
+        cmd = [self.ffmpeg, '-y', '-ss', str(start_time), '-i', video_path,
+               '-filter_complex', ';'.join(parts)]
+        outputs = {}
+        for platform in platforms:
+            spec = self.PLATFORMS[platform]
+            outputs[platform] = self._output_path(video_path, platform)
+            cmd += ['-map', video_out[platform]]
+            if platform in audio_out:
+                cmd += ['-map', audio_out[platform]]
+            elif info.has_audio:
+                cmd += ['-map', '0:a:0']
+            out_duration = self._output_duration(spec, vid_duration, duration)
+            if out_duration:
+                cmd += ['-t', str(out_duration)]
+            cmd += self._encode_args(
+                spec, self._encoded_duration(vid_duration, start_time, out_duration)
+            )
+            cmd.append(outputs[platform])
+        return cmd, outputs
+
+    def _export_fan_out(self, video_path, platforms, start_time=0, duration=None,
+                        crop_mode='smart', normalize_audio=False):
+        """Jalankan build_fan_out_command → {platform: output_path}."""
+        cmd, outputs = self.build_fan_out_command(
+            video_path, platforms, start_time, duration, crop_mode, normalize_audio
+        )
+        self.runner.run(cmd, timeout=600 * len(platforms))
+        return {
+            platform: self._check_output(path, self.PLATFORMS[platform])
+            for platform, path in outputs.items()
+        }
 
     def _reduce_size(self, video_path, spec):
-        """Re-encode video with lower bitrate to meet size limit."""
+        """
+        Re-encode video with lower bitrate to meet size limit.
+        Safety net only: export sudah membatasi bitrate di depan (_video_rate_args).
+        """
         # Calculate target bitrate from max size and duration
         duration = self.get_video_duration(video_path)
         if duration <= 0:
@@ -224,7 +437,12 @@ class MultiPlatformExporter:
 
         target_total_kbps = int((spec['max_size_mb'] * 8 * 1024) / duration * 0.9)
         audio_kbps = int(spec['audio_bitrate'].replace('k', ''))
-        video_kbps = max(target_total_kbps - audio_kbps, 500)
+        video_kbps = target_total_kbps - audio_kbps
+        if video_kbps < self.MIN_VIDEO_KBPS:
+            raise RuntimeError(
+                f"Export failed for {spec['name']}: {duration:.0f}s does not fit in "
+                f"{spec['max_size_mb']} MB"
+            )
 
         output_path = video_path.replace('.mp4', '_resized.mp4')
         cmd = [
@@ -237,7 +455,12 @@ class MultiPlatformExporter:
             output_path
         ]
 
-        subprocess.run(cmd, capture_output=True, timeout=600)
+        try:
+            self.runner.run(cmd, timeout=600)
+        except FFmpegCancelled:
+            raise
+        except RuntimeError:
+            pass
 
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             # Replace original
@@ -247,15 +470,37 @@ class MultiPlatformExporter:
         return video_path
 
     def export_multi(self, video_path, platforms=None, start_time=0,
-                     duration=None, crop_mode='smart'):
-        """Export video to multiple platforms at once."""
+                     duration=None, crop_mode='smart', normalize_audio=False,
+                     fan_out=True):
+        """
+        Export video to multiple platforms at once.
+
+        Args:
+            fan_out: Decode source sekali untuk semua platform (lihat
+                     build_fan_out_command). Kalau job gabungan gagal, tiap
+                     platform di-export sendiri supaya error per platform jelas.
+        """
         if platforms is None:
             platforms = ['tiktok', 'instagram_reels', 'facebook']
 
+        outputs = {}
+        unknown = [p for p in platforms if p not in self.PLATFORMS]
+        if fan_out and len(platforms) > 1 and not unknown:
+            try:
+                outputs = self._export_fan_out(
+                    video_path, platforms, start_time, duration, crop_mode, normalize_audio
+                )
+            except FFmpegCancelled:
+                raise
+            except (RuntimeError, ValueError):
+                outputs = {}
+
         results = {}
         for platform in platforms:
             try:
-                output = self.export(video_path, platform, start_time, duration, crop_mode)
+                output = outputs.get(platform) or self.export(
+                    video_path, platform, start_time, duration, crop_mode, normalize_audio
+                )
                 results[platform] = {
                     'status': 'success',
                     'path': output,
@@ -266,7 +511,7 @@ class MultiPlatformExporter:
                 results[platform] = {
                     'status': 'error',
                     'error': str(e),
-                    'platform_name': self.PLATFORMS[platform]['name'],
+                    'platform_name': self.PLATFORMS.get(platform, {}).get('name', platform),
                 }
 
         return results
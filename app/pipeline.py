@@ -0,0 +1,363 @@
+"""
+Modul Render Pipeline - Gabungkan step-step optimasi jadi SATU encode FFmpeg
+Setiap step (audio enhance, silence, speed, watermark, color grading,
+subtitle, YouTube export) menyumbang fragment filter graph, lalu semuanya
+di-render sekali jalan lewat satu -filter_complex.
+"""
+import os
+from app.ffmpeg_util import get_ffmpeg_path, get_media_duration, FFmpegRunner
+from app.probe_cache import probe
+from app.editor import VideoEditor
+from app.watermark import WatermarkOverlay
+from app.color_grading import ColorGrading
+from app.subtitler import AutoSubtitler
+
+
+class RenderPipeline:
+    """
+    Planner untuk chain optimasi: kumpulkan step yang aktif sebagai
+    filter graph, lalu encode sekali (tanpa generational loss antar step).
+
+    Urutan filter mengikuti urutan step di GUI:
+        silence cut → speed → watermark → color grading → subtitle → export
+    Audio: silence cut → enhance (loudnorm) → atempo
+    """
+
+    def __init__(self, output_dir="output"):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.ffmpeg = get_ffmpeg_path()
+        self.progress_callback = None
+        self.editor = VideoEditor(output_dir=output_dir)
+        self.runner = FFmpegRunner()
+
+        # Step yang aktif (None/False = tidak dipakai)
+        self.silence_options = None
+        self.audio_enhance = False
+        self.speed = None
+        self.watermark = None
+        self.color_preset = None
+        self.subtitle = None
+        self.export_resolution = None
+
+        # Cache hasil deteksi silence per input (dipakai render_audio & run)
+        self._segments_cache = {}
+
+    def set_progress_callback(self, callback):
+        self.progress_callback = callback
+        self.editor.set_progress_callback(callback)
+
+    def _update(self, pct, text):
+        if self.progress_callback:
+            self.progress_callback(pct, text)
+
+    # ===== STEP BUILDERS =====
+
+    def add_audio_enhance(self):
+        self.audio_enhance = True
+        return self
+
+    def add_silence_removal(self, noise_threshold="-30dB", min_duration=2.0, padding=0.3):
+        self.silence_options = {
+            'noise_threshold': noise_threshold,
+            'min_duration': min_duration,
+            'padding': padding,
+        }
+        return self
+
+    def add_speed(self, speed=1.05):
+        self.speed = speed
+        return self
+
+    def add_image_watermark(self, logo_path, position="bottom-right",
+                            opacity=0.7, scale_percent=10):
+        self.watermark = {
+            'type': 'image',
+            'logo_path': logo_path,
+            'position': position,
+            'opacity': opacity,
+            'scale_percent': scale_percent,
+        }
+        return self
+
+    def add_text_watermark(self, text, position="bottom-right", font_size=24,
+                           font_color="white", opacity=0.5):
+        self.watermark = {
+            'type': 'text',
+            'text': text,
+            'position': position,
+            'font_size': font_size,
+            'font_color': font_color,
+            'opacity': opacity,
+        }
+        return self
+
+    def add_color_grade(self, preset_id):
+        # Validasi lebih awal supaya error muncul sebelum encode
+        ColorGrading.preset_filter(preset_id)
+        self.color_preset = preset_id
+        return self
+
+    def add_subtitle(self, subtitle_path, subtitle_style=None):
+        self.subtitle = {'path': subtitle_path, 'style': subtitle_style}
+        return self
+
+    def add_youtube_export(self, resolution="1080p"):
+        self.export_resolution = resolution
+        return self
+
+    # ===== PLANNING =====
+
+    def has_audio_steps(self):
+        return bool(self.silence_options or self.audio_enhance or self.speed)
+
+    def has_video_steps(self):
+        return bool(self.silence_options or self.speed or self.watermark or
+                    self.color_preset or self.subtitle or self.export_resolution)
+
+    def is_empty(self):
+        return not (self.has_audio_steps() or self.has_video_steps())
+
+    def _plan_segments(self, video_path):
+        """Deteksi silence sekali per input, hasilnya dipakai ulang."""
+        if not self.silence_options:
+            return None
+        if video_path in self._segments_cache:
+            return self._segments_cache[video_path]
+        if not probe(video_path).has_audio:
+            # Tanpa audio tidak ada silence yang bisa dideteksi
+            self._segments_cache[video_path] = None
+            return None
+
+        opts = self.silence_options
+        silences = self.editor.detect_silence(
+            video_path, opts['noise_threshold'], opts['min_duration']
+        )
+        segments = None
+        if silences:
+            media = probe(video_path)
+            segments = self.editor.compute_keep_segments(
+                silences, media.duration, opts['padding'], fps=media.fps
+            ) or None
+
+        self._segments_cache[video_path] = segments
+        return segments
+
+    def _audio_chain(self, video_path):
+        """Filter audio linear setelah silence cut."""
+        filters = []
+        if self.audio_enhance:
+            # Loudness diukur dari sumber; gating loudnorm mengabaikan bagian
+            # diam, jadi hasilnya tetap berlaku setelah silence cut
+            filters.append(self.editor.enhance_audio_filter(video_path))
+        if self.speed:
+            filters.append(self.editor.speed_filters(self.speed)[1])
+        return ','.join(filters)
+
+    def build_filter_graph(self, video_path, audio_only=False):
+        """
+        Bangun satu filter_complex dari semua step yang aktif.
+
+        Args:
+            video_path: Path video input
+            audio_only: Hanya bangun bagian audio (untuk render_audio)
+
+        Returns:
+            dict: {
+                'filter_complex': str,
+                'video_out': label output video atau None (pakai 0:v apa adanya),
+                'audio_out': label output audio atau None (pakai 0:a apa adanya),
+                'has_audio': False kalau sumber tidak punya stream audio,
+                'extra_inputs': list path input tambahan (logo watermark),
+            }
+        """
+        parts = []
+        extra_inputs = []
+        has_audio = probe(video_path).has_audio
+        v_label, a_label = '0:v', '0:a' if has_audio else None
+        video_out, audio_out = None, None
+        counter = [0]
+
+        def next_label(prefix):
+            counter[0] += 1
+            return f"{prefix}step{counter[0]}"
+
+        # 1. Silence cut (trim/concat dari input asli)
+        segments = self._plan_segments(video_path)
+        if segments:
+            v_out = None if audio_only else 'vseg'
+            parts.append(self.editor.segment_filter(
+                segments, None if audio_only else v_label, a_label, v_out, 'aseg',
+                fps=probe(video_path).fps
+            ))
+            a_label = audio_out = 'aseg'
+            if not audio_only:
+                v_label = video_out = 'vseg'
+
+        # 2. Audio chain (enhance + atempo), hanya kalau sumber punya audio
+        audio_chain = self._audio_chain(video_path) if has_audio else ''
+        if audio_chain:
+            out = next_label('a')
+            parts.append(f"[{a_label}]{audio_chain}[{out}]")
+            a_label = audio_out = out
+
+        if not audio_only:
+            # 3. Speed (video)
+            if self.speed:
+                out = next_label('v')
+                parts.append(f"[{v_label}]{self.editor.speed_filters(self.speed)[0]}[{out}]")
+                v_label = video_out = out
+
+            # 4. Watermark
+            if self.watermark:
+                wm_tool = WatermarkOverlay(output_dir=self.output_dir)
+                wm = self.watermark
+                out = next_label('v')
+                if wm['type'] == 'image':
+                    extra_inputs.append(wm['logo_path'])
+                    logo_in = f"{len(extra_inputs)}:v"
+                    parts.append(wm_tool.image_watermark_filter(
+                        v_label, logo_in, out, wm['position'],
+                        wm['opacity'], wm['scale_percent']
+                    ))
+                else:
+                    parts.append(f"[{v_label}]" + wm_tool.text_watermark_filter(
+                        wm['text'], wm['position'], wm['font_size'],
+                        wm['font_color'], wm['opacity']
+                    ) + f"[{out}]")
+                v_label = video_out = out
+
+            # 5. Color grading
+            if self.color_preset:
+                out = next_label('v')
+                vf = ColorGrading.preset_filter(self.color_preset)
+                parts.append(f"[{v_label}]{vf}[{out}]")
+                v_label = video_out = out
+
+            # 6. Subtitle burn
+            if self.subtitle:
+                out = next_label('v')
+                vf = AutoSubtitler.subtitle_filter(self.subtitle['path'], self.subtitle['style'])
+                parts.append(f"[{v_label}]{vf}[{out}]")
+                v_label = video_out = out
+
+            # 7. YouTube export scale/pad
+            if self.export_resolution:
+                out = next_label('v')
+                vf, _ = self.editor.youtube_export_settings(self.export_resolution)
+                parts.append(f"[{v_label}]{vf}[{out}]")
+                v_label = video_out = out
+
+        return {
+            'filter_complex': ';'.join(p.rstrip(';') for p in parts),
+            'video_out': video_out,
+            'audio_out': audio_out,
+            'has_audio': has_audio,
+            'extra_inputs': extra_inputs,
+        }
+
+    def _expected_duration(self, video_path):
+        """Durasi output setelah silence cut & speed (untuk progress)."""
+        segments = self._plan_segments(video_path)
+        if segments:
+            duration = sum(end - start for start, end in segments)
+        else:
+            duration = get_media_duration(video_path)
+        if self.speed:
+            duration /= self.speed
+        return duration or None
+
+    def _encode_args(self, graph):
+        """Encoder args: settings YouTube kalau export aktif, selain itu CRF 18."""
+        if self.export_resolution:
+            _, encode_args = self.editor.youtube_export_settings(self.export_resolution)
+            return list(encode_args)
+
+        args = []
+        if graph['video_out']:
+            args += ['-c:v', 'libx264', '-preset', 'medium', '-crf', '18']
+        else:
+            # Tidak ada filter video → stream copy, tanpa decode video sama sekali
+            args += ['-c:v', 'copy']
+        if graph['audio_out']:
+            args += ['-c:a', 'aac', '-b:a', '192k']
+        elif graph['has_audio']:
+            args += ['-c:a', 'copy']
+        return args
+
+    def build_command(self, video_path, output_path):
+        """Bangun command FFmpeg single-pass untuk semua step."""
+        graph = self.build_filter_graph(video_path)
+
+        cmd = [self.ffmpeg, '-y', '-i', video_path]
+        for extra in graph['extra_inputs']:
+            cmd += ['-i', extra]
+
+        if graph['filter_complex']:
+            cmd += ['-filter_complex', graph['filter_complex']]
+
+        cmd += ['-map', f"[{graph['video_out']}]" if graph['video_out'] else '0:v']
+        if graph['audio_out']:
+            cmd += ['-map', f"[{graph['audio_out']}]"]
+        elif graph['has_audio']:
+            cmd += ['-map', '0:a']
+        cmd += self._encode_args(graph)
+        cmd.append(output_path)
+        return cmd
+
+    # ===== RENDER =====
+
+    def render_audio(self, video_path, output_path=None):
+        """
+        Render audio saja (16 kHz mono WAV) lewat chain audio yang sama.
+        Dipakai untuk transcription supaya timing subtitle cocok dengan
+        timeline video final (setelah silence cut & speed). Tanpa decode video.
+
+        Returns:
+            Path ke WAV, atau video_path kalau tidak ada step audio
+        """
+        if not self.has_audio_steps() or not probe(video_path).has_audio:
+            return video_path
+
+        if output_path is None:
+            base = os.path.splitext(os.path.basename(video_path))[0]
+            output_path = os.path.join(self.output_dir, f"{base}_pipeline_audio.wav")
+
+        graph = self.build_filter_graph(video_path, audio_only=True)
+        cmd = [self.ffmpeg, '-y', '-i', video_path]
+        if graph['filter_complex']:
+            cmd += ['-filter_complex', graph['filter_complex']]
+        cmd += ['-map', f"[{graph['audio_out']}]" if graph['audio_out'] else '0:a']
+        cmd += ['-vn', '-ac', '1', '-ar', '16000', '-c:a', 'pcm_s16le', output_path]
+
+        self._update(30, "Rendering audio untuk transcription...")
+        self.runner.run(cmd)
+        return output_path
+
+    def run(self, video_path, output_path=None):
+        """
+        Render semua step dalam satu encode.
+
+        Returns:
+            Path ke video output
+        """
+        if output_path is None:
+            base = os.path.splitext(os.path.basename(video_path))[0]
+            suffix = "youtube_ready" if self.export_resolution else "optimized"
+            output_path = os.path.join(self.output_dir, f"{base}_{suffix}.mp4")
+
+        if self.is_empty():
+            return video_path
+
+        cmd = self.build_command(video_path, output_path)
+
+        self._update(50, "Rendering single-pass (1x encode)...")
+        self.runner.run(
+            cmd, duration=self._expected_duration(video_path),
+            progress_callback=lambda pct: self._update(
+                50 + pct * 0.49, f"Rendering single-pass... {pct:.0f}%"
+            )
+        )
+
+        self._update(100, f"Render selesai: {output_path}")
+        return output_path
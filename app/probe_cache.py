@@ -0,0 +1,317 @@
+"""
+Probe Cache — hasil ffprobe yang di-cache & dipakai bersama semua modul
+Key: (versi format, path, size, mtime_ns, inode), LRU in-process + store SQLite opsional
+"""
+import os
+import re
+import json
+import sqlite3
+import threading
+import subprocess
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from fractions import Fraction
+from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path
+from app.cache import get_cache_dir, file_key
+
+
+# Versi format data probe (naikkan kalau argumen _probe_raw berubah)
+PROBE_VERSION = 2
+
+
+def _parse_rate(rate):
+    """'30000/1001' → 29.97 (tanpa eval)."""
+    try:
+        value = Fraction(str(rate))
+        return float(value) if value.denominator else 0.0
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _to_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class MediaInfo:
+    """Informasi media hasil probe, sudah dinormalisasi."""
+
+    path: str
+    duration: float = 0.0
+    size: int = 0
+    bit_rate: int = 0
+    format_name: str = ""
+    format_long_name: str = ""
+
+    # Video stream pertama
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    avg_fps: float = 0.0                # ≠ fps → variable frame rate
+    r_frame_rate: str = ""
+    video_codec: str = ""
+    video_profile: str = ""
+    video_level: int = 0
+    pix_fmt: str = ""
+    video_bit_rate: int = 0
+    video_time_base: str = ""
+    video_extradata_hash: str = ""      # SPS/PPS (avcC/hvcC), kosong kalau tidak diketahui
+    nb_frames: int = 0
+
+    # Audio stream pertama
+    audio_codec: str = ""
+    sample_rate: int = 0
+    channels: int = 0
+    channel_layout: str = ""
+    audio_bit_rate: int = 0
+
+    # JSON ffprobe asli (format + streams) untuk modul yang butuh detail
+    raw: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def has_video(self):
+        return bool(self.video_codec)
+
+    @property
+    def has_audio(self):
+        return bool(self.audio_codec)
+
+    @property
+    def video_stream(self):
+        return next((s for s in self.raw.get('streams', []) if s.get('codec_type') == 'video'), None)
+
+    @property
+    def audio_stream(self):
+        return next((s for s in self.raw.get('streams', []) if s.get('codec_type') == 'audio'), None)
+
+    @classmethod
+    def from_probe(cls, path, data):
+        """Bangun MediaInfo dari JSON ffprobe (-show_format -show_streams)."""
+        fmt = data.get('format', {})
+        info = cls(
+            path=path,
+            duration=float(fmt.get('duration', 0) or 0),
+            size=_to_int(fmt.get('size')) or (os.path.getsize(path) if os.path.exists(path) else 0),
+            bit_rate=_to_int(fmt.get('bit_rate')),
+            format_name=fmt.get('format_name', ''),
+            format_long_name=fmt.get('format_long_name', ''),
+            raw=data,
+        )
+
+        video = info.video_stream
+        if video:
+            info.width = _to_int(video.get('width'))
+            info.height = _to_int(video.get('height'))
+            info.r_frame_rate = video.get('r_frame_rate', '')
+            info.fps = _parse_rate(info.r_frame_rate)
+            info.avg_fps = _parse_rate(video.get('avg_frame_rate', ''))
+            info.video_codec = video.get('codec_name', '')
+            info.video_profile = video.get('profile', '')
+            info.video_level = _to_int(video.get('level'))
+            info.pix_fmt = video.get('pix_fmt', '')
+            info.video_bit_rate = _to_int(video.get('bit_rate'))
+            info.video_time_base = video.get('time_base', '')
+            info.video_extradata_hash = video.get('extradata_hash', '')
+            info.nb_frames = _to_int(video.get('nb_frames'))
+
+        audio = info.audio_stream
+        if audio:
+            info.audio_codec = audio.get('codec_name', '')
+            info.sample_rate = _to_int(audio.get('sample_rate'))
+            info.channels = _to_int(audio.get('channels'))
+            info.channel_layout = audio.get('channel_layout', '')
+            info.audio_bit_rate = _to_int(audio.get('bit_rate'))
+
+        return info
+
+
+def _parse_ffmpeg_output(stderr):
+    """Parse output `ffmpeg -i` jadi struktur mirip ffprobe (fallback tanpa ffprobe)."""
+    info = {'format': {}, 'streams': []}
+
+    # Duration
+    dur_match = re.search(r'Duration:\s*(\d+):(\d+):(\d+)\.(\d+)', stderr)
+    if dur_match:
+        h, m, s, cs = dur_match.groups()
+        info['format']['duration'] = str(int(h)*3600 + int(m)*60 + int(s) + int(cs)/100)
+
+    # Bitrate
+    br_match = re.search(r'bitrate:\s*(\d+)\s*kb/s', stderr)
+    if br_match:
+        info['format']['bit_rate'] = str(int(br_match.group(1)) * 1000)
+
+    # Video stream
+    vid_match = re.search(r'Video:\s*(\w+).*?,\s*(\d+)x(\d+).*?,\s*([\d.]+)\s*fps', stderr)
+    if vid_match:
+        info['streams'].append({
+            'codec_type': 'video',
+            'codec_name': vid_match.group(1),
+            'width': int(vid_match.group(2)),
+            'height': int(vid_match.group(3)),
+            'r_frame_rate': f"{vid_match.group(4)}/1",
+        })
+
+    # Audio stream
+    aud_match = re.search(r'Audio:\s*(\w+).*?,\s*(\d+)\s*Hz.*?,.*?,\s*(\d+)\s*kb/s', stderr)
+    if aud_match:
+        info['streams'].append({
+            'codec_type': 'audio',
+            'codec_name': aud_match.group(1),
+            'sample_rate': aud_match.group(2),
+            'bit_rate': str(int(aud_match.group(3)) * 1000),
+        })
+
+    return info
+
+
+class ProbeCache:
+    """
+    Cache hasil ffprobe.
+
+    - LRU in-process (default 256 file)
+    - Store SQLite opsional supaya hasil probe awet antar run
+    - Key (path, size, mtime_ns, inode) → otomatis invalid kalau file berubah
+    """
+
+    def __init__(self, max_entries=256, db_path=None):
+        """
+        Args:
+            max_entries: Jumlah entry maksimum di LRU memori
+            db_path: Path file SQLite (None = memori saja)
+        """
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.ffmpeg = get_ffmpeg_path()
+        self.ffprobe = get_ffprobe_path()
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS probe ("
+                    "key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _db_get(self, key):
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT data FROM probe WHERE key = ?", (key,)).fetchone()
+            return json.loads(row[0]) if row else None
+        except sqlite3.Error:
+            return None
+
+    def _db_put(self, key, data):
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO probe (key, data) VALUES (?, ?)",
+                    (key, json.dumps(data))
+                )
+        except sqlite3.Error:
+            pass
+
+    def _probe_raw(self, path):
+        """Jalankan ffprobe (atau ffmpeg -i sebagai fallback)."""
+        if self.ffprobe:
+            cmd = [
+                self.ffprobe, '-v', 'quiet',
+                '-print_format', 'json',
+                '-show_format', '-show_streams',
+                '-show_data_hash', 'sha256',
+                path
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            if result.returncode != 0:
+                raise RuntimeError(f"ffprobe error: {result.stderr[:300]}")
+            return json.loads(result.stdout)
+
+        result = subprocess.run([self.ffmpeg, '-i', path], capture_output=True, text=True, timeout=60)
+        return _parse_ffmpeg_output(result.stderr)
+
+    def get(self, path):
+        """
+        Probe file (pakai cache kalau ada).
+
+        Returns:
+            MediaInfo
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Video not found: {path}")
+
+        key = repr((PROBE_VERSION, *file_key(path)))
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return self._lru[key]
+
+        data = self._db_get(key)
+        if data is None:
+            data = self._probe_raw(path)
+            self._db_put(key, data)
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        info = MediaInfo.from_probe(path, data)
+        with self._lock:
+            self._lru[key] = info
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+        return info
+
+    def invalidate(self, path):
+        """Hapus entry file dari cache memori & disk."""
+        try:
+            key = repr((PROBE_VERSION, *file_key(path)))
+        except OSError:
+            return
+        with self._lock:
+            self._lru.pop(key, None)
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM probe WHERE key = ?", (key,))
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        """Kosongkan LRU memori (store disk tidak disentuh)."""
+        with self._lock:
+            self._lru.clear()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_probe_cache():
+    """ProbeCache bersama untuk seluruh proses (store SQLite di cache dir)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            db_path = os.path.join(get_cache_dir(), "probe.sqlite")
+            try:
+                _default_cache = ProbeCache(db_path=db_path)
+            except sqlite3.Error:
+                _default_cache = ProbeCache()
+        return _default_cache
+
+
+def probe(path):
+    """Shortcut: probe file lewat cache bersama → MediaInfo."""
+    return get_probe_cache().get(path)
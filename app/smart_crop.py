@@ -0,0 +1,335 @@
+"""
+Modul Smart Crop - Crop yang mengikuti subjek (bukan selalu tengah)
+Video di-decode SEKALI dalam resolusi kecil (misal 4 fps @ 160 px). Tiap frame
+dinilai per piksel: gerakan, kontras lokal (saliency), dan skin tone (indikasi
+wajah), lalu diringkas jadi profil kolom & baris. Profil ini yang di-cache per
+file, jadi semua export vertikal (TikTok, Reels, Shorts) memakai analisa yang
+sama. Jalur crop untuk aspect tertentu dihitung dari profil (sliding window),
+dihaluskan, lalu jadi ekspresi `crop` FFmpeg (x/y dievaluasi per frame).
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+from app.ffmpeg_util import iter_video_frames, video_frame_size
+from app.frame_scorer import FrameScorer
+from app.cache import get_cache_dir, file_key, file_key_hash
+
+
+# Bobot peta saliency per piksel
+DEFAULT_WEIGHTS = {'motion': 0.4, 'contrast': 0.25, 'skin': 0.35}
+
+# Beda luma rata-rata (0-255) di atas ini dianggap pergantian scene
+CUT_THRESHOLD = 30.0
+
+
+@dataclass
+class CropAnalysis:
+    """Profil saliency per frame (kolom & baris) dari satu video."""
+
+    times: np.ndarray          # float64, waktu tiap frame analisa (detik)
+    columns: np.ndarray        # float32 (N, W), bobot saliency per kolom
+    rows: np.ndarray           # float32 (N, H), bobot saliency per baris
+    diffs: np.ndarray          # float32 (N,), beda luma vs frame sebelumnya
+
+    @property
+    def aspect(self):
+        """Aspect ratio frame analisa (= aspect tampilan sumber)."""
+        return self.columns.shape[1] / max(self.rows.shape[1], 1)
+
+    def _cut_segments(self):
+        """Index [start, end) tiap scene (batas di pergantian scene)."""
+        cuts = np.flatnonzero(self.diffs > CUT_THRESHOLD)
+        bounds = [0] + [int(i) for i in cuts if i > 0] + [len(self.times)]
+        return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def track(self, aspect, smooth_seconds=1.0, max_speed=0.25, deadzone=0.04):
+        """
+        Posisi pusat crop (0-1, relatif lebar/tinggi sumber) untuk aspect target.
+
+        Args:
+            aspect: Aspect ratio output (lebar / tinggi), misal 9/16
+            smooth_seconds: Sigma gaussian smoothing (detik)
+            max_speed: Kecepatan pan maksimal (porsi frame per detik)
+            deadzone: Kamera diam selama subjek bergeser kurang dari ini
+
+        Returns:
+            (axis, times, centers) dengan axis 'x' / 'y',
+            atau None kalau crop tidak perlu (aspect sudah sama) / tanpa data
+        """
+        if len(self.times) == 0:
+            return None
+        if aspect < self.aspect:
+            axis, profiles, frac = 'x', self.columns, aspect / self.aspect
+        else:
+            axis, profiles, frac = 'y', self.rows, self.aspect / aspect
+        if frac > 0.98:
+            return None
+
+        # Posisi window dengan bobot terbanyak per frame (sliding sum lewat cumsum)
+        size = profiles.shape[1]
+        k = max(1, int(round(frac * size)))
+        zeros = np.zeros((len(profiles), 1))
+        cs = np.concatenate([zeros, np.cumsum(profiles, axis=1)], axis=1)
+        sums = cs[:, k:] - cs[:, :-k]
+        best = sums.argmax(axis=1)
+        # Pusat = centroid bobot di dalam window terbaik (window dengan skor
+        # sama banyak kalau subjek lebih kecil dari window)
+        pos = np.arange(size) + 0.5
+        cw = np.concatenate([zeros, np.cumsum(profiles * pos, axis=1)], axis=1)
+        rowi = np.arange(len(profiles))
+        mass = sums[rowi, best]
+        moment = cw[rowi, best + k] - cw[rowi, best]
+        raw = np.where(mass > 0, moment / np.maximum(mass, 1e-9), best + k / 2.0) / size
+
+        # Frame tanpa subjek jelas (profil rata) → ikut tetangga
+        confident = sums.max(axis=1) > sums.mean(axis=1) * 1.15
+        if confident.any():
+            idx = np.flatnonzero(confident)
+            raw = np.interp(np.arange(len(raw)), idx, raw[idx])
+        else:
+            raw = np.full(len(raw), 0.5)
+
+        rate = 1.0 / max(float(np.median(np.diff(self.times))), 1e-3) if len(self.times) > 1 else 1.0
+        half = frac / 2.0
+        centers = np.empty(len(raw))
+        for a, b in self._cut_segments():
+            # Tiap scene dihaluskan sendiri: di pergantian scene crop langsung pindah
+            seg = _gaussian_smooth(_median3(raw[a:b]), smooth_seconds * rate)
+            centers[a:b] = _follow(seg, deadzone, max_speed / rate)
+        return axis, self.times, np.clip(centers, half, 1.0 - half)
+
+    def crop_filter(self, width, height, start=0.0, duration=None, tolerance=0.004,
+                    max_knots=400):
+        """
+        Filter FFmpeg crop-ikut-subjek + scale ke width x height.
+
+        Args:
+            width, height: Ukuran output
+            start: Detik sumber yang menjadi t=0 di filter (input di-seek dengan -ss)
+            duration: Panjang rentang yang di-render (None = sampai habis)
+            tolerance: Toleransi penyederhanaan jalur (porsi frame)
+            max_knots: Batas titik jalur (panjang ekspresi)
+
+        Returns:
+            String filter (koma di ekspresi sudah di-escape), atau None kalau
+            crop tidak perlu / tidak ada data — pemanggil pakai center crop
+        """
+        result = self.track(width / height)
+        if result is None:
+            return None
+        axis, times, centers = result
+
+        end = times[-1] if duration is None else start + duration
+        inside = (times > start) & (times < end)
+        t = np.concatenate([[start], times[inside], [end]])
+        v = np.interp(t, times, centers)
+        keep = _simplify(t, v, tolerance)
+        while len(keep) > max_knots:
+            tolerance *= 2
+            keep = _simplify(t, v, tolerance)
+        expr = _piecewise_expr(t[keep] - start, v[keep])
+
+        aspect = width / height
+        if axis == 'x':
+            crop = (
+                f"crop=w=trunc(ih*{aspect:.6f}/2)*2:h=ih:"
+                f"x=clip(({expr})*iw-ow/2\\,0\\,iw-ow):y=0"
+            )
+        else:
+            crop = (
+                f"crop=w=iw:h=trunc(iw/{aspect:.6f}/2)*2:"
+                f"x=0:y=clip(({expr})*ih-oh/2\\,0\\,ih-oh)"
+            )
+        return f"{crop},scale={width}:{height},setsar=1"
+
+
+def _median3(values):
+    """Median filter 3 titik (buang lonjakan satu frame)."""
+    if len(values) < 3:
+        return values.copy()
+    padded = np.concatenate([values[:1], values, values[-1:]])
+    return np.median(np.stack([padded[:-2], padded[1:-1], padded[2:]]), axis=0)
+
+
+def _gaussian_smooth(values, sigma):
+    """Gaussian smoothing 1D dengan padding tepi (sigma dalam sampel)."""
+    if sigma < 0.5 or len(values) < 3:
+        return values.copy()
+    radius = int(3 * sigma)
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    kernel /= kernel.sum()
+    padded = np.pad(values, radius, mode='edge')
+    return np.convolve(padded, kernel, mode='valid')
+
+
+def _follow(values, deadzone, max_step):
+    """Gerak kamera virtual: diam dalam deadzone, pan dibatasi max_step per sampel."""
+    out = np.empty(len(values))
+    pos = values[0]
+    for i, target in enumerate(values):
+        diff = target - pos
+        if abs(diff) > deadzone:
+            pos += np.sign(diff) * min(abs(diff) - deadzone, max_step)
+        out[i] = pos
+    return out
+
+
+def _simplify(t, v, tolerance):
+    """Ramer-Douglas-Peucker: index titik jalur yang perlu disimpan."""
+    keep = np.zeros(len(t), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(t) - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg_t, seg_v = t[a + 1:b], v[a + 1:b]
+        span = t[b] - t[a]
+        line = v[a] + (v[b] - v[a]) * ((seg_t - t[a]) / span if span > 0 else 0.0)
+        err = np.abs(seg_v - line)
+        i = int(err.argmax())
+        if err[i] > tolerance:
+            keep[a + 1 + i] = True
+            stack += [(a, a + 1 + i), (a + 1 + i, b)]
+    return np.flatnonzero(keep)
+
+
+def _piecewise_expr(t, v):
+    """Ekspresi FFmpeg untuk fungsi linear sepotong-sepotong v(t)."""
+    terms = [f"{v[0]:.4f}"]
+    for i in range(len(t) - 1):
+        dt = t[i + 1] - t[i]
+        if dt <= 0:
+            continue
+        slope = (v[i + 1] - v[i]) / dt
+        if abs(slope) < 1e-5:
+            continue
+        terms.append(f"{slope:+.5f}*clip(t-{t[i]:.3f}\\,0\\,{dt:.3f})")
+    return ''.join(terms)
+
+
+def analyze_crop(media_path, fps=4.0, width=160, batch_size=64, weights=None):
+    """
+    Decode video sekali (low-res) dan hitung profil saliency per frame.
+
+    Args:
+        media_path: File video
+        fps: Rate sampling analisa
+        width: Lebar frame analisa (tinggi mengikuti aspect sumber)
+        batch_size: Jumlah frame yang diproses sekaligus
+        weights: dict bobot {'motion', 'contrast', 'skin'}
+
+    Returns:
+        CropAnalysis
+    """
+    weights = dict(weights or DEFAULT_WEIGHTS)
+    w, h = video_frame_size(media_path, width)
+    times, columns, rows, diffs = [], [], [], []
+    prev = None
+    batch, batch_times = [], []
+
+    def _normalize(maps):
+        peak = maps.reshape(len(maps), -1).max(axis=1)
+        return maps / np.maximum(peak, 1e-6)[:, None, None]
+
+    def _flush():
+        nonlocal prev
+        frames = np.stack(batch).astype(np.float32)
+        gray = FrameScorer._luma(frames)
+
+        # Gerakan: beda luma dengan frame sebelumnya
+        previous = np.concatenate([gray[:1] if prev is None else prev, gray[:-1]])
+        motion = np.abs(gray - previous)
+        diffs.append(FrameScorer._thumb_gray(motion).reshape(len(gray), -1).mean(axis=1))
+        prev = gray[-1:]
+
+        # Kontras lokal (center-surround): luma vs rata-rata blok 8x8
+        small = FrameScorer._thumb_gray(gray, 8)
+        surround = np.repeat(np.repeat(small, 8, axis=1), 8, axis=2)
+        surround = np.pad(
+            surround,
+            ((0, 0), (0, h - surround.shape[1]), (0, w - surround.shape[2])),
+            mode='edge'
+        )
+        contrast = np.abs(gray - surround)
+
+        skin = FrameScorer.skin_mask(frames).astype(np.float32)
+        saliency = (
+            weights['motion'] * _normalize(motion)
+            + weights['contrast'] * _normalize(contrast)
+            + weights['skin'] * skin
+        )
+        columns.append(saliency.sum(axis=1))
+        rows.append(saliency.sum(axis=2))
+        times.extend(batch_times)
+        batch.clear()
+        batch_times.clear()
+
+    for n, (pts, data) in enumerate(iter_video_frames(media_path, width=width, fps=fps)):
+        batch.append(np.frombuffer(data, dtype=np.uint8).reshape(h, w, 3))
+        batch_times.append(pts if pts is not None else n / fps)
+        if len(batch) >= batch_size:
+            _flush()
+    if batch:
+        _flush()
+
+    if not times:
+        return CropAnalysis(
+            times=np.zeros(0), columns=np.zeros((0, w), np.float32),
+            rows=np.zeros((0, h), np.float32), diffs=np.zeros(0, np.float32),
+        )
+    return CropAnalysis(
+        times=np.asarray(times, dtype=np.float64),
+        columns=np.concatenate(columns).astype(np.float32),
+        rows=np.concatenate(rows).astype(np.float32),
+        diffs=np.concatenate(diffs).astype(np.float32),
+    )
+
+
+# ===== Cache bersama (memori + .npz di cache dir) =====
+
+_crop_cache = OrderedDict()
+_crop_lock = threading.Lock()
+_MAX_CACHED = 8
+
+
+def get_crop_analysis(media_path):
+    """
+    CropAnalysis untuk file ini, di-cache per (path, size, mtime) —
+    semua export vertikal & Shorts memakai satu analisa yang sama.
+    """
+    key = repr(file_key(media_path))
+    with _crop_lock:
+        if key in _crop_cache:
+            _crop_cache.move_to_end(key)
+            return _crop_cache[key]
+
+    npz_path = os.path.join(get_cache_dir("smart_crop"), f"{file_key_hash(media_path)}.npz")
+    analysis = None
+    if os.path.exists(npz_path):
+        try:
+            with np.load(npz_path) as data:
+                analysis = CropAnalysis(
+                    times=data['times'], columns=data['columns'],
+                    rows=data['rows'], diffs=data['diffs'],
+                )
+        except (OSError, KeyError, ValueError):
+            analysis = None
+
+    if analysis is None:
+        analysis = analyze_crop(media_path)
+        try:
+            np.savez_compressed(
+                npz_path, times=analysis.times, columns=analysis.columns,
+                rows=analysis.rows, diffs=analysis.diffs,
+            )
+        except OSError:
+            pass
+
+    with _crop_lock:
+        _crop_cache[key] = analysis
+        while len(_crop_cache) > _MAX_CACHED:
+            _crop_cache.popitem(last=False)
+    return analysis
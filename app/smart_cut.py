@@ -0,0 +1,261 @@
+"""
+Modul Smart Cut - Potong video tanpa re-encode penuh
+GOP utuh di antara titik cut di-stream-copy, hanya GOP parsial di batas cut
+yang di-encode ulang. Audio di-render terpisah (murah) supaya sync tetap presisi.
+
+Bagian video ditulis sebagai elementary stream Annex B (SPS/PPS in-band),
+jadi bagian copy dan bagian encode bisa disambung byte-per-byte.
+"""
+import os
+import json
+import shutil
+import bisect
+import tempfile
+import subprocess
+from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path, FFmpegRunner
+from app.probe_cache import probe
+from app.cache import get_cache_dir, file_key_hash
+
+
+# codec → (bitstream filter Annex B, encoder, format raw)
+SUPPORTED_CODECS = {
+    'h264': ('h264_mp4toannexb', 'libx264', 'h264'),
+}
+
+
+class SmartCutter:
+    """
+    Cut list segment dari satu video dengan stream copy per GOP.
+
+    Untuk tiap segment (start, end):
+        [start, keyframe pertama)        → re-encode (GOP parsial di depan)
+        [keyframe pertama, keyframe akhir) → stream copy (GOP utuh)
+        [keyframe akhir, end)            → re-encode (GOP parsial di belakang)
+    Semua bagian video ditulis sebagai stream Annex B dengan jumlah frame
+    pasti, disambung, lalu di-mux bersama audio (stream copy).
+    """
+
+    def __init__(self, output_dir="output"):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.ffmpeg = get_ffmpeg_path()
+        self.ffprobe = get_ffprobe_path()
+        self.runner = FFmpegRunner()
+        self.progress_callback = None
+        self._keyframe_cache = {}
+
+    def set_progress_callback(self, callback):
+        self.progress_callback = callback
+
+    def _update(self, pct, text):
+        if self.progress_callback:
+            self.progress_callback(pct, text)
+
+    def supports(self, video_path):
+        """
+        Smart cut hanya untuk codec yang didukung, frame rate konstan (panjang
+        bagian dihitung dari jumlah frame) & butuh ffprobe.
+        """
+        if not self.ffprobe:
+            return False
+        try:
+            info = probe(video_path)
+        except Exception:
+            return False
+        if info.video_codec not in SUPPORTED_CODECS or info.fps <= 0:
+            return False
+        # VFR (HP, screen capture): avg_frame_rate ≠ r_frame_rate → audio drift
+        if info.avg_fps and abs(info.avg_fps - info.fps) > info.fps * 0.005:
+            return False
+        try:
+            return self._scan_packets(video_path)['cfr']
+        except RuntimeError:
+            return False
+
+    def _scan_packets(self, video_path):
+        """
+        Scan index packet video (tanpa decode): timestamp keyframe + apakah
+        jarak antar frame rata (CFR). Di-cache per file (memori + JSON di cache dir).
+        """
+        key = file_key_hash(video_path)
+        if key in self._keyframe_cache:
+            return self._keyframe_cache[key]
+
+        cache_path = os.path.join(get_cache_dir("keyframes"), f"{key}.json")
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                scan = json.load(f)
+            self._keyframe_cache[key] = scan
+            return scan
+
+        cmd = [
+            self.ffprobe, '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0',
+            video_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffprobe error: {result.stderr[:300]}")
+
+        # -ss dihitung relatif terhadap start_time container
+        try:
+            info = probe(video_path)
+            start_time = float(info.raw.get('format', {}).get('start_time', 0) or 0)
+            fps = info.fps
+        except Exception:
+            start_time, fps = 0.0, 0.0
+
+        keyframes = []
+        pts_times = []
+        for line in result.stdout.splitlines():
+            pts, _, flags = line.partition(',')
+            try:
+                pts = float(pts)
+            except ValueError:
+                continue
+            pts_times.append(pts)
+            if 'K' in flags:
+                keyframes.append(round(pts - start_time, 6))
+        keyframes.sort()
+
+        # CFR: semua jarak antar frame (urut pts) dekat 1/fps
+        pts_times.sort()
+        cfr = fps > 0 and all(
+            abs(b - a - 1 / fps) <= 0.25 / fps for a, b in zip(pts_times, pts_times[1:])
+        )
+
+        scan = {'keyframes': keyframes, 'cfr': cfr}
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(scan, f)
+        self._keyframe_cache[key] = scan
+        return scan
+
+    def get_keyframes(self, video_path):
+        """Timestamp keyframe (detik) dari index packet — tanpa decode."""
+        return self._scan_packets(video_path)['keyframes']
+
+    def plan(self, video_path, segments, min_copy=1.0):
+        """
+        Rencana potongan video.
+
+        Args:
+            segments: List of (start, end) sesuai urutan output
+            min_copy: Bagian copy lebih pendek dari ini di-encode saja
+
+        Returns:
+            List of (mode, start, end) dengan mode 'copy' atau 'encode'
+        """
+        keyframes = self.get_keyframes(video_path)
+        parts = []
+        for start, end in segments:
+            if end - start <= 0.01:
+                continue
+            i = bisect.bisect_left(keyframes, start - 0.001)
+            j = bisect.bisect_right(keyframes, end + 0.001) - 1
+            first_kf = keyframes[i] if i < len(keyframes) else None
+            last_kf = keyframes[j] if j >= 0 else None
+
+            if first_kf is None or last_kf is None or last_kf - first_kf < min_copy:
+                parts.append(('encode', start, end))
+                continue
+
+            if first_kf - start > 0.01:
+                parts.append(('encode', start, first_kf))
+            parts.append(('copy', first_kf, last_kf))
+            if end - last_kf > 0.01:
+                parts.append(('encode', last_kf, end))
+        return parts
+
+    def worthwhile(self, video_path, segments, min_copy_ratio=0.5):
+        """
+        Smart cut hanya menguntungkan kalau sebagian besar durasi bisa di-copy
+        (segment pendek-pendek → hampir semuanya encode + overhead per proses).
+        """
+        parts = self.plan(video_path, segments)
+        total = sum(end - start for _, start, end in parts)
+        copied = sum(end - start for mode, start, end in parts if mode == 'copy')
+        return total > 0 and copied / total >= min_copy_ratio
+
+    def _video_part(self, video_path, mode, start, end, part_path, info):
+        bsf, encoder, raw_format = SUPPORTED_CODECS[info.video_codec]
+        frames = max(1, round((end - start) * info.fps))
+        cmd = [self.ffmpeg, '-y', '-ss', f"{start:.6f}", '-i', video_path,
+               '-map', '0:v:0', '-an', '-sn', '-frames:v', str(frames)]
+        if mode == 'copy':
+            cmd += ['-c:v', 'copy']
+        else:
+            # Samakan parameter stream dengan GOP yang di-copy. SPS/PPS bagian
+            # ini beda dengan sumber → ditulis ulang di tiap keyframe (in-band),
+            # jadi decoder tidak memakai parameter bagian copy sebelumnya
+            cmd += ['-c:v', encoder, '-preset', 'medium', '-crf', '18',
+                    '-pix_fmt', info.pix_fmt or 'yuv420p', '-r', info.r_frame_rate,
+                    '-x264-params', 'repeat-headers=1']
+            if info.video_profile:
+                profile = info.video_profile.lower().replace(' ', '')
+                if profile in ('baseline', 'main', 'high', 'high10', 'high422', 'high444'):
+                    cmd += ['-profile:v', profile]
+        cmd += ['-bsf:v', bsf, '-f', raw_format, part_path]
+        self.runner.run(cmd, duration=end - start)
+        return frames
+
+    def _audio_track(self, video_path, segments, audio_path, segment_filter):
+        """Render audio semua segment (filter atrim/concat, encode AAC)."""
+        filter_complex = segment_filter(segments, None, '0:a', None, 'outa')
+        cmd = [
+            self.ffmpeg, '-y', '-i', video_path,
+            '-filter_complex', filter_complex,
+            '-map', '[outa]', '-vn', '-c:a', 'aac', '-b:a', '192k',
+            audio_path
+        ]
+        self.runner.run(cmd, duration=sum(e - s for s, e in segments))
+
+    def cut(self, video_path, segments, output_path, segment_filter):
+        """
+        Render segment-segment ke satu file output.
+
+        Args:
+            video_path: Video sumber
+            segments: List of (start, end) sesuai urutan output
+            output_path: File output (.mp4)
+            segment_filter: Fungsi pembuat filter audio (VideoEditor.segment_filter)
+
+        Returns:
+            dict statistik {'copied': detik, 'encoded': detik}
+        """
+        info = probe(video_path)
+        parts = self.plan(video_path, segments)
+        work_dir = tempfile.mkdtemp(prefix="smartcut_", dir=self.output_dir)
+        stats = {'copied': 0.0, 'encoded': 0.0}
+
+        try:
+            raw_format = SUPPORTED_CODECS[info.video_codec][2]
+            video_stream = os.path.join(work_dir, f"video.{raw_format}")
+            with open(video_stream, 'wb') as stream_file:
+                for n, (mode, start, end) in enumerate(parts):
+                    part_path = os.path.join(work_dir, f"part_{n:05d}.{raw_format}")
+                    self._update(
+                        50 + n / max(1, len(parts)) * 40,
+                        f"Smart cut {n + 1}/{len(parts)} ({mode})..."
+                    )
+                    self._video_part(video_path, mode, start, end, part_path, info)
+                    stats['copied' if mode == 'copy' else 'encoded'] += end - start
+                    with open(part_path, 'rb') as part_file:
+                        shutil.copyfileobj(part_file, stream_file)
+                    os.remove(part_path)
+
+            cmd = [self.ffmpeg, '-y', '-fflags', '+genpts',
+                   '-framerate', info.r_frame_rate, '-i', video_stream]
+            if info.has_audio:
+                audio_path = os.path.join(work_dir, "audio.m4a")
+                self._update(92, "Smart cut: render audio...")
+                self._audio_track(video_path, segments, audio_path, segment_filter)
+                cmd += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0']
+            else:
+                cmd += ['-map', '0:v:0']
+            cmd += ['-c', 'copy', '-movflags', '+faststart', output_path]
+            self._update(96, "Smart cut: menggabungkan...")
+            self.runner.run(cmd)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        return stats
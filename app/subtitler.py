@@ -4,14 +4,51 @@ Lalu burn subtitle ke video menggunakan FFmpeg
 """
 import os
 import json
-import subprocess
-from app.ffmpeg_util import get_ffmpeg_path
+import hashlib
+from app.ffmpeg_util import get_ffmpeg_path, FFmpegRunner
+
+
+# ===== Worker process untuk transcription paralel =====
+# Satu model per worker process, di-load sekali lewat initializer.
+_worker_model = None
+_worker_fp16 = False
+
+
+def _chunk_worker_init(model_size, device, dtype, torch_threads):
+    global _worker_model, _worker_fp16
+    try:
+        import torch
+        torch.set_num_threads(max(1, torch_threads))
+    except ImportError:
+        pass
+    from app.model_registry import get_model_registry
+    key, _worker_model = get_model_registry().acquire(model_size, device, dtype)
+    _worker_fp16 = key[2] == "float16"
+
+
+def _transcribe_chunk(audio_path, start, end, language):
+    """Transcribe satu chunk [start, end) → list segment dengan timestamp absolut."""
+    import numpy as np
+    from app.ffmpeg_util import iter_audio_pcm
+
+    pcm = b''.join(iter_audio_pcm(audio_path, start=start, duration=end - start))
+    audio = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype=np.int16).astype(np.float32) / 32768.0
+    if len(audio) == 0:
+        return [], None
+
+    options = {'verbose': False, 'word_timestamps': True, 'fp16': _worker_fp16}
+    if language:
+        options['language'] = language
+    result = _worker_model.transcribe(audio, **options)
+    segments = [AutoSubtitler._convert_segment(seg, start) for seg in result['segments']]
+    return [seg for seg in segments if seg['text']], result.get('language')
 
 
 class AutoSubtitler:
     """Generate subtitle otomatis dari audio/video menggunakan Whisper."""
 
-    def __init__(self, model_size="base", output_dir="temp"):
+    def __init__(self, model_size="base", output_dir="temp", device=None, dtype=None,
+                 use_cache=True):
         """
         Args:
             model_size: Ukuran model Whisper - 'tiny', 'base', 'small', 'medium', 'large'
@@ -20,12 +57,20 @@ class AutoSubtitler:
                        'small' = Lebih lambat, lebih akurat
                        'medium'= Lambat, akurat
                        'large' = Paling lambat, paling akurat (butuh GPU bagus)
+            device: 'cpu' / 'cuda' (None = otomatis)
+            dtype: 'float32' / 'float16' (None = fp16 di GPU, fp32 di CPU)
+            use_cache: Pakai transcript cache (key: hash audio + model + bahasa)
         """
         self.model_size = model_size
+        self.device = device
+        self.dtype = dtype
+        self._model_key = None
+        self.use_cache = use_cache
         self.output_dir = output_dir
         self.model = None
         self.progress_callback = None
         self.ffmpeg = get_ffmpeg_path()
+        self.runner = FFmpegRunner()
         os.makedirs(output_dir, exist_ok=True)
 
     def set_progress_callback(self, callback):
@@ -36,13 +81,33 @@ class AutoSubtitler:
             self.progress_callback(percent, text)
 
     def load_model(self):
-        """Load Whisper model (download otomatis kalau belum ada)."""
-        import whisper
+        """
+        Load Whisper model (download otomatis kalau belum ada).
+
+        Model dipinjam dari registry bersama: model yang sudah warm tidak load
+        ulang dari disk, dan instance yang sedang dipinjam tidak dipakai thread
+        lain (transcription paralel dapat instance sendiri).
+        Panggil release_model() kalau sudah selesai.
+        """
+        if self.model is not None:
+            return self.model
+
+        from app.model_registry import get_model_registry
         self._update_progress(10, f"Loading Whisper model '{self.model_size}'...")
-        self.model = whisper.load_model(self.model_size)
+        self._model_key, self.model = get_model_registry().acquire(
+            self.model_size, self.device, self.dtype
+        )
         self._update_progress(20, "Model loaded!")
         return self.model
 
+    def release_model(self):
+        """Kembalikan model ke registry (tetap warm untuk pemakaian berikutnya)."""
+        if self._model_key is not None:
+            from app.model_registry import get_model_registry
+            get_model_registry().release(self._model_key, self.model)
+        self._model_key = None
+        self.model = None
+
     def transcribe(self, audio_path, language="id"):
         """
         Transcribe audio/video ke teks + timestamp.
@@ -54,7 +119,27 @@ class AutoSubtitler:
         Returns:
             dict dengan segments dan full text
         """
-        if self.model is None:
+        # Cache berdasarkan isi audio: render ulang dengan step visual lain
+        # (color grading, watermark, ...) tidak perlu transcribe ulang
+        cache, cache_key = None, None
+        if self.use_cache:
+            from app.transcript_cache import get_transcript_cache
+            try:
+                cache = get_transcript_cache()
+                audio_hash = cache.audio_fingerprint(audio_path)
+                cache_key = cache.make_key(
+                    audio_hash, self.model_size, language, {'word_timestamps': True}
+                )
+                cached = cache.get(cache_key)
+            except Exception:
+                cache, cached = None, None
+            if cached is not None:
+                self._update_progress(80, "Transcription dari cache!")
+                return cached
+
+        # Model yang di-load di sini dikembalikan ke registry setelah selesai
+        owns_model = self.model is None
+        if owns_model:
             self.load_model()
 
         self._update_progress(30, "Mulai transcription...")
@@ -62,28 +147,378 @@ class AutoSubtitler:
         options = {
             'verbose': False,
             'word_timestamps': True,
+            'fp16': self._model_key is not None and self._model_key[2] == "float16",
         }
         if language:
             options['language'] = language
 
-        result = self.model.transcribe(audio_path, **options)
+        try:
+            result = self.model.transcribe(audio_path, **options)
+        finally:
+            if owns_model:
+                self.release_model()
 
         self._update_progress(80, "Transcription selesai!")
 
-        return {
+        transcription = {
             'text': result['text'],
             'language': result.get('language', language),
-            'segments': [
-                {
-                    'id': seg['id'],
-                    'start': seg['start'],
-                    'end': seg['end'],
-                    'text': seg['text'].strip(),
-                }
-                for seg in result['segments']
-            ]
+            'segments': [self._convert_segment(seg) for seg in result['segments']]
+        }
+
+        if cache is not None:
+            cache.put(cache_key, transcription)
+        return transcription
+
+    @staticmethod
+    def _convert_segment(seg, offset=0.0, seg_id=None):
+        """Segment Whisper → dict segment kita (timestamp digeser offset detik)."""
+        return {
+            'id': seg['id'] if seg_id is None else seg_id,
+            'start': seg['start'] + offset,
+            'end': seg['end'] + offset,
+            'text': seg['text'].strip(),
+            'words': [
+                {'word': w['word'], 'start': w['start'] + offset, 'end': w['end'] + offset}
+                for w in seg.get('words', [])
+            ],
         }
 
+    def transcribe_stream(self, audio_path, language="id", window=30.0, overlap=2.0,
+                          silences=None, vad=True, info=None):
+        """
+        Transcription streaming: audio di-decode sekali (16 kHz mono lewat pipe)
+        dan diproses per window, jadi memori tetap datar untuk video berjam-jam.
+
+        Args:
+            audio_path: Path ke file audio/video
+            language: Bahasa (None = auto-detect)
+            window: Panjang window (detik, Whisper bekerja per 30 detik)
+            overlap: Overlap antar window (detik) supaya kata di batas tidak terpotong
+            silences: List (start, end) dari VideoEditor.detect_silence (opsional)
+            vad: Kalau silences None, window yang seluruhnya di bawah -35 dBFS
+                 di-skip (dicek dari PCM yang sedang di-stream, tanpa decode lagi)
+            info: dict opsional, diisi 'language' (bahasa terdeteksi) oleh generator
+
+        Yields:
+            Segment dict ({'id', 'start', 'end', 'text', 'words'}) begitu selesai
+        """
+        import numpy as np
+        from app.ffmpeg_util import iter_audio_pcm
+
+        sample_rate = 16000
+        overlap = max(0.0, min(overlap, window / 2))
+        win_samples = int(window * sample_rate)
+        step_samples = int((window - overlap) * sample_rate)
+        stream_options = {'word_timestamps': True, 'window': window, 'overlap': overlap}
+        info = {} if info is None else info
+        info['language'] = language
+
+        # Hasil lengkap di cache → langsung keluarkan
+        cache, audio_hash = None, None
+        if self.use_cache:
+            from app.transcript_cache import get_transcript_cache
+            try:
+                cache = get_transcript_cache()
+                audio_hash = cache.known_fingerprint(audio_path)
+                if audio_hash:
+                    cached = cache.get(cache.make_key(
+                        audio_hash, self.model_size, language, stream_options
+                    ))
+                    if cached is not None:
+                        self._update_progress(80, "Transcription dari cache!")
+                        info['language'] = cached.get('language') or language
+                        yield from cached['segments']
+                        return
+            except Exception:
+                cache = None
+
+        # VAD dari PCM window itu sendiri (peak < -35 dBFS), kecuali silences diberikan
+        vad_peak = 32768 * 10 ** (-35 / 20) if silences is None and vad else None
+        silences = sorted(silences or [])
+
+        def _is_silent(start, end, samples):
+            if vad_peak is not None:
+                return int(np.abs(samples.astype(np.int32)).max()) < vad_peak
+            # Window di-skip kalau seluruhnya tertutup satu interval silence
+            return any(s_start <= start + 0.05 and s_end >= end - 0.05
+                       for s_start, s_end in silences)
+
+        try:
+            from app.probe_cache import probe
+            total_duration = probe(audio_path).duration
+        except Exception:
+            total_duration = 0.0
+
+        owns_model = self.model is None
+        if owns_model:
+            self.load_model()
+        options = {
+            'verbose': False,
+            'word_timestamps': True,
+            'condition_on_previous_text': False,
+            'fp16': self._model_key is not None and self._model_key[2] == "float16",
+        }
+        if language:
+            options['language'] = language
+
+        digest = hashlib.sha1()
+        buffer = np.zeros(0, dtype=np.int16)
+        pending = b''
+        pcm = iter_audio_pcm(audio_path)
+        eof = False
+        window_start = 0.0
+        emitted_until = 0.0
+        segments = []
+        texts = []
+        detected_language = language
+
+        try:
+            while True:
+                # Isi buffer sampai window penuh + 1 sample (untuk tahu ini window terakhir)
+                while not eof and len(buffer) <= win_samples:
+                    chunk = next(pcm, None)
+                    if chunk is None:
+                        eof = True
+                        break
+                    digest.update(chunk)
+                    chunk = pending + chunk
+                    usable = len(chunk) - len(chunk) % 2
+                    pending = chunk[usable:]
+                    buffer = np.concatenate([buffer, np.frombuffer(chunk[:usable], dtype=np.int16)])
+
+                if len(buffer) == 0:
+                    break
+                is_last = eof and len(buffer) <= win_samples
+                window_samples = buffer[:win_samples]
+                window_end = window_start + len(window_samples) / sample_rate
+
+                if not _is_silent(window_start, window_end, window_samples):
+                    audio = window_samples.astype(np.float32) / 32768.0
+                    if texts:
+                        options['initial_prompt'] = texts[-1][-200:]
+                    result = self.model.transcribe(audio, **options)
+                    detected_language = detected_language or result.get('language')
+                    info['language'] = detected_language
+                    if detected_language:
+                        # Window berikutnya pakai bahasa ini: tanpa deteksi ulang
+                        # tiap window dan tanpa ganti bahasa di tengah file
+                        options['language'] = detected_language
+
+                    lo = max(emitted_until, window_start)
+                    hi = float('inf') if is_last else window_end - overlap / 2
+                    for seg in result['segments']:
+                        converted = self._convert_segment(seg, window_start, len(segments))
+                        mid = (converted['start'] + converted['end']) / 2
+                        if not converted['text'] or not (lo <= mid < hi):
+                            continue
+                        segments.append(converted)
+                        texts.append(converted['text'])
+                        yield converted
+                    emitted_until = hi
+
+                    if total_duration > 0:
+                        pct = 30 + 50 * min(1.0, window_end / total_duration)
+                    else:
+                        pct = 30 + min(50, window_end / 60)
+                    self._update_progress(pct, f"Transcribing... {window_end:.0f}s")
+
+                if is_last:
+                    break
+                buffer = buffer[step_samples:]
+                window_start += step_samples / sample_rate
+        finally:
+            pcm.close()
+            if owns_model:
+                self.release_model()
+
+        self._update_progress(80, "Transcription selesai!")
+
+        if cache is not None:
+            audio_hash = digest.hexdigest()
+            try:
+                cache.remember_fingerprint(audio_path, audio_hash)
+                cache.put(
+                    cache.make_key(audio_hash, self.model_size, language, stream_options),
+                    {'text': ' '.join(texts), 'language': detected_language,
+                     'segments': segments}
+                )
+            except Exception:
+                pass
+
+    def plan_chunks(self, audio_path, chunk_length=300.0, silences=None):
+        """
+        Bagi audio jadi chunk ±chunk_length detik, dipotong di tengah silence
+        supaya tidak ada kata yang terpotong.
+
+        Returns:
+            List of (start, end)
+        """
+        from app.ffmpeg_util import get_media_duration
+        duration = get_media_duration(audio_path)
+        if duration <= 0:
+            raise RuntimeError(f"Durasi audio tidak diketahui: {audio_path}")
+        if duration <= chunk_length * 1.5:
+            return [(0.0, duration)]
+
+        if silences is None:
+            from app.editor import VideoEditor
+            silences = VideoEditor(output_dir=self.output_dir).detect_silence(
+                audio_path, noise_threshold="-35dB", min_duration=0.5
+            )
+        silences = sorted(silences)
+
+        chunks = []
+        start = 0.0
+        while duration - start > chunk_length * 1.5:
+            target = start + chunk_length
+            # Titik terdekat ke target yang jatuh di dalam silence (maks ±25% chunk_length)
+            window = chunk_length * 0.25
+            near = [min(max(target, s_start), s_end) for s_start, s_end in silences]
+            near = [c for c in near if abs(c - target) <= window and c > start]
+            cut = min(near, key=lambda c: abs(c - target)) if near else target
+            chunks.append((start, cut))
+            start = cut
+        chunks.append((start, duration))
+        return chunks
+
+    def transcribe_parallel(self, audio_path, language="id", workers=None,
+                            chunk_length=300.0, silences=None, memory_budget_mb=None):
+        """
+        Transcription paralel di CPU: audio dibagi di batas silence, tiap chunk
+        di-transcribe di process pool (1 model per worker), lalu disambung lagi.
+
+        Args:
+            audio_path: Path ke file audio/video
+            language: Bahasa (None = auto-detect)
+            workers: Jumlah worker process (None = otomatis dari CPU & memori)
+            chunk_length: Target panjang chunk (detik)
+            silences: Hasil detect_silence yang sudah ada (opsional)
+            memory_budget_mb: Batas memori total model di semua worker
+
+        Returns:
+            dict seperti transcribe()
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from app.model_registry import (
+            WhisperModelRegistry, default_device, estimate_model_mb
+        )
+
+        cache, cache_key = None, None
+        if self.use_cache:
+            from app.transcript_cache import get_transcript_cache
+            try:
+                cache = get_transcript_cache()
+                cache_key = cache.make_key(
+                    cache.audio_fingerprint(audio_path), self.model_size, language,
+                    {'word_timestamps': True, 'chunk_length': chunk_length}
+                )
+                cached = cache.get(cache_key)
+            except Exception:
+                cache, cached = None, None
+            if cached is not None:
+                self._update_progress(80, "Transcription dari cache!")
+                return cached
+
+        chunks = self.plan_chunks(audio_path, chunk_length, silences)
+
+        device = self.device or default_device()
+        dtype = self.dtype or ("float16" if device == "cuda" else "float32")
+        cpu_count = os.cpu_count() or 1
+        if memory_budget_mb is None:
+            memory_budget_mb = WhisperModelRegistry().memory_budget_mb
+        max_by_memory = max(1, memory_budget_mb // estimate_model_mb(self.model_size, dtype))
+        if workers is None:
+            workers = cpu_count
+        workers = max(1, min(workers, max_by_memory, len(chunks)))
+        torch_threads = max(1, cpu_count // workers)
+
+        self._update_progress(
+            30, f"Transcription paralel: {len(chunks)} chunk, {workers} worker..."
+        )
+
+        results = [None] * len(chunks)
+        detected_language = language
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_chunk_worker_init,
+            initargs=(self.model_size, device, dtype, torch_threads)
+        ) as pool:
+            futures = {
+                pool.submit(_transcribe_chunk, audio_path, start, end, language): i
+                for i, (start, end) in enumerate(chunks)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                segments, chunk_language = future.result()
+                results[futures[future]] = segments
+                detected_language = detected_language or chunk_language
+                self._update_progress(
+                    30 + done / len(chunks) * 50,
+                    f"Transcription paralel... {done}/{len(chunks)} chunk"
+                )
+
+        # Sambung & nomori ulang segment
+        segments = []
+        for chunk_segments in results:
+            for seg in chunk_segments:
+                seg['id'] = len(segments)
+                segments.append(seg)
+
+        self._update_progress(80, "Transcription selesai!")
+        transcription = {
+            'text': ' '.join(seg['text'] for seg in segments),
+            'language': detected_language,
+            'segments': segments,
+        }
+        if cache is not None:
+            cache.put(cache_key, transcription)
+        return transcription
+
+    def stream_subtitle(self, audio_path, language="id", subtitle_format="srt",
+                        output_filename=None, on_segment=None, silences=None, **style_kwargs):
+        """
+        Transcribe streaming sambil menulis file subtitle per segment
+        (file sudah bisa dibaca sebelum transcription selesai).
+
+        Args:
+            audio_path: Path ke file audio/video
+            language: Bahasa audio
+            subtitle_format: 'srt' atau 'ass'
+            output_filename: Nama file output (default subtitle.srt / subtitle.ass)
+            on_segment: callback(segment) untuk consumer lain (misal chapter)
+            silences: Hasil detect_silence yang sudah ada (opsional)
+            **style_kwargs: Styling ASS (sama dengan generate_ass)
+
+        Returns:
+            (transcription dict, path file subtitle)
+        """
+        if output_filename is None:
+            output_filename = f"subtitle.{subtitle_format}"
+        output_path = os.path.join(self.output_dir, output_filename)
+
+        segments = []
+        stream_info = {}
+        with open(output_path, 'w', encoding='utf-8') as f:
+            if subtitle_format == 'ass':
+                f.write(self._ass_header(**style_kwargs))
+            for seg in self.transcribe_stream(audio_path, language=language, silences=silences,
+                                              info=stream_info):
+                segments.append(seg)
+                if subtitle_format == 'ass':
+                    f.write(self._ass_dialogue(seg))
+                else:
+                    f.write(self._srt_cue(len(segments), seg))
+                f.flush()
+                if on_segment:
+                    on_segment(seg)
+
+        transcription = {
+            'text': ' '.join(seg['text'] for seg in segments),
+            'language': stream_info.get('language') or language,
+            'segments': segments,
+        }
+        self._update_progress(90, f"Subtitle file berhasil dibuat: {output_path}")
+        return transcription, output_path
+
     def generate_srt(self, transcription, output_filename="subtitle.srt"):
         """
         Generate file SRT dari hasil transcription.
@@ -97,18 +532,9 @@ class AutoSubtitler:
         """
         output_path = os.path.join(self.output_dir, output_filename)
 
-        def format_time(seconds):
-            hrs = int(seconds // 3600)
-            mins = int((seconds % 3600) // 60)
-            secs = int(seconds % 60)
-            ms = int((seconds % 1) * 1000)
-            return f"{hrs:02d}:{mins:02d}:{secs:02d},{ms:03d}"
-
         with open(output_path, 'w', encoding='utf-8') as f:
             for i, seg in enumerate(transcription['segments'], 1):
-                f.write(f"{i}\n")
-                f.write(f"{format_time(seg['start'])} --> {format_time(seg['end'])}\n")
-                f.write(f"{seg['text']}\n\n")
+                f.write(self._srt_cue(i, seg))
 
         self._update_progress(90, f"SRT file berhasil dibuat: {output_path}")
         return output_path
@@ -138,6 +564,34 @@ class AutoSubtitler:
         """
         output_path = os.path.join(self.output_dir, output_filename)
 
+        header = self._ass_header(font_name, font_size, primary_color, outline_color,
+                                  bold, outline_width, shadow, position)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(header)
+            for seg in transcription['segments']:
+                f.write(self._ass_dialogue(seg))
+
+        self._update_progress(90, f"ASS file berhasil dibuat: {output_path}")
+        return output_path
+
+    @staticmethod
+    def _srt_cue(index, seg):
+        def format_time(seconds):
+            hrs = int(seconds // 3600)
+            mins = int((seconds % 3600) // 60)
+            secs = int(seconds % 60)
+            ms = int((seconds % 1) * 1000)
+            return f"{hrs:02d}:{mins:02d}:{secs:02d},{ms:03d}"
+
+        return (f"{index}\n"
+                f"{format_time(seg['start'])} --> {format_time(seg['end'])}\n"
+                f"{seg['text']}\n\n")
+
+    @staticmethod
+    def _ass_header(font_name="Arial", font_size=20, primary_color="&H00FFFFFF",
+                    outline_color="&H00000000", bold=True, outline_width=2, shadow=1,
+                    position="bottom"):
         alignment_map = {
             'bottom': 2,   # Bottom center
             'top': 8,      # Top center
@@ -146,14 +600,7 @@ class AutoSubtitler:
         alignment = alignment_map.get(position, 2)
         bold_val = -1 if bold else 0
 
-        def format_time_ass(seconds):
-            hrs = int(seconds // 3600)
-            mins = int((seconds % 3600) // 60)
-            secs = int(seconds % 60)
-            cs = int((seconds % 1) * 100)
-            return f"{hrs}:{mins:02d}:{secs:02d}.{cs:02d}"
-
-        header = f"""[Script Info]
+        return f"""[Script Info]
 Title: Auto Generated Subtitle
 ScriptType: v4.00+
 PlayResX: 1920
@@ -168,16 +615,43 @@ Style: Default,{font_name},{font_size},{primary_color},&H000000FF,{outline_color
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
 """
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(header)
-            for seg in transcription['segments']:
-                start = format_time_ass(seg['start'])
-                end = format_time_ass(seg['end'])
-                text = seg['text'].replace('\n', '\\N')
-                f.write(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n")
+    @staticmethod
+    def _ass_dialogue(seg):
+        def format_time_ass(seconds):
+            hrs = int(seconds // 3600)
+            mins = int((seconds % 3600) // 60)
+            secs = int(seconds % 60)
+            cs = int((seconds % 1) * 100)
+            return f"{hrs}:{mins:02d}:{secs:02d}.{cs:02d}"
 
-        self._update_progress(90, f"ASS file berhasil dibuat: {output_path}")
-        return output_path
+        start = format_time_ass(seg['start'])
+        end = format_time_ass(seg['end'])
+        text = seg['text'].replace('\n', '\\N')
+        return f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n"
+
+    @staticmethod
+    def subtitle_filter(subtitle_path, subtitle_style=None):
+        """
+        Filter ass=/subtitles= untuk burn subtitle (dipakai di -vf / filter chain).
+
+        Args:
+            subtitle_path: Path ke file SRT atau ASS
+            subtitle_style: Style override untuk SRT (diabaikan untuk ASS)
+        """
+        # Escape path untuk FFmpeg filter (Windows)
+        sub_path_escaped = subtitle_path.replace('\\', '/').replace(':', '\\:')
+
+        if subtitle_path.endswith('.ass'):
+            # ASS sudah punya styling sendiri
+            return f"ass='{sub_path_escaped}'"
+
+        # SRT - tambahkan styling
+        if subtitle_style is None:
+            subtitle_style = (
+                "FontName=Arial,FontSize=24,PrimaryColour=&H00FFFFFF,"
+                "OutlineColour=&H00000000,BorderStyle=1,Outline=2,Shadow=1"
+            )
+        return f"subtitles='{sub_path_escaped}':force_style='{subtitle_style}'"
 
     def burn_subtitle_to_video(self, video_path, subtitle_path, output_path=None,
                                 subtitle_style=None):
@@ -199,20 +673,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
 
         self._update_progress(50, "Burning subtitle ke video...")
 
-        # Escape path untuk FFmpeg filter (Windows)
-        sub_path_escaped = subtitle_path.replace('\\', '/').replace(':', '\\:')
-
-        if subtitle_path.endswith('.ass'):
-            # ASS sudah punya styling sendiri
-            vf = f"ass='{sub_path_escaped}'"
-        else:
-            # SRT - tambahkan styling
-            if subtitle_style is None:
-                subtitle_style = (
-                    "FontName=Arial,FontSize=24,PrimaryColour=&H00FFFFFF,"
-                    "OutlineColour=&H00000000,BorderStyle=1,Outline=2,Shadow=1"
-                )
-            vf = f"subtitles='{sub_path_escaped}':force_style='{subtitle_style}'"
+        vf = self.subtitle_filter(subtitle_path, subtitle_style)
 
         cmd = [
             self.ffmpeg, '-y',
@@ -225,16 +686,19 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             output_path
         ]
 
-        process = subprocess.run(cmd, capture_output=True, text=True)
-
-        if process.returncode != 0:
-            raise RuntimeError(f"FFmpeg error: {process.stderr}")
+        self.runner.run(
+            cmd,
+            progress_callback=lambda pct: self._update_progress(
+                50 + pct * 0.49, f"Burning subtitle ke video... {pct:.0f}%"
+            )
+        )
 
         self._update_progress(100, f"Video dengan subtitle berhasil dibuat: {output_path}")
         return output_path
 
     def full_pipeline(self, video_path, language="id", subtitle_format="ass",
-                      burn_to_video=True, **style_kwargs):
+                      burn_to_video=True, streaming=False, parallel=False,
+                      **style_kwargs):
         """
         Pipeline lengkap: Video → Transcribe → Subtitle → Burn ke video.
         
@@ -243,6 +707,9 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             language: Bahasa audio
             subtitle_format: 'srt' atau 'ass'
             burn_to_video: Burn subtitle ke video atau hanya generate file subtitle
+            streaming: Transcribe per window 30 detik (memori datar, file subtitle
+                       ditulis bertahap) — cocok untuk video panjang
+            parallel: Transcribe per chunk di banyak CPU core (transcribe_parallel)
             **style_kwargs: Keyword arguments untuk styling subtitle ASS
         
         Returns:
@@ -250,14 +717,24 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         """
         self._update_progress(5, "Memulai pipeline subtitle...")
 
-        # Step 1: Transcribe
-        transcription = self.transcribe(video_path, language=language)
-
-        # Step 2: Generate subtitle file
-        if subtitle_format == 'ass':
-            sub_path = self.generate_ass(transcription, **style_kwargs)
+        if streaming:
+            # Step 1+2: Transcribe sambil menulis file subtitle
+            transcription, sub_path = self.stream_subtitle(
+                video_path, language=language, subtitle_format=subtitle_format,
+                **(style_kwargs if subtitle_format == 'ass' else {})
+            )
         else:
-            sub_path = self.generate_srt(transcription)
+            # Step 1: Transcribe
+            if parallel:
+                transcription = self.transcribe_parallel(video_path, language=language)
+            else:
+                transcription = self.transcribe(video_path, language=language)
+
+            # Step 2: Generate subtitle file
+            if subtitle_format == 'ass':
+                sub_path = self.generate_ass(transcription, **style_kwargs)
+            else:
+                sub_path = self.generate_srt(transcription)
 
         result = {
             'transcription': transcription,
@@ -3,10 +3,290 @@ Modul Thumbnail Generator - Buat thumbnail YouTube yang menarik
 menggunakan Pillow (PIL)
 """
 import os
-from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
-import subprocess
 import json
-from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path
+import functools
+import itertools
+from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
+from app.ffmpeg_util import get_ffmpeg_path, get_ffprobe_path, iter_video_frames, video_frame_size
+from app.probe_cache import probe
+from app.frame_scorer import FrameScorer
+
+
+# Standard YouTube thumbnail
+THUMBNAIL_SIZE = (1280, 720)
+
+# Style default untuk batch_generate / variant matrix
+DEFAULT_STYLES = [
+    {'text_position': 'center', 'overlay_color': (0, 0, 0, 120)},
+    {'text_position': 'bottom', 'overlay_color': (20, 0, 0, 140)},
+    {'text_position': 'center', 'overlay_color': (0, 0, 30, 100)},
+    {'text_position': 'top', 'overlay_color': (0, 0, 0, 80)},
+    {'text_position': 'bottom', 'overlay_color': (30, 0, 0, 160)},
+]
+
+FONT_CANDIDATES = {
+    True: [
+        "C:/Windows/Fonts/arialbd.ttf",
+        "C:/Windows/Fonts/impact.ttf",
+        "C:/Windows/Fonts/calibrib.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/System/Library/Fonts/Helvetica.ttc",
+    ],
+    False: [
+        "C:/Windows/Fonts/arial.ttf",
+        "C:/Windows/Fonts/impact.ttf",
+        "C:/Windows/Fonts/calibrib.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/System/Library/Fonts/Helvetica.ttc",
+    ],
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _font_path(bold=True):
+    """Path font pertama yang ada (cek filesystem sekali per proses)."""
+    for font_path in FONT_CANDIDATES[bold]:
+        if os.path.exists(font_path):
+            return font_path
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def _load_font(font_size, bold=True):
+    """ImageFont yang sudah di-load, LRU per (ukuran, bold)."""
+    font_path = _font_path(bold)
+    if font_path:
+        return ImageFont.truetype(font_path, font_size)
+
+    # Fallback
+    try:
+        return ImageFont.truetype("arial.ttf", font_size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=16)
+def _vignette_layer(size):
+    """Layer vignette RGBA per ukuran (80 ring outline), dibuat sekali."""
+    vignette = Image.new('RGBA', size, (0, 0, 0, 0))
+    vignette_draw = ImageDraw.Draw(vignette)
+    for i in range(80):
+        alpha = int(i * 2.5)
+        vignette_draw.rectangle(
+            [i, i, size[0] - i, size[1] - i],
+            outline=(0, 0, 0, alpha)
+        )
+    return vignette
+
+
+@functools.lru_cache(maxsize=64)
+def _effects_layer(size, overlay_color, add_vignette):
+    """
+    Vignette + overlay warna digabung jadi satu layer (alpha compositing
+    asosiatif), dipisah jadi (RGB, alpha) supaya bisa langsung di-paste
+    dengan mask ke background RGB — satu operasi per thumbnail.
+    """
+    layer = Image.new('RGBA', size, overlay_color)
+    if add_vignette:
+        layer = Image.alpha_composite(_vignette_layer(size), layer)
+    return layer.convert('RGB'), layer.getchannel('A')
+
+
+def prepare_background(img, size, add_color_boost=True):
+    """Resize ke ukuran thumbnail + color boost (RGB)."""
+    img = img.convert('RGB')
+    if img.size != size:
+        img = img.resize(size, Image.LANCZOS)
+
+    # Color boost
+    if add_color_boost:
+        img = ImageEnhance.Color(img).enhance(1.3)  # Saturation boost
+        img = ImageEnhance.Contrast(img).enhance(1.2)  # Contrast boost
+        img = ImageEnhance.Brightness(img).enhance(1.05)
+
+    return img
+
+
+@functools.lru_cache(maxsize=16)
+def _background_layer(background_path, mtime_ns, size, add_color_boost):
+    """
+    Load, resize & color boost satu frame background (RGB), di-cache per
+    (path, mtime, ukuran) — variasi teks/overlay dari frame yang sama
+    tidak decode & resize ulang. Hasil jangan diubah in-place.
+    """
+    return prepare_background(Image.open(background_path), size, add_color_boost)
+
+
+def compose_thumbnail(background, title_text, size,
+                      text_color=(255, 255, 255),
+                      outline_color=(0, 0, 0),
+                      overlay_color=(0, 0, 0, 120),
+                      text_position="center",
+                      font_size=72,
+                      add_vignette=True):
+    """
+    Render thumbnail (overlay + teks) di atas background yang sudah disiapkan
+    (prepare_background). Background tidak diubah.
+
+    Returns:
+        PIL.Image RGB
+    """
+    # Vignette + semi-transparent overlay (layer di-cache per ukuran/warna)
+    img = background.copy()
+    layer, alpha = _effects_layer(size, tuple(overlay_color), add_vignette)
+    img.paste(layer, (0, 0), alpha)
+
+    # Draw text
+    draw = ImageDraw.Draw(img)
+    font = _load_font(font_size, True)
+
+    # Word wrap
+    words = title_text.split()
+    lines = []
+    current_line = ""
+    max_width = size[0] - 100  # 50px padding each side
+
+    for word in words:
+        test_line = f"{current_line} {word}".strip()
+        bbox = draw.textbbox((0, 0), test_line, font=font)
+        if bbox[2] - bbox[0] <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+
+    # Calculate text position
+    line_height = font_size + 10
+    total_text_height = len(lines) * line_height
+
+    if text_position == "center":
+        y_start = (size[1] - total_text_height) // 2
+    elif text_position == "bottom":
+        y_start = size[1] - total_text_height - 60
+    else:  # top
+        y_start = 60
+
+    # Draw text with outline
+    for i, line in enumerate(lines):
+        bbox = draw.textbbox((0, 0), line, font=font)
+        text_width = bbox[2] - bbox[0]
+        x = (size[0] - text_width) // 2
+        y = y_start + i * line_height
+
+        # Text + outline dalam satu pass (stroke)
+        draw.text((x, y), line, font=font, fill=text_color,
+                  stroke_width=3, stroke_fill=outline_color)
+
+    return img
+
+
+def compose_split(left_img, right_img, title_text, size, divider_color=(255, 0, 0)):
+    """
+    Render thumbnail split (2 gambar side by side).
+
+    Returns:
+        PIL.Image RGB
+    """
+    canvas = Image.new('RGB', size, (0, 0, 0))
+
+    half_width = size[0] // 2
+
+    # Left & right image
+    canvas.paste(left_img.convert('RGB').resize((half_width, size[1]), Image.LANCZOS), (0, 0))
+    canvas.paste(right_img.convert('RGB').resize((half_width, size[1]), Image.LANCZOS), (half_width, 0))
+
+    # Divider line
+    draw = ImageDraw.Draw(canvas)
+    draw.line(
+        [(half_width, 0), (half_width, size[1])],
+        fill=divider_color, width=6
+    )
+
+    # Title text overlay
+    if title_text:
+        canvas_rgba = canvas.convert('RGBA')
+        # Dark bar at bottom
+        overlay = Image.new('RGBA', size, (0, 0, 0, 0))
+        overlay_draw = ImageDraw.Draw(overlay)
+        overlay_draw.rectangle(
+            [0, size[1] - 120, size[0], size[1]],
+            fill=(0, 0, 0, 180)
+        )
+        canvas_rgba = Image.alpha_composite(canvas_rgba, overlay)
+
+        draw = ImageDraw.Draw(canvas_rgba)
+        font = _load_font(52, True)
+        bbox = draw.textbbox((0, 0), title_text, font=font)
+        text_width = bbox[2] - bbox[0]
+        x = (size[0] - text_width) // 2
+        y = size[1] - 95
+
+        # Text + outline (stroke)
+        draw.text((x, y), title_text, font=font, fill=(255, 255, 255),
+                  stroke_width=2, stroke_fill=(0, 0, 0))
+
+        canvas = canvas_rgba.convert('RGB')
+
+    return canvas
+
+
+# ===== Worker process untuk variant matrix =====
+# Frame (sudah di-resize) dibagi lewat shared memory, bukan JPEG per worker.
+_matrix_frames = None
+_matrix_shm = None
+
+
+def _matrix_worker_init(shm_name, shape):
+    # Worker hanya attach; unlink tetap tugas proses induk
+    global _matrix_shm
+    import numpy as np
+    from multiprocessing import shared_memory
+    _matrix_shm = shared_memory.SharedMemory(name=shm_name)
+    _set_matrix_frames(np.ndarray(shape, dtype=np.uint8, buffer=_matrix_shm.buf))
+
+
+def _set_matrix_frames(frames):
+    global _matrix_frames
+    _matrix_frames = frames
+    _matrix_background.cache_clear()
+
+
+@functools.lru_cache(maxsize=32)
+def _matrix_background(index, add_color_boost):
+    """Background siap pakai dari frame shared (di-cache per worker)."""
+    return prepare_background(Image.fromarray(_matrix_frames[index]), THUMBNAIL_SIZE, add_color_boost)
+
+
+def _render_variant(job, output_dir, preview_size):
+    """
+    Render satu variant matrix → simpan JPEG.
+
+    Returns:
+        (id, bytes preview RGB ukuran preview_size)
+    """
+    style = job['style']
+    if style.get('layout') == 'split':
+        left, right = job['frames']
+        img = compose_split(
+            Image.fromarray(_matrix_frames[left]), Image.fromarray(_matrix_frames[right]),
+            job['text'], THUMBNAIL_SIZE, tuple(style.get('divider_color', (255, 0, 0)))
+        )
+    else:
+        background = _matrix_background(job['frames'][0], style.get('add_color_boost', True))
+        img = compose_thumbnail(
+            background, job['text'], THUMBNAIL_SIZE,
+            text_color=tuple(style.get('text_color', (255, 255, 255))),
+            outline_color=tuple(style.get('outline_color', (0, 0, 0))),
+            overlay_color=tuple(style.get('overlay_color', (0, 0, 0, 120))),
+            text_position=style.get('text_position', 'center'),
+            font_size=style.get('font_size', 72),
+            add_vignette=style.get('add_vignette', True),
+        )
+    img.save(os.path.join(output_dir, job['file']), 'JPEG', quality=95)
+    return job['id'], img.resize(preview_size, Image.BILINEAR).tobytes()
 
 
 class ThumbnailGenerator:
@@ -15,19 +295,49 @@ class ThumbnailGenerator:
     def __init__(self, output_dir="output"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
-        self.YOUTUBE_SIZE = (1280, 720)  # Standard YouTube thumbnail
+        self.YOUTUBE_SIZE = THUMBNAIL_SIZE
         self.ffmpeg = get_ffmpeg_path()
         self.ffprobe = get_ffprobe_path()
 
-    def extract_best_frames(self, video_path, num_frames=10, output_prefix="frame"):
+    def extract_frames(self, video_path, timestamps, width=None, keyframes_only=False,
+                       seek=False):
+        """
+        Ambil banyak frame sekaligus dengan SATU proses FFmpeg (filter select),
+        langsung sebagai gambar Pillow — tanpa file JPEG perantara.
+
+        Args:
+            video_path: Path ke video
+            timestamps: List detik; tiap timestamp → frame pertama pada/setelahnya
+            width: Scale saat decode (None = resolusi asli)
+            keyframes_only: Hanya decode keyframe (murah, cocok untuk kandidat)
+            seek: Seek akurat per timestamp (untuk sedikit frame di video panjang)
+
+        Returns:
+            List of (pts_time, PIL.Image RGB), urut waktu
+        """
+        size = video_frame_size(video_path, width)
+        return [
+            (pts, Image.frombytes('RGB', size, data))
+            for pts, data in iter_video_frames(
+                video_path, width=width, timestamps=timestamps,
+                keyframes_only=keyframes_only, seek=seek
+            )
+        ]
+
+    def extract_best_frames(self, video_path, num_frames=10, output_prefix="frame",
+                            scored=True, keyframes_only=True):
         """
         Extract frame-frame terbaik dari video.
-        Menggunakan scene detection FFmpeg.
         
         Args:
             video_path: Path ke video
             num_frames: Jumlah frame yang di-extract
             output_prefix: Prefix nama file output
+            scored: Pilih frame berdasarkan skor kualitas (FrameScorer: decode
+                    low-res sekali, hanya pemenang diambil resolusi penuh).
+                    False = frame di interval merata
+            keyframes_only: (scored=False) pakai keyframe terdekat setelah tiap
+                            titik — decode jauh lebih murah, False = frame persis
         
         Returns:
             List path ke frame images
@@ -35,57 +345,35 @@ class ThumbnailGenerator:
         frames_dir = os.path.join(self.output_dir, "frames")
         os.makedirs(frames_dir, exist_ok=True)
 
-        # Dapatkan durasi video
-        probe_cmd = [
-            self.ffprobe or self.ffmpeg, '-v', 'quiet', '-print_format', 'json',
-            '-show_format', video_path
-        ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        info = json.loads(result.stdout)
-        duration = float(info['format']['duration'])
+        if scored:
+            best = FrameScorer().best_timestamps(video_path, k=num_frames)
+            frames = self.extract_frames(video_path, [t for t, _ in best], seek=True)
+        else:
+            # Titik di interval yang merata
+            duration = probe(video_path).duration
+            interval = duration / (num_frames + 1)
+            timestamps = [interval * i for i in range(1, num_frames + 1)]
+            frames = self.extract_frames(
+                video_path, timestamps, keyframes_only=keyframes_only,
+                seek=not keyframes_only
+            )
 
-        # Extract frames di interval yang merata
-        interval = duration / (num_frames + 1)
         frame_paths = []
-
-        for i in range(1, num_frames + 1):
-            timestamp = interval * i
+        for i, (_, frame) in enumerate(frames, start=1):
             output_path = os.path.join(frames_dir, f"{output_prefix}_{i:03d}.jpg")
-            
-            cmd = [
-                self.ffmpeg, '-y',
-                '-ss', str(timestamp),
-                '-i', video_path,
-                '-vframes', '1',
-                '-q:v', '2',
-                output_path
-            ]
-            subprocess.run(cmd, capture_output=True)
-            
-            if os.path.exists(output_path):
-                frame_paths.append(output_path)
+            frame.save(output_path, 'JPEG', quality=95)
+            frame_paths.append(output_path)
 
         return frame_paths
 
     def _get_font(self, font_size, bold=True):
-        """Coba load font, fallback ke default."""
-        font_candidates = [
-            "C:/Windows/Fonts/arialbd.ttf" if bold else "C:/Windows/Fonts/arial.ttf",
-            "C:/Windows/Fonts/impact.ttf",
-            "C:/Windows/Fonts/calibrib.ttf",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-            "/System/Library/Fonts/Helvetica.ttc",
-        ]
-        
-        for font_path in font_candidates:
-            if os.path.exists(font_path):
-                return ImageFont.truetype(font_path, font_size)
-        
-        # Fallback
-        try:
-            return ImageFont.truetype("arial.ttf", font_size)
-        except OSError:
-            return ImageFont.load_default()
+        """Coba load font, fallback ke default (di-cache, lihat _load_font)."""
+        return _load_font(font_size, bold)
+
+    def _prepare_background(self, background_path, add_color_boost=True):
+        """Background RGB ukuran YouTube (lihat _background_layer)."""
+        mtime = os.stat(background_path).st_mtime_ns
+        return _background_layer(background_path, mtime, self.YOUTUBE_SIZE, add_color_boost)
 
     def create_thumbnail(self, background_path, title_text, 
                          output_filename="thumbnail.jpg",
@@ -116,90 +404,15 @@ class ThumbnailGenerator:
         """
         output_path = os.path.join(self.output_dir, output_filename)
 
-        # Load & resize background
-        img = Image.open(background_path).convert('RGBA')
-        img = img.resize(self.YOUTUBE_SIZE, Image.LANCZOS)
-
-        # Color boost
-        if add_color_boost:
-            rgb_img = img.convert('RGB')
-            enhancer = ImageEnhance.Color(rgb_img)
-            rgb_img = enhancer.enhance(1.3)  # Saturation boost
-            enhancer = ImageEnhance.Contrast(rgb_img)
-            rgb_img = enhancer.enhance(1.2)  # Contrast boost
-            enhancer = ImageEnhance.Brightness(rgb_img)
-            rgb_img = enhancer.enhance(1.05)
-            img = rgb_img.convert('RGBA')
-
-        # Vignette effect
-        if add_vignette:
-            vignette = Image.new('RGBA', self.YOUTUBE_SIZE, (0, 0, 0, 0))
-            vignette_draw = ImageDraw.Draw(vignette)
-            for i in range(80):
-                alpha = int(i * 2.5)
-                vignette_draw.rectangle(
-                    [i, i, self.YOUTUBE_SIZE[0]-i, self.YOUTUBE_SIZE[1]-i],
-                    outline=(0, 0, 0, alpha)
-                )
-            img = Image.alpha_composite(img, vignette)
-
-        # Semi-transparent overlay
-        overlay = Image.new('RGBA', self.YOUTUBE_SIZE, overlay_color)
-        img = Image.alpha_composite(img, overlay)
-
-        # Draw text
-        draw = ImageDraw.Draw(img)
-        font = self._get_font(font_size, bold=True)
-
-        # Word wrap
-        words = title_text.split()
-        lines = []
-        current_line = ""
-        max_width = self.YOUTUBE_SIZE[0] - 100  # 50px padding each side
-
-        for word in words:
-            test_line = f"{current_line} {word}".strip()
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            if bbox[2] - bbox[0] <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        if current_line:
-            lines.append(current_line)
-
-        # Calculate text position
-        line_height = font_size + 10
-        total_text_height = len(lines) * line_height
-
-        if text_position == "center":
-            y_start = (self.YOUTUBE_SIZE[1] - total_text_height) // 2
-        elif text_position == "bottom":
-            y_start = self.YOUTUBE_SIZE[1] - total_text_height - 60
-        else:  # top
-            y_start = 60
-
-        # Draw text with outline
-        for i, line in enumerate(lines):
-            bbox = draw.textbbox((0, 0), line, font=font)
-            text_width = bbox[2] - bbox[0]
-            x = (self.YOUTUBE_SIZE[0] - text_width) // 2
-            y = y_start + i * line_height
-
-            # Outline (draw text in 8 directions)
-            outline_width = 3
-            for dx in range(-outline_width, outline_width + 1):
-                for dy in range(-outline_width, outline_width + 1):
-                    if dx != 0 or dy != 0:
-                        draw.text((x + dx, y + dy), line, font=font, fill=outline_color)
-
-            # Main text
-            draw.text((x, y), line, font=font, fill=text_color)
-
-        # Convert to RGB and save
-        final_img = img.convert('RGB')
-        final_img.save(output_path, 'JPEG', quality=95)
+        # Background siap pakai (resize + color boost), di-cache per frame
+        img = self._prepare_background(background_path, add_color_boost)
+        img = compose_thumbnail(
+            img, title_text, self.YOUTUBE_SIZE,
+            text_color=text_color, outline_color=outline_color,
+            overlay_color=overlay_color, text_position=text_position,
+            font_size=font_size, add_vignette=add_vignette,
+        )
+        img.save(output_path, 'JPEG', quality=95)
 
         return output_path
 
@@ -211,55 +424,10 @@ class ThumbnailGenerator:
         Misal: kiri = MC miskin, kanan = MC kaya.
         """
         output_path = os.path.join(self.output_dir, output_filename)
-        
-        canvas = Image.new('RGB', self.YOUTUBE_SIZE, (0, 0, 0))
-        
-        half_width = self.YOUTUBE_SIZE[0] // 2
-        
-        # Left image
-        left_img = Image.open(left_image_path).convert('RGB')
-        left_img = left_img.resize((half_width, self.YOUTUBE_SIZE[1]), Image.LANCZOS)
-        canvas.paste(left_img, (0, 0))
-        
-        # Right image
-        right_img = Image.open(right_image_path).convert('RGB')
-        right_img = right_img.resize((half_width, self.YOUTUBE_SIZE[1]), Image.LANCZOS)
-        canvas.paste(right_img, (half_width, 0))
-        
-        # Divider line
-        draw = ImageDraw.Draw(canvas)
-        draw.line(
-            [(half_width, 0), (half_width, self.YOUTUBE_SIZE[1])],
-            fill=divider_color, width=6
+        canvas = compose_split(
+            Image.open(left_image_path), Image.open(right_image_path),
+            title_text, self.YOUTUBE_SIZE, divider_color
         )
-        
-        # Title text overlay
-        if title_text:
-            canvas_rgba = canvas.convert('RGBA')
-            # Dark bar at bottom
-            overlay = Image.new('RGBA', self.YOUTUBE_SIZE, (0, 0, 0, 0))
-            overlay_draw = ImageDraw.Draw(overlay)
-            overlay_draw.rectangle(
-                [0, self.YOUTUBE_SIZE[1] - 120, self.YOUTUBE_SIZE[0], self.YOUTUBE_SIZE[1]],
-                fill=(0, 0, 0, 180)
-            )
-            canvas_rgba = Image.alpha_composite(canvas_rgba, overlay)
-            
-            draw = ImageDraw.Draw(canvas_rgba)
-            font = self._get_font(52, bold=True)
-            bbox = draw.textbbox((0, 0), title_text, font=font)
-            text_width = bbox[2] - bbox[0]
-            x = (self.YOUTUBE_SIZE[0] - text_width) // 2
-            y = self.YOUTUBE_SIZE[1] - 95
-            
-            # Outline
-            for dx in range(-2, 3):
-                for dy in range(-2, 3):
-                    draw.text((x+dx, y+dy), title_text, font=font, fill=(0, 0, 0))
-            draw.text((x, y), title_text, font=font, fill=(255, 255, 255))
-            
-            canvas = canvas_rgba.convert('RGB')
-        
         canvas.save(output_path, 'JPEG', quality=95)
         return output_path
 
@@ -273,26 +441,169 @@ class ThumbnailGenerator:
         frames = self.extract_best_frames(video_path, num_frames=num_options)
         thumbnails = []
         
-        positions = ["center", "bottom", "center", "top", "bottom"]
-        overlays = [
-            (0, 0, 0, 120),
-            (20, 0, 0, 140),
-            (0, 0, 30, 100),
-            (0, 0, 0, 80),
-            (30, 0, 0, 160),
-        ]
-        
         for i, frame_path in enumerate(frames):
-            pos = positions[i % len(positions)]
-            overlay = overlays[i % len(overlays)]
+            style = DEFAULT_STYLES[i % len(DEFAULT_STYLES)]
             
             thumb_path = self.create_thumbnail(
                 background_path=frame_path,
                 title_text=title_text,
                 output_filename=f"thumbnail_option_{i+1}.jpg",
-                text_position=pos,
-                overlay_color=overlay,
+                text_position=style['text_position'],
+                overlay_color=style['overlay_color'],
             )
             thumbnails.append(thumb_path)
         
         return thumbnails
+
+    def render_matrix(self, texts, video_path=None, frame_paths=None, styles=None,
+                      num_frames=4, workers=None, output_subdir="variants",
+                      preview_width=320, columns=6):
+        """
+        Render matrix variant A/B: frame × teks × style, paralel di process pool.
+
+        Frame di-decode sekali (FrameScorer → resolusi penuh hanya pemenang),
+        di-resize ke ukuran thumbnail, lalu dibagi ke worker lewat shared memory.
+
+        Args:
+            texts: List teks judul
+            video_path: Sumber frame (dipilih FrameScorer), atau
+            frame_paths: List gambar yang sudah ada
+            styles: List dict style. Key: layout ('single'/'split'), text_position,
+                    overlay_color, font_size, text_color, outline_color,
+                    add_vignette, add_color_boost, divider_color.
+                    Default: DEFAULT_STYLES + satu split. Split memasangkan
+                    frame i dengan frame i+1.
+            num_frames: Jumlah frame kalau dari video_path
+            workers: Jumlah process (None = CPU count, 1 = tanpa pool)
+            output_subdir: Sub-folder output di output_dir
+            preview_width: Lebar tiap tile di contact sheet
+            columns: Jumlah kolom contact sheet
+
+        Returns:
+            dict {'variants': [...], 'manifest': path JSON, 'contact_sheet': path}
+        """
+        import numpy as np
+        from multiprocessing import shared_memory
+        from concurrent.futures import ProcessPoolExecutor
+
+        if styles is None:
+            styles = DEFAULT_STYLES + [{'layout': 'split', 'divider_color': (255, 0, 0)}]
+        if not texts or not styles:
+            raise ValueError("texts dan styles tidak boleh kosong")
+        out_dir = os.path.join(self.output_dir, output_subdir)
+        os.makedirs(out_dir, exist_ok=True)
+
+        # 1. Frame → array (F, H, W, 3) ukuran thumbnail
+        if frame_paths:
+            sources = [(None, Image.open(path)) for path in frame_paths]
+        elif video_path:
+            best = FrameScorer().best_timestamps(video_path, k=num_frames)
+            sources = self.extract_frames(video_path, [t for t, _ in best], seek=True)
+        else:
+            raise ValueError("video_path atau frame_paths harus diisi")
+        if not sources:
+            raise RuntimeError("Tidak ada frame untuk variant matrix")
+        frame_times = [t for t, _ in sources]
+        w, h = self.YOUTUBE_SIZE
+        shape = (len(sources), h, w, 3)
+
+        # 2. Daftar job (product frame × teks × style)
+        jobs = []
+        for (fi, text, (si, style)) in itertools.product(
+            range(len(sources)), texts, enumerate(styles)
+        ):
+            if style.get('layout') == 'split':
+                if len(sources) < 2:
+                    continue
+                frames = [fi, (fi + 1) % len(sources)]
+            else:
+                frames = [fi]
+            n = len(jobs) + 1
+            jobs.append({
+                'id': n, 'file': f"variant_{n:03d}.jpg", 'frames': frames,
+                'text': text, 'style_index': si, 'style': style,
+            })
+        if not jobs:
+            raise ValueError("Tidak ada variant: layout split butuh minimal 2 frame")
+
+        preview_size = (preview_width, int(preview_width * h / w))
+        previews = {}
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        try:
+            frames_array = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            for i, (_, img) in enumerate(sources):
+                frames_array[i] = np.asarray(img.convert('RGB').resize((w, h), Image.LANCZOS))
+            del sources
+
+            if workers is None:
+                workers = os.cpu_count() or 1
+            workers = max(1, min(workers, len(jobs)))
+
+            if workers == 1:
+                _set_matrix_frames(frames_array)
+                try:
+                    for job in jobs:
+                        job_id, preview = _render_variant(job, out_dir, preview_size)
+                        previews[job_id] = preview
+                finally:
+                    _set_matrix_frames(None)
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_matrix_worker_init,
+                    initargs=(shm.name, shape)
+                ) as pool:
+                    # Job dari frame yang sama berurutan → cache background per worker
+                    chunksize = max(1, len(jobs) // (workers * 4))
+                    for job_id, preview in pool.map(
+                        _render_variant, jobs, itertools.repeat(out_dir),
+                        itertools.repeat(preview_size), chunksize=chunksize
+                    ):
+                        previews[job_id] = preview
+            del frames_array
+        finally:
+            shm.close()
+            shm.unlink()
+
+        # 3. Contact sheet + manifest
+        sheet_path = os.path.join(out_dir, "contact_sheet.jpg")
+        self._contact_sheet(jobs, previews, preview_size, columns, sheet_path)
+
+        variants = [
+            {
+                'id': job['id'],
+                'file': job['file'],
+                'text': job['text'],
+                'frames': job['frames'],
+                'frame_times': [frame_times[i] for i in job['frames']],
+                'style_index': job['style_index'],
+                'style': job['style'],
+            }
+            for job in jobs
+        ]
+        manifest_path = os.path.join(out_dir, "manifest.json")
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'source': video_path or frame_paths,
+                'size': list(self.YOUTUBE_SIZE),
+                'contact_sheet': os.path.basename(sheet_path),
+                'variants': variants,
+            }, f, indent=2, ensure_ascii=False)
+
+        return {'variants': variants, 'manifest': manifest_path, 'contact_sheet': sheet_path}
+
+    def _contact_sheet(self, jobs, previews, preview_size, columns, output_path):
+        """Grid semua variant (preview dari worker) + nomor variant."""
+        pw, ph = preview_size
+        label_h = 24
+        columns = max(1, min(columns, len(jobs)))
+        rows = (len(jobs) + columns - 1) // columns
+        sheet = Image.new('RGB', (columns * pw, rows * (ph + label_h)), (24, 24, 24))
+        draw = ImageDraw.Draw(sheet)
+        font = self._get_font(16, bold=True)
+        for n, job in enumerate(jobs):
+            x, y = (n % columns) * pw, (n // columns) * (ph + label_h)
+            sheet.paste(Image.frombytes('RGB', preview_size, previews[job['id']]), (x, y))
+            draw.text((x + 6, y + ph + 3), f"#{job['id']} {job['text'][:30]}",
+                      font=font, fill=(255, 255, 255))
+        sheet.save(output_path, 'JPEG', quality=90)
+        return output_path
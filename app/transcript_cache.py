@@ -0,0 +1,173 @@
+"""
+Transcript Cache — hasil Whisper di-cache berdasarkan isi audio (bukan container)
+Key: hash stream audio hasil decode (16 kHz mono) + model + bahasa + opsi.
+Ganti color preset / watermark lalu render ulang → transcription langsung dari cache.
+"""
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+import threading
+from app.ffmpeg_util import iter_audio_pcm
+from app.cache import get_cache_dir, file_key
+
+
+# Versi format data cache (naikkan kalau struktur transcription berubah)
+CACHE_VERSION = 1
+
+
+def _compact(transcription):
+    """
+    Transcription dict → struktur compact:
+        segment = [id, start, end, text, [[word, start, end], ...]]
+    """
+    return {
+        'v': CACHE_VERSION,
+        'text': transcription['text'],
+        'language': transcription.get('language'),
+        'segments': [
+            [
+                seg['id'], round(seg['start'], 3), round(seg['end'], 3), seg['text'],
+                [[w['word'], round(w['start'], 3), round(w['end'], 3)]
+                 for w in seg.get('words', [])],
+            ]
+            for seg in transcription['segments']
+        ],
+    }
+
+
+def _expand(data):
+    """Kebalikan dari _compact."""
+    return {
+        'text': data['text'],
+        'language': data.get('language'),
+        'segments': [
+            {
+                'id': seg_id,
+                'start': start,
+                'end': end,
+                'text': text,
+                'words': [{'word': w, 'start': ws, 'end': we} for w, ws, we in words],
+            }
+            for seg_id, start, end, text, words in data['segments']
+        ],
+    }
+
+
+class TranscriptCache:
+    """
+    Cache transcription persistent (SQLite, data JSON terkompresi zlib).
+
+    - audio_hash: (file_key) → hash audio, supaya file yang sama tidak di-decode ulang
+    - transcripts: (hash audio + model + bahasa + opsi) → transcription compact
+    """
+
+    def __init__(self, db_path=None):
+        """
+        Args:
+            db_path: Path SQLite (default: <cache dir>/transcripts.sqlite)
+        """
+        self.db_path = db_path or os.path.join(get_cache_dir(), "transcripts.sqlite")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS audio_hash ("
+                "file_key TEXT PRIMARY KEY, hash TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "key TEXT PRIMARY KEY, data BLOB NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def known_fingerprint(self, media_path):
+        """Hash audio yang sudah pernah dihitung untuk file ini (tanpa decode), atau None."""
+        fkey = repr(file_key(media_path))
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT hash FROM audio_hash WHERE file_key = ?", (fkey,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def remember_fingerprint(self, media_path, audio_hash):
+        """Simpan hash audio yang dihitung di tempat lain (misal saat streaming decode)."""
+        fkey = repr(file_key(media_path))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO audio_hash (file_key, hash) VALUES (?, ?)",
+                (fkey, audio_hash)
+            )
+
+    def audio_fingerprint(self, media_path):
+        """
+        Hash dari stream audio hasil decode (16 kHz mono s16le).
+        Remux / ganti video stream / ubah metadata tidak mengubah hash ini.
+        """
+        audio_hash = self.known_fingerprint(media_path)
+        if audio_hash:
+            return audio_hash
+
+        digest = hashlib.sha1()
+        for chunk in iter_audio_pcm(media_path):
+            digest.update(chunk)
+
+        audio_hash = digest.hexdigest()
+        self.remember_fingerprint(media_path, audio_hash)
+        return audio_hash
+
+    @staticmethod
+    def make_key(audio_hash, model_size, language, options):
+        data = json.dumps(
+            [CACHE_VERSION, audio_hash, model_size, language, options],
+            sort_keys=True, default=str
+        )
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Ambil transcription (dict seperti AutoSubtitler.transcribe) atau None."""
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT data FROM transcripts WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if not row:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _expand(json.loads(zlib.decompress(row[0]).decode('utf-8')))
+
+    def put(self, key, transcription):
+        data = json.dumps(_compact(transcription), ensure_ascii=False, separators=(',', ':'))
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO transcripts (key, data) VALUES (?, ?)",
+                    (key, zlib.compress(data.encode('utf-8'), 6))
+                )
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM transcripts")
+            conn.execute("DELETE FROM audio_hash")
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_transcript_cache():
+    """TranscriptCache bersama untuk seluruh proses."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TranscriptCache()
+        return _default_cache
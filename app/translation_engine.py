@@ -0,0 +1,233 @@
+"""
+Translation Engine — Terjemahan async dengan rate limit & retry
+Request ke backend dibatasi token bucket (request/detik) dan jumlah request
+yang sedang berjalan; semua bahasa target jalan paralel. Request gagal diulang
+dengan exponential backoff + jitter. Backend bisa diganti (misal stub lokal).
+Baris yang sama hanya dikirim sekali, dan yang sudah ada di translation memory
+tidak dikirim sama sekali.
+"""
+import time
+import random
+import asyncio
+import inspect
+from app.translation_memory import normalize_text
+
+
+class TokenBucket:
+    """Token bucket async: rata-rata `rate` request/detik, burst sampai `capacity`."""
+
+    def __init__(self, rate=5.0, capacity=5):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Tunggu sampai ada token, lalu ambil satu."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class GoogleBackend:
+    """Backend deep-translator (Google Translate gratis, tanpa API key)."""
+
+    name = 'google'
+    # translate_batch deep-translator hanya loop request satu per satu,
+    # jadi engine yang mengirim per baris (paralel, lewat rate limiter)
+    max_batch = 1
+
+    def __init__(self):
+        try:
+            from deep_translator import GoogleTranslator
+        except ImportError:
+            raise ImportError(
+                "deep-translator belum terinstall.\n"
+                "Jalankan: pip install deep-translator"
+            )
+        self._translator_cls = GoogleTranslator
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        translator = self._translator_cls(source=source_lang, target=target_lang)
+        return [translator.translate(text) for text in texts]
+
+
+class TranslationEngine:
+    """
+    Engine terjemahan async.
+
+    Backend: object dengan atribut `name`, opsional `max_batch`, dan method
+    `translate_batch(texts, source_lang, target_lang) -> list` (boleh sync
+    atau `async def`; versi sync dijalankan di thread).
+    """
+
+    def __init__(self, backend=None, rate=5.0, burst=5, max_in_flight=4, batch_size=30,
+                 max_retries=4, base_delay=0.5, max_delay=8.0, memory=None):
+        """
+        Args:
+            backend: Backend terjemahan (default GoogleBackend, dibuat saat dipakai)
+            rate: Request per detik (rata-rata) ke backend
+            burst: Jumlah request yang boleh langsung dikirim tanpa menunggu
+            max_in_flight: Maksimal request yang berjalan bersamaan
+            batch_size: Jumlah teks per request (dibatasi backend.max_batch)
+            max_retries: Percobaan ulang per request sebelum dianggap gagal
+            base_delay, max_delay: Batas backoff (detik), dengan jitter
+            memory: TranslationMemory (None = tanpa cache terjemahan)
+        """
+        self._backend = backend
+        self.memory = memory
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.requests = 0
+        self.retries = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = GoogleBackend()
+        return self._backend
+
+    # ===== REQUEST =====
+
+    def _limits(self):
+        """Rate limiter + slot in-flight untuk satu sesi (satu event loop)."""
+        return TokenBucket(self.rate, self.burst), asyncio.Semaphore(self.max_in_flight)
+
+    def _backoff(self, attempt):
+        """Exponential backoff dengan 'equal jitter' (setengah tetap, setengah acak)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _request(self, texts, source_lang, target_lang, limits):
+        """Satu request ke backend, diulang dengan backoff kalau gagal."""
+        bucket, slots = limits
+        backend = self.backend
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            async with slots:
+                self.requests += 1
+                try:
+                    if inspect.iscoroutinefunction(backend.translate_batch):
+                        results = await backend.translate_batch(texts, source_lang, target_lang)
+                    else:
+                        results = await asyncio.get_running_loop().run_in_executor(
+                            None, backend.translate_batch, texts, source_lang, target_lang
+                        )
+                    if len(results) != len(texts):
+                        raise RuntimeError(
+                            f"Backend returned {len(results)} results for {len(texts)} texts"
+                        )
+                    return list(results)
+                except Exception:
+                    if attempt >= self.max_retries:
+                        raise
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def _translate_chunk(self, texts, source_lang, target_lang, limits):
+        """Satu batch; kalau tetap gagal, per baris (None untuk baris yang gagal)."""
+        try:
+            return await self._request(texts, source_lang, target_lang, limits)
+        except Exception:
+            if len(texts) == 1:
+                return [None]
+
+        async def _single(text):
+            try:
+                return (await self._request([text], source_lang, target_lang, limits))[0]
+            except Exception:
+                return None
+
+        return await asyncio.gather(*(_single(text) for text in texts))
+
+    # ===== API ASYNC =====
+
+    async def translate_texts(self, texts, source_lang, target_lang, limits=None,
+                              batch_size=None):
+        """
+        Terjemahkan list teks (baris kosong dilewati, urutan tetap, teks asli
+        dipakai untuk baris yang gagal). Baris kembar dikirim sekali; hasil
+        dari / ke translation memory kalau ada.
+
+        Args:
+            limits: Rate limiter sesi (dipakai bersama antar bahasa), None = baru
+            batch_size: Teks per request (None = self.batch_size)
+
+        Returns:
+            List hasil terjemahan, panjang sama dengan texts
+        """
+        backend = self.backend      # ImportError dll. langsung naik, tidak jadi fallback
+        backend_name = getattr(backend, 'name', type(backend).__name__)
+        limits = limits or self._limits()
+
+        # Dedupe: teks ter-normalisasi → index baris yang memakainya
+        groups = {}
+        for i, text in enumerate(texts):
+            if text.strip():
+                groups.setdefault(normalize_text(text), []).append(i)
+
+        done = {}
+        if self.memory is not None and groups:
+            done = self.memory.get_many(groups, source_lang, target_lang, backend_name)
+        pending = [key for key in groups if key not in done]
+
+        size = batch_size or self.batch_size
+        size = max(1, min(size, getattr(backend, 'max_batch', None) or size))
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+
+        async def _run(chunk):
+            outputs = await self._translate_chunk(
+                [texts[groups[key][0]] for key in chunk], source_lang, target_lang, limits
+            )
+            # Baris gagal tidak disimpan, supaya dicoba lagi di run berikutnya
+            fresh = {key: output for key, output in zip(chunk, outputs) if output}
+            done.update(fresh)
+            if self.memory is not None:
+                self.memory.put_many(fresh, source_lang, target_lang, backend_name)
+
+        await asyncio.gather(*(_run(chunk) for chunk in chunks))
+
+        result = list(texts)
+        for key, indices in groups.items():
+            if key in done:
+                for i in indices:
+                    result[i] = done[key]
+        return result
+
+    async def translate_languages(self, texts, source_lang, target_langs):
+        """
+        Terjemahkan ke banyak bahasa paralel (rate limit dipakai bersama).
+
+        Returns:
+            dict {lang: list hasil} atau {lang: Exception} kalau bahasa itu gagal
+        """
+        limits = self._limits()
+        outputs = await asyncio.gather(
+            *(self.translate_texts(texts, source_lang, lang, limits) for lang in target_langs),
+            return_exceptions=True
+        )
+        return dict(zip(target_langs, outputs))
+
+    # ===== API SYNC =====
+
+    def translate(self, texts, source_lang='id', target_lang='en', batch_size=None):
+        """Versi sync translate_texts (untuk dipanggil dari thread GUI / batch)."""
+        return asyncio.run(self.translate_texts(
+            texts, source_lang, target_lang, batch_size=batch_size
+        ))
+
+    def translate_multi(self, texts, source_lang='id', target_langs=('en',)):
+        """Versi sync translate_languages."""
+        return asyncio.run(self.translate_languages(texts, source_lang, list(target_langs)))
@@ -0,0 +1,105 @@
+"""
+Translation Memory — hasil terjemahan per baris di-cache (SQLite)
+Key: (teks sumber ter-normalisasi, bahasa sumber, bahasa target, backend).
+Baris yang berulang (ucapan terima kasih, outro, dialog yang muncul lagi di
+episode berikutnya) cukup diterjemahkan sekali untuk selamanya.
+"""
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from app.cache import get_cache_dir
+
+
+def normalize_text(text):
+    """Normalisasi teks sumber untuk key: Unicode NFC, whitespace dirapikan."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+class TranslationMemory:
+    """Translation memory persistent (SQLite)."""
+
+    def __init__(self, db_path=None):
+        """
+        Args:
+            db_path: Path SQLite (default: <cache dir>/translations.sqlite)
+        """
+        self.db_path = db_path or os.path.join(get_cache_dir(), "translations.sqlite")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "source TEXT NOT NULL, source_lang TEXT NOT NULL, "
+                "target_lang TEXT NOT NULL, backend TEXT NOT NULL, "
+                "translation TEXT NOT NULL, "
+                "PRIMARY KEY (source, source_lang, target_lang, backend))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get_many(self, sources, source_lang, target_lang, backend):
+        """
+        Ambil terjemahan yang sudah ada.
+
+        Args:
+            sources: Teks sumber yang SUDAH dinormalisasi (normalize_text)
+
+        Returns:
+            dict {source: translation} untuk yang ditemukan
+        """
+        sources = list(dict.fromkeys(sources))
+        found = {}
+        try:
+            with self._lock, self._connect() as conn:
+                # Batas jumlah parameter SQLite → query per potongan
+                for i in range(0, len(sources), 500):
+                    chunk = sources[i:i + 500]
+                    rows = conn.execute(
+                        "SELECT source, translation FROM translations "
+                        "WHERE source_lang = ? AND target_lang = ? AND backend = ? "
+                        f"AND source IN ({','.join('?' * len(chunk))})",
+                        (source_lang, target_lang, backend, *chunk)
+                    ).fetchall()
+                    found.update(rows)
+        except sqlite3.Error:
+            pass
+        self.hits += len(found)
+        self.misses += len(sources) - len(found)
+        return found
+
+    def put_many(self, translations, source_lang, target_lang, backend):
+        """Simpan {source ter-normalisasi: translation}."""
+        if not translations:
+            return
+        try:
+            with self._lock, self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations "
+                    "(source, source_lang, target_lang, backend, translation) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(source, source_lang, target_lang, backend, text)
+                     for source, text in translations.items()]
+                )
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM translations")
+
+
+_default_memory = None
+_default_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """TranslationMemory bersama untuk seluruh proses."""
+    global _default_memory
+    with _default_lock:
+        if _default_memory is None:
+            _default_memory = TranslationMemory()
+        return _default_memory
@@ -1,10 +1,12 @@
 """
 Auto Translate Subtitle — Terjemahkan subtitle ke bahasa lain
-Menggunakan deep-translator (Google Translate gratis, tanpa API key)
+Menggunakan deep-translator (Google Translate gratis, tanpa API key) lewat
+TranslationEngine (async, rate limit, semua bahasa paralel)
 """
 import os
 import re
-import time
+from app.translation_engine import TranslationEngine
+from app.translation_memory import get_translation_memory
 
 
 class SubtitleTranslator:
@@ -31,8 +33,15 @@ class SubtitleTranslator:
         'tl': 'Filipino',
     }
 
-    def __init__(self, output_dir="output"):
+    def __init__(self, output_dir="output", engine=None):
+        """
+        Args:
+            output_dir: Folder output subtitle hasil terjemahan
+            engine: TranslationEngine (default: backend Google, rate limit default,
+                    translation memory bersama)
+        """
         self.output_dir = output_dir
+        self.engine = engine or TranslationEngine(memory=get_translation_memory())
         os.makedirs(output_dir, exist_ok=True)
 
     def _parse_srt(self, srt_path):
@@ -88,92 +97,45 @@ class SubtitleTranslator:
         """Rebuild ASS Dialogue line with translated text."""
         return ','.join(parts) + ',' + translated_text + '\n'
 
-    def translate_text_batch(self, texts, source_lang='id', target_lang='en', batch_size=30):
-        """Translate a list of texts using deep-translator (Google)."""
-        try:
-            from deep_translator import GoogleTranslator
-        except ImportError:
-            raise ImportError(
-                "deep-translator belum terinstall.\n"
-                "Jalankan: pip install deep-translator"
-            )
-
-        translator = GoogleTranslator(source=source_lang, target=target_lang)
-        translated = []
-
-        # Translate in batches to avoid rate limits
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-
-            # Filter empty strings
-            non_empty_indices = [j for j, t in enumerate(batch) if t.strip()]
-            non_empty_texts = [batch[j] for j in non_empty_indices]
-
-            if non_empty_texts:
-                try:
-                    # deep-translator supports batch via translate_batch
-                    results = translator.translate_batch(non_empty_texts)
-                except Exception:
-                    # Fallback: translate one by one
-                    results = []
-                    for text in non_empty_texts:
-                        try:
-                            results.append(translator.translate(text))
-                        except Exception:
-                            results.append(text)  # Keep original on failure
-                        time.sleep(0.1)
-
-                # Rebuild full batch with empty strings preserved
-                batch_result = list(batch)
-                for idx, j in enumerate(non_empty_indices):
-                    if idx < len(results) and results[idx]:
-                        batch_result[j] = results[idx]
-
-                translated.extend(batch_result)
-            else:
-                translated.extend(batch)
-
-            # Rate limit pause between batches
-            if i + batch_size < len(texts):
-                time.sleep(0.5)
+    def translate_text_batch(self, texts, source_lang='id', target_lang='en', batch_size=None):
+        """
+        Translate a list of texts (empty strings preserved, original kept on failure).
 
-        return translated
+        Args:
+            batch_size: Texts per request (None = engine default)
+        """
+        return self.engine.translate(texts, source_lang, target_lang, batch_size)
 
-    def translate_srt(self, srt_path, source_lang='id', target_lang='en'):
-        """Translate an SRT subtitle file."""
+    def _load_srt(self, srt_path):
+        """SRT → (texts, writer). writer(translated_texts, target_lang) → output path."""
         entries = self._parse_srt(srt_path)
         if not entries:
             raise ValueError(f"No subtitle entries found in {srt_path}")
 
-        # Extract all texts
-        texts = [e['text'] for e in entries]
-
-        # Translate
-        translated_texts = self.translate_text_batch(texts, source_lang, target_lang)
-
-        # Rebuild SRT
-        output_lines = []
-        for i, entry in enumerate(entries):
-            output_lines.append(entry['index'])
-            output_lines.append(entry['timestamp'])
-            if i < len(translated_texts):
-                output_lines.append(translated_texts[i])
-            else:
-                output_lines.append(entry['text'])
-            output_lines.append('')  # Blank line separator
-
-        # Save
-        base = os.path.splitext(os.path.basename(srt_path))[0]
-        output_path = os.path.join(self.output_dir, f"{base}_{target_lang}.srt")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(output_lines))
-
-        return output_path
-
-    def translate_ass(self, ass_path, source_lang='id', target_lang='en'):
-        """Translate an ASS subtitle file."""
+        def _write(translated_texts, target_lang):
+            # Rebuild SRT
+            output_lines = []
+            for i, entry in enumerate(entries):
+                output_lines.append(entry['index'])
+                output_lines.append(entry['timestamp'])
+                if i < len(translated_texts):
+                    output_lines.append(translated_texts[i])
+                else:
+                    output_lines.append(entry['text'])
+                output_lines.append('')  # Blank line separator
+
+            # Save
+            base = os.path.splitext(os.path.basename(srt_path))[0]
+            output_path = os.path.join(self.output_dir, f"{base}_{target_lang}.srt")
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(output_lines))
+            return output_path
+
+        return [e['text'] for e in entries], _write
+
+    def _load_ass(self, ass_path):
+        """ASS → (texts, writer). writer(translated_texts, target_lang) → output path."""
         header_lines, dialogue_lines = self._parse_ass(ass_path)
-
         if not dialogue_lines:
             raise ValueError(f"No dialogue entries found in {ass_path}")
 
@@ -185,47 +147,72 @@ class SubtitleTranslator:
             texts.append(text)
             parts_list.append(parts)
 
-        # Translate
-        translated_texts = self.translate_text_batch(texts, source_lang, target_lang)
-
-        # Rebuild ASS
-        output_lines = list(header_lines)
-        for i, parts in enumerate(parts_list):
-            if parts and i < len(translated_texts):
-                output_lines.append(self._rebuild_ass_dialogue(parts, translated_texts[i]))
-            else:
-                output_lines.append(dialogue_lines[i])
-
-        # Save
-        base = os.path.splitext(os.path.basename(ass_path))[0]
-        output_path = os.path.join(self.output_dir, f"{base}_{target_lang}.ass")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.writelines(output_lines)
-
-        return output_path
-
-    def translate_subtitle(self, subtitle_path, source_lang='id', target_lang='en'):
-        """Auto-detect format and translate subtitle file."""
+        def _write(translated_texts, target_lang):
+            # Rebuild ASS
+            output_lines = list(header_lines)
+            for i, parts in enumerate(parts_list):
+                if parts and i < len(translated_texts):
+                    output_lines.append(self._rebuild_ass_dialogue(parts, translated_texts[i]))
+                else:
+                    output_lines.append(dialogue_lines[i])
+
+            # Save
+            base = os.path.splitext(os.path.basename(ass_path))[0]
+            output_path = os.path.join(self.output_dir, f"{base}_{target_lang}.ass")
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.writelines(output_lines)
+            return output_path
+
+        return texts, _write
+
+    def _load_subtitle(self, subtitle_path):
+        """Auto-detect format → (texts, writer)."""
         ext = os.path.splitext(subtitle_path)[1].lower()
-
         if ext == '.srt':
-            return self.translate_srt(subtitle_path, source_lang, target_lang)
+            return self._load_srt(subtitle_path)
         elif ext == '.ass':
-            return self.translate_ass(subtitle_path, source_lang, target_lang)
+            return self._load_ass(subtitle_path)
         else:
             raise ValueError(f"Unsupported subtitle format: {ext}. Use .srt or .ass")
 
+    def translate_srt(self, srt_path, source_lang='id', target_lang='en'):
+        """Translate an SRT subtitle file."""
+        texts, write = self._load_srt(srt_path)
+        return write(self.translate_text_batch(texts, source_lang, target_lang), target_lang)
+
+    def translate_ass(self, ass_path, source_lang='id', target_lang='en'):
+        """Translate an ASS subtitle file."""
+        texts, write = self._load_ass(ass_path)
+        return write(self.translate_text_batch(texts, source_lang, target_lang), target_lang)
+
+    def translate_subtitle(self, subtitle_path, source_lang='id', target_lang='en'):
+        """Auto-detect format and translate subtitle file."""
+        texts, write = self._load_subtitle(subtitle_path)
+        return write(self.translate_text_batch(texts, source_lang, target_lang), target_lang)
+
     def translate_multi(self, subtitle_path, source_lang='id', target_langs=None):
-        """Translate subtitle to multiple languages at once."""
+        """
+        Translate subtitle to multiple languages at once.
+        File di-parse sekali; semua bahasa diterjemahkan paralel dalam satu
+        sesi engine (rate limit & slot request dipakai bersama).
+        """
         if target_langs is None:
             target_langs = ['en']
+        langs = [lang for lang in dict.fromkeys(target_langs) if lang != source_lang]
 
         results = {}
-        for lang in target_langs:
-            if lang == source_lang:
-                continue
+        try:
+            texts, write = self._load_subtitle(subtitle_path)
+            translations = self.engine.translate_multi(texts, source_lang, langs)
+        except Exception as e:
+            return {lang: {'status': 'error', 'error': str(e)} for lang in langs}
+
+        for lang in langs:
+            translated = translations.get(lang)
             try:
-                output = self.translate_subtitle(subtitle_path, source_lang, lang)
+                if isinstance(translated, BaseException):
+                    raise translated
+                output = write(translated, lang)
                 results[lang] = {'status': 'success', 'path': output}
             except Exception as e:
                 results[lang] = {'status': 'error', 'error': str(e)}
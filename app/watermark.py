@@ -2,8 +2,7 @@
 Modul Watermark - Tambah logo/watermark ke video
 """
 import os
-import subprocess
-from app.ffmpeg_util import get_ffmpeg_path
+from app.ffmpeg_util import get_ffmpeg_path, FFmpegRunner
 
 
 class WatermarkOverlay:
@@ -21,6 +20,7 @@ class WatermarkOverlay:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         self.ffmpeg = get_ffmpeg_path()
+        self.runner = FFmpegRunner()
         self.progress_callback = None
 
     def set_progress_callback(self, callback):
@@ -30,6 +30,54 @@ class WatermarkOverlay:
         if self.progress_callback:
             self.progress_callback(pct, text)
 
+    def _run_encode(self, cmd):
+        """Jalankan encode lewat FFmpegRunner, progress 20% → 99%."""
+        self.runner.run(
+            cmd,
+            progress_callback=lambda pct: self._update(20 + pct * 0.79, f"Watermark... {pct:.0f}%")
+        )
+
+    def image_watermark_filter(self, video_in, logo_in, video_out, position="bottom-right",
+                               opacity=0.7, scale_percent=10):
+        """
+        Fragment filter graph untuk overlay logo.
+
+        Args:
+            video_in: Label stream video (misal '0:v')
+            logo_in: Label stream logo (misal '1:v')
+            video_out: Label output
+        """
+        pos = self.POSITIONS.get(position, self.POSITIONS['bottom-right'])
+        scale_w = f"iw*{scale_percent}/100"
+
+        # Filter: scale logo lalu overlay dengan opacity
+        return (
+            f"[{logo_in}]scale={scale_w}:-1,format=rgba,"
+            f"colorchannelmixer=aa={opacity}[logo];"
+            f"[{video_in}][logo]overlay={pos}[{video_out}]"
+        )
+
+    def text_watermark_filter(self, text="Channel Name", position="bottom-right",
+                              font_size=24, font_color="white", opacity=0.5):
+        """Filter drawtext untuk watermark teks (dipakai di -vf / filter chain)."""
+        pos_map = {
+            'top-left':     f"x=20:y=20",
+            'top-right':    f"x=w-tw-20:y=20",
+            'bottom-left':  f"x=20:y=h-th-20",
+            'bottom-right': f"x=w-tw-20:y=h-th-20",
+            'center':       f"x=(w-tw)/2:y=(h-th)/2",
+        }
+        pos = pos_map.get(position, pos_map['bottom-right'])
+
+        # Escape teks untuk FFmpeg
+        safe_text = text.replace("'", "\\'").replace(":", "\\:")
+
+        return (
+            f"drawtext=text='{safe_text}':{pos}:"
+            f"fontsize={font_size}:fontcolor={font_color}@{opacity}:"
+            f"borderw=2:bordercolor=black@{opacity * 0.5}"
+        )
+
     def add_image_watermark(self, video_path, logo_path, position="bottom-right",
                              opacity=0.7, scale_percent=10, output_path=None):
         """
@@ -49,14 +97,8 @@ class WatermarkOverlay:
 
         self._update(20, "Menambahkan watermark...")
 
-        pos = self.POSITIONS.get(position, self.POSITIONS['bottom-right'])
-        scale_w = f"iw*{scale_percent}/100"
-
-        # Filter: scale logo lalu overlay dengan opacity
-        filter_complex = (
-            f"[1:v]scale={scale_w}:-1,format=rgba,"
-            f"colorchannelmixer=aa={opacity}[logo];"
-            f"[0:v][logo]overlay={pos}[out]"
+        filter_complex = self.image_watermark_filter(
+            '0:v', '1:v', 'out', position, opacity, scale_percent
         )
 
         cmd = [
@@ -70,9 +112,7 @@ class WatermarkOverlay:
             output_path
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"FFmpeg error: {result.stderr}")
+        self._run_encode(cmd)
 
         self._update(100, f"Watermark ditambahkan: {output_path}")
         return output_path
@@ -94,23 +134,7 @@ class WatermarkOverlay:
 
         self._update(20, "Menambahkan text watermark...")
 
-        pos_map = {
-            'top-left':     f"x=20:y=20",
-            'top-right':    f"x=w-tw-20:y=20",
-            'bottom-left':  f"x=20:y=h-th-20",
-            'bottom-right': f"x=w-tw-20:y=h-th-20",
-            'center':       f"x=(w-tw)/2:y=(h-th)/2",
-        }
-        pos = pos_map.get(position, pos_map['bottom-right'])
-
-        # Escape teks untuk FFmpeg
-        safe_text = text.replace("'", "\\'").replace(":", "\\:")
-
-        vf = (
-            f"drawtext=text='{safe_text}':{pos}:"
-            f"fontsize={font_size}:fontcolor={font_color}@{opacity}:"
-            f"borderw=2:bordercolor=black@{opacity * 0.5}"
-        )
+        vf = self.text_watermark_filter(text, position, font_size, font_color, opacity)
 
         cmd = [
             self.ffmpeg, '-y',
@@ -121,9 +145,7 @@ class WatermarkOverlay:
             output_path
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"FFmpeg error: {result.stderr}")
+        self._run_encode(cmd)
 
         self._update(100, f"Text watermark ditambahkan: {output_path}")
         return output_path